@@ -1,166 +1,279 @@
 # backend/api/activity.py
 
-from fastapi import APIRouter
-from datetime import datetime, date, timedelta
+from fastapi import APIRouter, HTTPException, Query
+from bisect import bisect_right
+from datetime import date, timedelta
 import os
-import psycopg2
+from typing import Optional
 from dotenv import load_dotenv
 
+from backend.services.swr_cache import StaleWhileRevalidateCache
+from backend.services.sync_runner import after_sync
+
 load_dotenv()
 
 router = APIRouter()
 
-SCHEMA_NAME = os.getenv("DB_SCHEMA", "more_house")
+# Served from cache; refreshed in the background once older than the TTL
+summary_cache = StaleWhileRevalidateCache(
+    "activity_summary",
+    ttl_seconds=float(os.getenv("ACTIVITY_CACHE_TTL_SECONDS", 60)),
+)
+# Any sync may have changed the viewings and contracts: refresh on next read
+after_sync(summary_cache.invalidate)
 
-# Column IDs for Qualified board (9188309936)
-QUALIFIED_VIEWING_DATE = 'date_mkr5m8jk'
-QUALIFIED_SIGN_DATE = 'date_mkr5cxqh'
-QUALIFIED_STAGE = 'status__1'
+# Period key -> days back from today
+PERIODS = {
+    '1d': 1,
+    '3d': 3,
+    '7d': 7,
+    '1m': 30,
+    '3m': 90,
+}
 
-# Column IDs for Won Deals board (8606133913)
-WON_VIEWING_DATE = 'date_mks29j00'
-WON_SIGN_DATE = 'date_mks2y4vg'
-WON_UNIT = 'text_mktbxcap'
-WON_LENGTH_OF_STAY = 'timerange_mkt9gsnr'
-WON_RATE = 'numeric_mks2n5fp'
-WON_GROSS_INCOME = 'formula_mks34v1y'
+# Time series bucket -> generate_series step
+BUCKETS = {
+    'day': '1 day',
+    'week': '1 week',
+}
+MAX_TIMESERIES_BUCKETS = 1000
 
+# Funnel breakdowns stored in viewing_cohorts, and its conversion windows (days)
+FUNNEL_DIMENSIONS = ('all', 'nationality', 'university', 'lead_source')
+FUNNEL_WINDOWS = (7, 14, 30)
 
-def _parse_date(date_str):
-    if not date_str:
-        return None
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d").date()
-    except (ValueError, TypeError):
-        return None
-
-
-def _get_monday_items(board_id, columns):
-    """Fetch items from a Monday board with specific columns."""
-    from integrations.monday_client import MondayClient
-    client = MondayClient()
-
-    col_ids = list(columns.values())
-    all_items = client.get_all_board_items(board_id)
-
-    results = []
-    for item in all_items:
-        row = {'name': item.get('name', ''), 'monday_id': item['id']}
-        for key, col_id in columns.items():
-            for cv in item.get('column_values', []):
-                if cv['id'] == col_id:
-                    row[key] = cv.get('text') or None
-                    # Also get raw value for timelines
-                    import json
-                    raw = cv.get('value')
-                    if raw:
-                        try:
-                            row[f'{key}_raw'] = json.loads(raw)
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    break
-        results.append(row)
-    return results
+# Viewings come from Won Deals (won_deals.viewing_date) and the Qualified board
+# (leads), counting a lead only if no Won Deal has a viewing under the same name.
+# Contracts signed come from Won Deals (won_deals.sign_date). won_deals has every
+# Won Deals item, including ones with too little data to be a contract; both
+# tables are kept in step with Monday by the sync (scripts/sync_monday.py).
+ACTIVITY_EVENTS_SQL = """
+    SELECT 'viewings' AS kind, viewing_date AS event_date
+    FROM won_deals
+    WHERE viewing_date IS NOT NULL
+
+    UNION ALL
+
+    SELECT 'viewings', l.viewing_date
+    FROM leads l
+    WHERE l.viewing_date IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM won_deals d
+          WHERE d.viewing_date IS NOT NULL
+            AND LOWER(TRIM(d.name)) = LOWER(TRIM(l.name))
+      )
+
+    UNION ALL
+
+    SELECT 'contracts', sign_date
+    FROM won_deals
+    WHERE sign_date IS NOT NULL
+"""
 
 
 @router.get("/summary")
-async def get_activity_summary():
+def get_activity_summary():
     """
     Get viewings and new contracts signed in last 1d, 3d, 7d, 1m, 3m.
-    Pulls from both Qualified and Won Deals boards.
+
+    Served from cache: the last good summary is returned immediately and
+    refreshed in the background once older than ACTIVITY_CACHE_TTL_SECONDS,
+    so a slow or failing database doesn't break the dashboard. `data_age` is
+    the summary's age in seconds.
+    """
+    try:
+        summary, age = summary_cache.get(_load_activity_summary)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Activity summary unavailable")
+    return {**summary, 'data_age': round(age)}
+
+
+def _load_activity_summary():
+    """
+    Viewings and contracts signed per period, from the leads and won_deals
+    tables mirrored from the Qualified and Won Deals boards: one grouped query
+    for the counts, one for the contracts listed (those the sync could map).
     """
+    from utils.db_connection import execute_query
+
     today = date.today()
-    periods = {
-        '1d': today - timedelta(days=1),
-        '3d': today - timedelta(days=3),
-        '7d': today - timedelta(days=7),
-        '1m': today - timedelta(days=30),
-        '3m': today - timedelta(days=90),
-    }
+    cutoffs = {key: today - timedelta(days=days) for key, days in PERIODS.items()}
+
+    period_counts = ",\n".join(
+        f'COUNT(*) FILTER (WHERE event_date >= %(p{key})s) AS "{key}"' for key in PERIODS
+    )
+    rows = execute_query(f"""
+        WITH events AS ({ACTIVITY_EVENTS_SQL})
+        SELECT kind, {period_counts}, COUNT(*) AS total
+        FROM events
+        GROUP BY kind
+    """, {f"p{key}": cutoff for key, cutoff in cutoffs.items()})
+    counts = {row['kind']: row for row in rows}
+    viewing_counts = counts.get('viewings', {})
+    contract_counts = counts.get('contracts', {})
 
-    # Fetch from both boards
-    qualified_items = _get_monday_items('9188309936', {
-        'viewing_date': QUALIFIED_VIEWING_DATE,
-        'sign_date': QUALIFIED_SIGN_DATE,
-    })
-
-    won_items = _get_monday_items('8606133913', {
-        'viewing_date': WON_VIEWING_DATE,
-        'sign_date': WON_SIGN_DATE,
-        'unit': WON_UNIT,
-        'length_of_stay': WON_LENGTH_OF_STAY,
-        'rate': WON_RATE,
-        'gross_income': WON_GROSS_INCOME,
-    })
-
-    # Collect all viewing dates from both boards (deduplicate by name)
-    all_viewings = []
-    seen_names = set()
-
-    for item in won_items:
-        vd = _parse_date(item.get('viewing_date'))
-        if vd:
-            all_viewings.append({'name': item['name'], 'date': vd})
-            seen_names.add(item['name'].lower().strip())
-
-    for item in qualified_items:
-        name_key = item['name'].lower().strip()
-        if name_key not in seen_names:
-            vd = _parse_date(item.get('viewing_date'))
-            if vd:
-                all_viewings.append({'name': item['name'], 'date': vd})
-
-    # Collect signed contracts from Won Deals
-    all_contracts = []
-    for item in won_items:
-        sd = _parse_date(item.get('sign_date'))
-        if sd:
-            raw_timeline = item.get('length_of_stay_raw', {})
-            start = raw_timeline.get('from') if isinstance(raw_timeline, dict) else None
-            end = raw_timeline.get('to') if isinstance(raw_timeline, dict) else None
-            all_contracts.append({
-                'name': item['name'],
-                'sign_date': sd,
-                'unit': item.get('unit'),
-                'start_date': start,
-                'end_date': end,
-                'rate': item.get('rate'),
-                'gross_income': item.get('gross_income'),
-            })
-
-    # Count by period
-    viewings_by_period = {}
-    for key, cutoff in periods.items():
-        viewings_by_period[key] = len([v for v in all_viewings if v['date'] >= cutoff])
+    # Contracts signed in the longest period, newest first; shorter periods are
+    # prefixes, found by bisecting the (negated, so ascending) sign dates
+    recent = execute_query("""
+        SELECT resident_name AS name, sign_date, room_id AS unit, start_date, end_date,
+               weekly_rate AS rate, total_value AS gross_income
+        FROM contracts
+        WHERE status <> 'deleted' AND sign_date >= %s
+        ORDER BY sign_date DESC, resident_name
+    """, (min(cutoffs.values()),))
+    sign_keys = [-c['sign_date'].toordinal() for c in recent]
+    recent = [{**c, 'sign_date': c['sign_date'].isoformat()} for c in recent]
 
     contracts_by_period = {}
-    for key, cutoff in periods.items():
-        recent = [c for c in all_contracts if c['sign_date'] >= cutoff]
+    for key, cutoff in cutoffs.items():
         contracts_by_period[key] = {
-            'count': len(recent),
-            'contracts': sorted(
-                [
-                    {
-                        'name': c['name'],
-                        'sign_date': c['sign_date'].isoformat(),
-                        'unit': c['unit'],
-                        'start_date': c['start_date'],
-                        'end_date': c['end_date'],
-                        'rate': c['rate'],
-                        'gross_income': c['gross_income'],
-                    }
-                    for c in recent
-                ],
-                key=lambda x: x['sign_date'],
-                reverse=True,
-            )
+            'count': contract_counts.get(key, 0),
+            'contracts': recent[:bisect_right(sign_keys, -cutoff.toordinal())],
         }
 
     return {
-        'viewings': viewings_by_period,
+        'viewings': {key: viewing_counts.get(key, 0) for key in PERIODS},
         'contracts': contracts_by_period,
         'totals': {
-            'total_viewings': len(all_viewings),
-            'total_contracts': len(all_contracts),
+            'total_viewings': viewing_counts.get('total', 0),
+            'total_contracts': contract_counts.get('total', 0),
         }
     }
+
+
+@router.get("/timeseries")
+def get_activity_timeseries(
+    from_date: Optional[date] = Query(None, alias="from", description="First day (default: 90 days before `to`)"),
+    to_date: Optional[date] = Query(None, alias="to", description="Last day, inclusive (default: today)"),
+    bucket: str = Query('day', description="day or week (weeks start on Monday)"),
+):
+    """
+    Viewings and contracts signed per day or week over any date range.
+
+    Counted in one query over the indexed viewing and sign dates; every bucket
+    in the range is returned, including empty ones.
+    """
+    from utils.db_connection import execute_query
+
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(BUCKETS)}")
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=PERIODS['3m'])
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    days_per_bucket = 7 if bucket == 'week' else 1
+    if (to_date - from_date).days // days_per_bucket + 1 > MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range too long: at most {MAX_TIMESERIES_BUCKETS} buckets")
+
+    rows = execute_query(f"""
+        WITH events AS ({ACTIVITY_EVENTS_SQL}),
+        counts AS (
+            SELECT date_trunc(%(bucket)s, event_date)::date AS bucket_start,
+                   COUNT(*) FILTER (WHERE kind = 'viewings') AS viewings,
+                   COUNT(*) FILTER (WHERE kind = 'contracts') AS contracts
+            FROM events
+            WHERE event_date BETWEEN %(from)s AND %(to)s
+            GROUP BY 1
+        )
+        SELECT b.bucket_start::date AS bucket_start,
+               COALESCE(c.viewings, 0) AS viewings,
+               COALESCE(c.contracts, 0) AS contracts
+        FROM generate_series(
+            date_trunc(%(bucket)s, %(from)s::date), %(to)s::date, %(step)s::interval
+        ) AS b(bucket_start)
+        LEFT JOIN counts c ON c.bucket_start = b.bucket_start::date
+        ORDER BY 1
+    """, {'bucket': bucket, 'step': BUCKETS[bucket], 'from': from_date, 'to': to_date})
+
+    return {
+        'from': from_date.isoformat(),
+        'to': to_date.isoformat(),
+        'bucket': bucket,
+        'series': [
+            {
+                'start': row['bucket_start'].isoformat(),
+                'viewings': row['viewings'],
+                'contracts': row['contracts'],
+            }
+            for row in rows
+        ],
+        'totals': {
+            'viewings': sum(row['viewings'] for row in rows),
+            'contracts': sum(row['contracts'] for row in rows),
+        },
+    }
+
+
+def _conversion(row):
+    """Viewings/signings of a cohort row with a conversion rate per window."""
+    result = {'viewings': row['viewings'], 'signed': row['signed']}
+    for days in FUNNEL_WINDOWS:
+        signed = row[f'signed_{days}d']
+        result[f'signed_{days}d'] = signed
+        result[f'rate_{days}d'] = round(signed / row['viewings'], 4) if row['viewings'] else None
+    return result
+
+
+@router.get("/funnel")
+def get_viewing_funnel(
+    from_date: Optional[date] = Query(None, alias="from", description="First viewing week (default: 12 weeks before `to`)"),
+    to_date: Optional[date] = Query(None, alias="to", description="Last viewing day, inclusive (default: today)"),
+    dimension: str = Query('all', description="all, nationality, university or lead_source"),
+):
+    """
+    Viewing-to-signing conversion: of the people who viewed in week W, how many
+    signed within 7, 14 and 30 days, per week and per `dimension` value.
+
+    Read from the viewing_cohorts table the sync keeps up to date. A window is
+    `complete` once every viewer in the week has had the full window to sign;
+    rates of incomplete windows can still rise.
+    """
+    from utils.db_connection import execute_query
+
+    if dimension not in FUNNEL_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of: {', '.join(FUNNEL_DIMENSIONS)}")
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(weeks=12)
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    first_week = from_date - timedelta(days=from_date.weekday())
+
+    counts = ", ".join(
+        ["viewings", "signed"] + [f"signed_{days}d" for days in FUNNEL_WINDOWS]
+    )
+    rows = execute_query(f"""
+        SELECT cohort_week, value, {counts}
+        FROM viewing_cohorts
+        WHERE dimension = %s AND cohort_week BETWEEN %s AND %s
+        ORDER BY cohort_week, viewings DESC, value
+    """, (dimension, first_week, to_date))
+
+    today = date.today()
+    cohorts = []
+    totals = {}
+    for row in rows:
+        week = row['cohort_week']
+        cohorts.append({
+            'week': week.isoformat(),
+            'value': row['value'],
+            **_conversion(row),
+            # The week's last viewers (on Sunday) need the full window after it
+            'complete': {f'{days}d': week + timedelta(days=6 + days) < today for days in FUNNEL_WINDOWS},
+        })
+        total = totals.setdefault(row['value'], dict.fromkeys(
+            ['viewings', 'signed'] + [f'signed_{days}d' for days in FUNNEL_WINDOWS], 0
+        ))
+        for key in total:
+            total[key] += row[key]
+
+    return {
+        'from': first_week.isoformat(),
+        'to': to_date.isoformat(),
+        'dimension': dimension,
+        'windows': list(FUNNEL_WINDOWS),
+        'cohorts': cohorts,
+        'totals': [
+            {'value': value, **_conversion(total)}
+            for value, total in sorted(totals.items(), key=lambda t: (-t[1]['viewings'], t[0]))
+        ],
+    }
@@ -1,7 +1,7 @@
 # backend/api/cashflow.py
 
 from fastapi import APIRouter, Query
-from typing import Optional
+from typing import List, Optional
 from backend.services.cashflow_service import CashFlowService
 
 router = APIRouter()
@@ -19,19 +19,45 @@ async def get_cashflow_summary():
     return service.get_summary()
 
 
+OPEX_SOURCE_PATTERN = f"^({'|'.join(CashFlowService.OPEX_SOURCES)})$"
+
+
 @router.get("/monthly")
 async def get_monthly_cashflow(
     start_month: Optional[str] = Query(None, description="Start month (YYYY-MM)"),
-    end_month: Optional[str] = Query(None, description="End month (YYYY-MM)")
+    end_month: Optional[str] = Query(None, description="End month (YYYY-MM)"),
+    budget_version: Optional[str] = Query(None, description="OPEX budget version (default: latest imported)"),
+    opex_source: str = Query("budget", pattern=OPEX_SOURCE_PATTERN, description="budget or forecast")
 ):
     """
     Get monthly cash flow view:
     - Inflows (rent payments, deposits)
-    - Outflows (OPEX)
+    - Outflows (OPEX of one budget version)
     - Net cash flow
     - Running balance
     """
-    return service.get_monthly_cashflow(start_month, end_month)
+    return service.get_monthly_cashflow(start_month, end_month, budget_version, opex_source)
+
+
+@router.get("/opex/versions")
+async def get_opex_versions():
+    """
+    Imported OPEX budget versions (see scripts/import_excel.py --budget-version),
+    with their month range, category count and total.
+    """
+    return service.get_opex_versions()
+
+
+@router.get("/opex/compare")
+async def compare_opex_versions(
+    versions: List[str] = Query(..., description="Budget versions to compare (repeat the parameter)"),
+    opex_source: str = Query("budget", pattern=OPEX_SOURCE_PATTERN, description="budget or forecast"),
+    by_category: bool = Query(False, description="One row per month and category")
+):
+    """
+    OPEX of several budget versions side by side, per month (and category).
+    """
+    return service.get_opex_comparison(versions, opex_source, by_category)
 
 
 @router.get("/weekly")
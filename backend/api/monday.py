@@ -0,0 +1,65 @@
+# backend/api/monday.py
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import os
+from dotenv import load_dotenv
+
+from backend.services.webhook_queue import MondayWebhookQueue
+
+load_dotenv()
+
+router = APIRouter()
+
+WEBHOOK_TOKEN = os.getenv("MONDAY_WEBHOOK_TOKEN")
+
+# Boards whose changes we apply in real time:
+# MH - Unit Schedule (rooms), Won Deals (contracts/payments) and Qualified (leads)
+WEBHOOK_BOARDS = {
+    os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770"),
+    os.getenv("MONDAY_BOARD_ID_PAYMENTS", "8606133913"),
+    os.getenv("MONDAY_BOARD_ID_QUALIFIED", "9188309936"),
+}
+
+queue = MondayWebhookQueue(
+    debounce_seconds=float(os.getenv("MONDAY_WEBHOOK_DEBOUNCE_SECONDS", 3)),
+    max_delay_seconds=float(os.getenv("MONDAY_WEBHOOK_MAX_DELAY_SECONDS", 30)),
+)
+
+
+@router.post("/webhook")
+async def monday_webhook(request: Request, token: Optional[str] = Query(None)):
+    """
+    Receive Monday change events for the Unit Schedule, Won Deals and Qualified boards.
+
+    - Answers Monday's challenge handshake when the webhook is registered
+    - Queues the changed item; bursts of edits to one item are merged
+      and synced once, using the same mapping as the full sync
+    """
+    if WEBHOOK_TOKEN and token != WEBHOOK_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+
+    body = await request.json()
+
+    # Monday verifies the URL by posting a challenge it expects echoed back
+    if "challenge" in body:
+        return {"challenge": body["challenge"]}
+
+    event = body.get("event") or {}
+    board_id = str(event.get("boardId", ""))
+    item_id = event.get("pulseId") or event.get("itemId")
+
+    if board_id not in WEBHOOK_BOARDS or not item_id:
+        return {"status": "ignored"}
+
+    queue.enqueue(board_id, str(item_id))
+    return {"status": "queued", "pending": queue.pending_count()}
+
+
+@router.get("/webhook/status")
+async def monday_webhook_status():
+    """Get webhook queue depth and counters."""
+    return {
+        "pending": queue.pending_count(),
+        "stats": queue.stats,
+    }
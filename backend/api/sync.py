@@ -1,39 +1,46 @@
 # backend/api/sync.py
 
-from fastapi import APIRouter, BackgroundTasks
-from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import os
-import psycopg2
+from typing import Optional
 from dotenv import load_dotenv
 
+from backend.services.sync_events import SyncEventBroadcaster
+from backend.services.sync_job_service import SyncJobService
+from backend.services.swr_cache import StaleWhileRevalidateCache
+from backend.services.sync_runner import run_sync_job
+from backend.services.sync_scheduler import SyncScheduler
+
 load_dotenv()
 
 router = APIRouter()
+job_service = SyncJobService()
 
-SCHEMA_NAME = os.getenv("DB_SCHEMA", "more_house")
-
-# Track last sync state
-_last_sync = {
-    "status": "idle",
-    "last_synced_at": None,
-    "result": None,
-}
+# Started/stopped by the app lifespan in backend/main.py
+scheduler = SyncScheduler(
+    interval_minutes=float(os.getenv("SYNC_INTERVAL_MINUTES", 15)),
+    jitter_seconds=float(os.getenv("SYNC_JITTER_SECONDS", 60)),
+    nightly_hour=int(os.getenv("SYNC_NIGHTLY_HOUR", 3)),
+    max_active_queries=int(os.getenv("SYNC_MAX_ACTIVE_QUERIES", 10)),
+    stale_after_minutes=float(os.getenv("SYNC_STALE_AFTER_MINUTES", 60)),
+    enabled=os.getenv("SYNC_SCHEDULER_ENABLED", "true").lower() == "true",
+)
 
+events = SyncEventBroadcaster()
 
-def _get_db_counts():
-    """Get current row counts from database."""
-    conn = psycopg2.connect(dsn=os.getenv("TIMESCALE_SERVICE_URL"))
-    cur = conn.cursor()
-    cur.execute(f"SET search_path TO {SCHEMA_NAME}, public")
+SCHEMA_NAME = os.getenv("DB_SCHEMA", "more_house")
+SYNCED_TABLES = ["rooms", "contracts", "payment_schedule", "payments_received", "leads"]
 
-    counts = {}
-    for table in ["rooms", "contracts", "payment_schedule", "payments_received"]:
-        cur.execute(f"SELECT COUNT(*) FROM {table}")
-        counts[table] = cur.fetchone()[0]
+# Monday board metadata changes rarely; don't spend API quota on every status poll
+BOARD_INFO_TTL_SECONDS = float(os.getenv("SYNC_BOARD_INFO_TTL_SECONDS", 300))
+SSE_KEEPALIVE_SECONDS = 15
 
-    cur.close()
-    conn.close()
-    return counts
+board_info_cache = StaleWhileRevalidateCache("monday_boards", ttl_seconds=BOARD_INFO_TTL_SECONDS)
+_counts_cache = {"job_id": None, "counts": None}
 
 
 def _get_monday_board_info():
@@ -41,84 +48,231 @@ def _get_monday_board_info():
     from integrations.monday_client import MondayClient
     client = MondayClient()
 
-    query = '''
-    query ($boardIds: [ID!]) {
-        boards(ids: $boardIds) {
-            id
-            name
-            updated_at
-            items_count
-        }
-    }
-    '''
     board_ids = [client.contracts_board_id, client.payments_board_id]
-    result = client._execute_query(query, {'boardIds': board_ids})
-    return result.get('boards', [])
+    boards = client.get_boards_items(board_ids, with_items=False)
+    return [boards[board_id]['board'] for board_id in board_ids if boards[board_id]['board']]
+
+
+def _get_cached_board_info():
+    """Board metadata, refreshed from Monday in the background every BOARD_INFO_TTL_SECONDS."""
+    boards, _ = board_info_cache.get(_get_monday_board_info)
+    return boards
+
+
+def _get_estimated_counts():
+    """Planner row estimates from pg_class (no table scans)."""
+    from utils.db_connection import execute_query
+
+    query = """
+        SELECT c.relname as table_name, GREATEST(c.reltuples, 0)::bigint as estimate
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = ANY(%s)
+    """
+    rows = execute_query(query, (SCHEMA_NAME, SYNCED_TABLES))
+    return {row["table_name"]: row["estimate"] for row in rows}
 
 
-def _run_sync():
-    """Run the actual sync in background."""
+def _get_cached_counts(latest_job):
+    """
+    Row counts as recorded by the most recent completed sync.
+
+    Rows are added and removed in bulk by syncs, so the counts a sync records
+    at commit stay accurate until the next one.
+    Falls back to pg_class estimates until a sync has recorded its counts.
+    """
+    result = (latest_job or {}).get("result") or {}
+    if latest_job and latest_job["status"] == "completed" and result.get("counts"):
+        _counts_cache["job_id"] = latest_job["id"]
+        _counts_cache["counts"] = result["counts"]
+    elif _counts_cache["counts"] is None:
+        _counts_cache["counts"] = _get_estimated_counts()
+    return _counts_cache["counts"]
+
+
+def _run_sync(job):
+    """Run the actual sync in background, reporting progress to the job."""
     import sys
     from pathlib import Path
     project_root = Path(__file__).resolve().parent.parent.parent
     sys.path.insert(0, str(project_root))
 
-    _last_sync["status"] = "syncing"
-    _last_sync["result"] = None
-
     try:
-        before = _get_db_counts()
-
-        from scripts.sync_monday import sync_rooms_from_monday, sync_from_monday
-        room_stats = sync_rooms_from_monday()
-        contract_stats = sync_from_monday()
-
-        after = _get_db_counts()
-
-        _last_sync["status"] = "completed"
-        _last_sync["last_synced_at"] = datetime.utcnow().isoformat() + "Z"
-        _last_sync["result"] = {
-            "rooms": room_stats,
-            "contracts": contract_stats,
-            "before": before,
-            "after": after,
-            "changes": {
-                table: after[table] - before[table]
-                for table in before
-            }
-        }
-    except Exception as e:
-        _last_sync["status"] = "error"
-        _last_sync["result"] = {"error": str(e)}
+        run_sync_job(job)
+    except Exception:
+        pass  # Recorded on the job by run_sync_job
 
 
 @router.get("/status")
-async def get_sync_status():
-    """Get current sync status and Monday board info."""
+def get_sync_status():
+    """
+    Get current sync status and Monday board info.
+
+    Cheap enough to poll: board info is cached, row counts come from the last
+    sync, and the only query is for the latest job. Prefer /events for progress.
+
+    `profile` is the latest job's performance report: wall/CPU time per phase,
+    rows per second, and Monday requests, bytes and complexity.
+    """
     boards = []
     try:
-        boards = _get_monday_board_info()
+        boards = _get_cached_board_info()
     except Exception:
         pass
 
+    latest = job_service.get_latest()
+
     db_counts = {}
     try:
-        db_counts = _get_db_counts()
+        db_counts = _get_cached_counts(latest)
     except Exception:
         pass
 
+    data_age = scheduler.data_age_seconds()
     return {
-        "sync": _last_sync,
+        "sync": SyncJobService.as_legacy_status(latest),
+        "data_age_seconds": round(data_age) if data_age is not None else None,
+        "stale": scheduler.is_stale(),
+        "scheduler": scheduler.status(),
+        "profile": ((latest or {}).get("result") or {}).get("profile"),
         "boards": boards,
         "db_counts": db_counts,
     }
 
 
+@router.get("/events")
+async def sync_events(request: Request):
+    """
+    Server-Sent Events stream of sync progress.
+
+    Sends the current status on connect, then a `progress` event for each
+    update of any sync job (phase, items, pages, status). Idle streams only
+    receive keep-alive comments.
+    """
+    async def stream():
+        queue = events.subscribe()
+        try:
+            latest = await asyncio.to_thread(job_service.get_latest)
+            status = jsonable_encoder(SyncJobService.as_legacy_status(latest))
+            yield f"event: status\ndata: {json.dumps(status)}\n\n"
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/run")
 async def run_sync(background_tasks: BackgroundTasks):
-    """Trigger a Monday sync."""
-    if _last_sync["status"] == "syncing":
+    """Trigger a Monday sync. Only one sync runs at a time across all workers."""
+    job = job_service.start_job(kind='incremental', triggered_by='manual')
+    if not job:
         return {"status": "already_syncing"}
 
-    background_tasks.add_task(_run_sync)
-    return {"status": "started"}
+    background_tasks.add_task(_run_sync, job)
+    return {"status": "started", "job_id": job.id}
+
+
+@router.get("/quarantine")
+def get_quarantine(
+    reason: Optional[str] = Query(None, description="Filter by reason code, e.g. missing_dates"),
+    board_id: Optional[str] = Query(None, description="Filter by Monday board id"),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """
+    Monday items the last sync rejected or only partly parsed, with a reason code.
+
+    Reasons: missing_name, missing_unit, missing_dates, invalid_dates,
+    unknown_room, unparseable_date, unparseable_number, unparseable_timeline.
+    """
+    from utils.db_connection import execute_query
+
+    filters = []
+    params = []
+    if reason:
+        filters.append("reason = %s")
+        params.append(reason)
+    if board_id:
+        filters.append("board_id = %s")
+        params.append(board_id)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+    try:
+        summary = execute_query(f"""
+            SELECT reason, COUNT(*) as count
+            FROM sync_quarantine
+            {where}
+            GROUP BY reason
+            ORDER BY count DESC
+        """, tuple(params))
+        items = execute_query(f"""
+            SELECT board_id, monday_id, item_name, reason, field, raw_value, detail,
+                   first_seen_at, last_seen_at
+            FROM sync_quarantine
+            {where}
+            ORDER BY reason, item_name
+            LIMIT %s
+        """, tuple(params + [limit]))
+    except Exception:
+        return {"summary": [], "items": []}
+
+    return {"summary": summary, "items": items}
+
+
+@router.get("/unknown-rooms")
+def get_unknown_rooms():
+    """
+    Data quality: placeholder ('TBD') rooms created for contract units that
+    match no room on the Unit Schedule board, with the contracts using them.
+    """
+    from utils.db_connection import execute_query
+
+    query = """
+        SELECT
+            r.room_id,
+            r.created_at,
+            COUNT(c.id) as contracts,
+            COALESCE(
+                json_agg(json_build_object(
+                    'monday_id', c.monday_id,
+                    'resident_name', c.resident_name,
+                    'start_date', c.start_date
+                ) ORDER BY c.start_date) FILTER (WHERE c.id IS NOT NULL),
+                '[]'
+            ) as contract_list
+        FROM rooms r
+        LEFT JOIN contracts c ON c.room_id = r.room_id AND c.status <> 'deleted'
+        WHERE r.floor = 'TBD' AND r.category = 'TBD'
+        GROUP BY r.room_id, r.created_at
+        ORDER BY contracts DESC, r.room_id
+    """
+    try:
+        return execute_query(query)
+    except Exception:
+        return []
+
+
+@router.get("/jobs")
+async def list_sync_jobs(limit: int = Query(20, ge=1, le=200, description="Number of jobs to return")):
+    """Sync job history, most recent first, with phase, progress, timings and errors."""
+    return job_service.list_jobs(limit)
+
+
+@router.get("/jobs/{job_id}")
+async def get_sync_job(job_id: int):
+    """A single sync job."""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,6 +1,7 @@
 # backend/main.py
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -10,15 +11,36 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from backend.api import occupancy, cashflow, sync, activity
+from backend.api import occupancy, cashflow, sync, activity, monday
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Scheduled Monday syncs (incremental on an interval, full nightly)
+    sync.scheduler.start()
+    yield
+    await sync.scheduler.stop()
+
 
 app = FastAPI(
     title="More House API",
     description="Occupancy and Cash Flow Management for More House",
     version="0.1.0",
     root_path=os.getenv("ROOT_PATH", ""),
+    lifespan=lifespan,
 )
 
+
+@app.middleware("http")
+async def add_data_age_header(request: Request, call_next):
+    """Tell API clients how old the synced Monday data is."""
+    response = await call_next(request)
+    data_age = sync.scheduler.data_age_seconds()
+    if request.url.path.startswith("/api/") and data_age is not None:
+        response.headers["X-Data-Age"] = str(round(data_age))
+        response.headers["X-Data-Stale"] = "true" if sync.scheduler.is_stale() else "false"
+    return response
+
 # CORS for React frontend
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +55,7 @@ app.include_router(occupancy.router, prefix="/api/occupancy", tags=["Occupancy"]
 app.include_router(cashflow.router, prefix="/api/cashflow", tags=["Cash Flow"])
 app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])
 app.include_router(activity.router, prefix="/api/activity", tags=["Activity"])
+app.include_router(monday.router, prefix="/api/monday", tags=["Monday"])
 
 
 @app.get("/api/health")
@@ -14,6 +14,7 @@ class ContractStatus(str, Enum):
     ENDING = "ending"
     TERMINATED = "terminated"
     COMPLETED = "completed"
+    DELETED = "deleted"  # removed from the Monday Won Deals board (soft-deleted by the sync)
 
 
 class PaymentPlan(str, Enum):
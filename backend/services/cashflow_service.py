@@ -3,6 +3,9 @@
 from datetime import date, datetime, timedelta
 from typing import Optional, List, Dict
 import logging
+import pandas as pd
+
+from backend.models.schemas import PaymentPlan
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,34 @@ class CashFlowService:
     - Special Payment Terms: Custom schedule
     """
 
+    # opex_budget sources: the Main Budget sheet and the Cash Flow FC forecast
+    OPEX_SOURCES = ("budget", "forecast")
+
+    # The newest imported budget version of a source, used when none is asked for
+    LATEST_OPEX_VERSION_SQL = """
+        SELECT budget_version FROM more_house.opex_budget
+        WHERE source = %(opex_source)s
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1
+    """
+
+    # Termly installment due dates (month, day), in academic year order. An
+    # academic year starts in August: Jan-Jul dates fall in its second year.
+    TERM_DATES = ((8, 1), (10, 9), (1, 9), (4, 10))
+    ACADEMIC_YEAR_START_MONTH = 8
+
+    # Generated schedules: booking fee (weeks of rent), how early before
+    # move-in an installment may fall due, and the fewest days of a stay left
+    # for a later term to get its own installment
+    BOOKING_FEE_WEEKS = 1
+    MAX_DAYS_DUE_BEFORE_START = 31
+    MIN_TERM_DAYS = 31
+
+    _STANDARD_PLANS = {PaymentPlan.INSTALLMENTS.value, PaymentPlan.SINGLE_PAYMENT.value, PaymentPlan.STUDENTLUXE.value}
+
+    # Columns of generate_payment_schedules' frame, as in payment_schedule
+    SCHEDULE_COLUMNS = ["contract_id", "installment_number", "due_date", "amount", "status", "notes"]
+
     INSTALLMENT_LABELS = {
         0: "Booking Fee",
         1: "Installment 1",
@@ -35,6 +66,100 @@ class CashFlowService:
     def __init__(self):
         pass
 
+    @classmethod
+    def generate_payment_schedules(cls, contracts: pd.DataFrame) -> pd.DataFrame:
+        """
+        Expected payment schedules of many contracts at once, for contracts
+        with no actual schedule (e.g. imported from the occupancy report).
+
+        Args:
+            contracts: contract_id, start_date, end_date, total_value,
+                weekly_rate and payment_plan; sign_date if known
+
+        Returns:
+            payment_schedule rows (SCHEDULE_COLUMNS), ready for a COPY
+
+        Rules, by payment plan:
+        - Installments: booking fee, then one installment per term (TERM_DATES)
+          of the stay; a term with under MIN_TERM_DAYS of the stay left is
+          paid with the one before
+        - Single Payment: booking fee, then the rest on the first term date
+        - Studentluxe: one agent remittance per term, no booking fee
+        - Special Payment Terms (and unknown plans): custom terms aren't
+          known, so scheduled as Installments and noted as assumed
+        The booking fee is BOOKING_FEE_WEEKS of rent, due at signing (or with
+        the first installment when the sign date is unknown). An installment
+        is never due more than MAX_DAYS_DUE_BEFORE_START before move-in. The
+        rest of the contract value is split evenly, the last installment
+        taking the rounding, so each schedule adds up to total_value.
+        Contracts without a value or valid dates get no schedule.
+        """
+        c = contracts.reindex(columns=[
+            "contract_id", "start_date", "end_date", "total_value", "weekly_rate", "payment_plan", "sign_date",
+        ])
+        for column in ("start_date", "end_date", "sign_date"):
+            c[column] = pd.to_datetime(c[column], errors="coerce")
+        c["total_value"] = pd.to_numeric(c["total_value"], errors="coerce")
+        c = c[
+            (c["total_value"] > 0) & c["start_date"].notna() & c["end_date"].notna()
+            & (c["end_date"] >= c["start_date"])
+        ]
+        if c.empty:
+            return pd.DataFrame(columns=cls.SCHEDULE_COLUMNS)
+
+        plan = c["payment_plan"].fillna("")
+        c = c.assign(
+            ay=c["start_date"].dt.year - (c["start_date"].dt.month < cls.ACADEMIC_YEAR_START_MONTH),
+            fee=(pd.to_numeric(c["weekly_rate"], errors="coerce").fillna(0) * cls.BOOKING_FEE_WEEKS)
+                .clip(upper=c["total_value"]).round(2)
+                .where(plan != PaymentPlan.STUDENTLUXE.value, 0),
+            single=plan == PaymentPlan.SINGLE_PAYMENT.value,
+            notes=plan.map(lambda p: "generated" if p in cls._STANDARD_PLANS
+                           else "generated (custom terms unknown: termly schedule assumed)"),
+        )
+
+        # Every contract x every term of the academic years its stay spans;
+        # a term runs from its date to the next term's
+        years = int((c["end_date"].dt.year - c["ay"]).max()) + 1
+        terms = pd.DataFrame([
+            {"year": y + (month < cls.ACADEMIC_YEAR_START_MONTH), "month": month, "day": day, "term": y * 4 + k}
+            for y in range(years + 1) for k, (month, day) in enumerate(cls.TERM_DATES)
+        ])
+        rows = c.merge(terms, how="cross")
+        rows["term_date"] = pd.to_datetime(pd.DataFrame({
+            "year": rows["ay"] + rows["year"], "month": rows["month"], "day": rows["day"],
+        }))
+        rows = rows.sort_values(["contract_id", "term"], kind="stable")
+        term_end = rows.groupby("contract_id")["term_date"].shift(-1)
+        first_term = rows["term_date"] <= rows["start_date"]
+        long_enough = rows["term_date"] <= rows["end_date"] - pd.Timedelta(days=cls.MIN_TERM_DAYS)
+        rows = rows[(term_end > rows["start_date"]) & (first_term | long_enough)]
+
+        earliest = rows["start_date"] - pd.Timedelta(days=cls.MAX_DAYS_DUE_BEFORE_START)
+        rows = rows.assign(due_date=rows["term_date"].where(rows["term_date"] >= earliest, earliest))
+        rows["installment_number"] = rows.groupby("contract_id").cumcount() + 1
+        rows = rows[~rows["single"] | (rows["installment_number"] == 1)]
+
+        # Even split of what the booking fee leaves; the last one takes the rounding
+        count = rows.groupby("contract_id")["installment_number"].transform("max")
+        rest = rows["total_value"] - rows["fee"]
+        share = (rest / count).round(2)
+        rows["amount"] = share.where(rows["installment_number"] < count, (rest - share * (count - 1)).round(2))
+
+        installments = rows
+        fees = c[c["fee"] > 0].merge(
+            rows.loc[rows["installment_number"] == 1, ["contract_id", "due_date"]], on="contract_id"
+        )
+        fees = fees.assign(
+            installment_number=0,
+            due_date=fees["sign_date"].fillna(fees["due_date"]),
+            amount=fees["fee"],
+        )
+
+        schedule = pd.concat([fees, installments], ignore_index=True).assign(status="pending")
+        schedule["installment_number"] = schedule["installment_number"].astype("int16")
+        return schedule.sort_values(["contract_id", "installment_number"], ignore_index=True)[cls.SCHEDULE_COLUMNS]
+
     def get_summary(self) -> Dict:
         """Get current cash flow summary."""
         try:
@@ -47,27 +172,33 @@ class CashFlowService:
             # Expected inflows this month
             query = """
                 SELECT
-                    COALESCE(SUM(amount), 0) as expected_inflows,
+                    COALESCE(SUM(ps.amount), 0) as expected_inflows,
                     COUNT(*) as payment_count
-                FROM more_house.payment_schedule
-                WHERE due_date >= %s AND due_date < %s
-                AND status = 'pending'
+                FROM more_house.payment_schedule ps
+                JOIN more_house.contracts c ON c.id = ps.contract_id
+                WHERE ps.due_date >= %s AND ps.due_date < %s
+                AND ps.status = 'pending'
+                AND c.status <> 'deleted'
             """
             result = execute_query(query, (month_start, next_month))
 
             # Actual received this month
             received_query = """
-                SELECT COALESCE(SUM(amount), 0) as received
-                FROM more_house.payments_received
-                WHERE payment_date >= %s AND payment_date < %s
+                SELECT COALESCE(SUM(pr.amount), 0) as received
+                FROM more_house.payments_received pr
+                JOIN more_house.contracts c ON c.id = pr.contract_id
+                WHERE pr.payment_date >= %s AND pr.payment_date < %s
+                AND c.status <> 'deleted'
             """
             received = execute_query(received_query, (month_start, next_month))
 
             # Overdue amount
             overdue_query = """
-                SELECT COALESCE(SUM(amount), 0) as overdue
-                FROM more_house.payment_schedule
-                WHERE due_date < %s AND status = 'pending'
+                SELECT COALESCE(SUM(ps.amount), 0) as overdue
+                FROM more_house.payment_schedule ps
+                JOIN more_house.contracts c ON c.id = ps.contract_id
+                WHERE ps.due_date < %s AND ps.status = 'pending'
+                AND c.status <> 'deleted'
             """
             overdue = execute_query(overdue_query, (today,))
 
@@ -92,9 +223,16 @@ class CashFlowService:
     def get_monthly_cashflow(
         self,
         start_month: Optional[str] = None,
-        end_month: Optional[str] = None
+        end_month: Optional[str] = None,
+        budget_version: Optional[str] = None,
+        opex_source: str = "budget"
     ) -> List[Dict]:
-        """Get monthly cash flow projection."""
+        """
+        Get monthly cash flow projection.
+
+        Outflows are the OPEX of one budget version (default: the latest
+        imported) from `opex_source` ('budget' or 'forecast').
+        """
         try:
             from utils.db_connection import execute_query
 
@@ -104,28 +242,32 @@ class CashFlowService:
                 end_date = date.today() + timedelta(days=365)
                 end_month = end_date.strftime("%Y-%m")
 
-            query = """
+            query = f"""
                 WITH months AS (
                     SELECT generate_series(
-                        %s::date,
-                        %s::date,
+                        %(start)s::date,
+                        %(end)s::date,
                         '1 month'::interval
                     )::date as month_start
                 ),
                 monthly_expected AS (
                     SELECT
-                        DATE_TRUNC('month', due_date)::date as month,
-                        SUM(amount) as expected,
+                        DATE_TRUNC('month', ps.due_date)::date as month,
+                        SUM(ps.amount) as expected,
                         COUNT(*) as payment_count
-                    FROM more_house.payment_schedule
-                    WHERE due_date IS NOT NULL
+                    FROM more_house.payment_schedule ps
+                    JOIN more_house.contracts c ON c.id = ps.contract_id
+                    WHERE ps.due_date IS NOT NULL
+                    AND c.status <> 'deleted'
                     GROUP BY 1
                 ),
                 monthly_received AS (
                     SELECT
-                        DATE_TRUNC('month', payment_date)::date as month,
-                        SUM(amount) as received
-                    FROM more_house.payments_received
+                        DATE_TRUNC('month', pr.payment_date)::date as month,
+                        SUM(pr.amount) as received
+                    FROM more_house.payments_received pr
+                    JOIN more_house.contracts c ON c.id = pr.contract_id
+                    WHERE c.status <> 'deleted'
                     GROUP BY 1
                 ),
                 monthly_opex AS (
@@ -133,6 +275,8 @@ class CashFlowService:
                         DATE_TRUNC('month', month_date)::date as month,
                         SUM(amount) as outflows
                     FROM more_house.opex_budget
+                    WHERE source = %(opex_source)s
+                    AND budget_version = COALESCE(%(budget_version)s, ({self.LATEST_OPEX_VERSION_SQL}))
                     GROUP BY 1
                 )
                 SELECT
@@ -150,7 +294,76 @@ class CashFlowService:
                 LEFT JOIN monthly_opex o ON o.month = m.month_start
                 ORDER BY m.month_start
             """
-            return execute_query(query, (f"{start_month}-01", f"{end_month}-01"))
+            return execute_query(query, {
+                "start": f"{start_month}-01",
+                "end": f"{end_month}-01",
+                "budget_version": budget_version,
+                "opex_source": opex_source,
+            })
+        except Exception as e:
+            logger.warning(f"DB not ready: {e}")
+            return []
+
+    def get_opex_versions(self) -> List[Dict]:
+        """Imported OPEX budget versions per source, newest first, with their totals."""
+        try:
+            from utils.db_connection import execute_query
+
+            query = """
+                SELECT
+                    budget_version,
+                    source,
+                    TO_CHAR(MIN(month_date), 'YYYY-MM') as first_month,
+                    TO_CHAR(MAX(month_date), 'YYYY-MM') as last_month,
+                    COUNT(DISTINCT category) as categories,
+                    SUM(amount) as total,
+                    MAX(created_at) as imported_at
+                FROM more_house.opex_budget
+                GROUP BY budget_version, source
+                ORDER BY imported_at DESC, budget_version, source
+            """
+            return execute_query(query)
+        except Exception as e:
+            logger.warning(f"DB not ready: {e}")
+            return []
+
+    def get_opex_comparison(
+        self,
+        versions: List[str],
+        opex_source: str = "budget",
+        by_category: bool = False
+    ) -> List[Dict]:
+        """
+        OPEX of several budget versions side by side: one row per month (and
+        category, if `by_category`) with an amount per version.
+        """
+        try:
+            from utils.db_connection import execute_query
+
+            group = "month_date, category" if by_category else "month_date"
+            query = f"""
+                SELECT
+                    TO_CHAR(month_date, 'YYYY-MM') as month,
+                    {"category," if by_category else ""}
+                    budget_version,
+                    SUM(amount) as amount
+                FROM more_house.opex_budget
+                WHERE source = %s AND budget_version = ANY(%s)
+                GROUP BY {group}, budget_version
+                ORDER BY {group}
+            """
+            rows = execute_query(query, (opex_source, versions))
+
+            compared = {}
+            for r in rows:
+                key = (r['month'], r.get('category'))
+                row = compared.setdefault(key, {
+                    'month': r['month'],
+                    **({'category': r['category']} if by_category else {}),
+                    'amounts': dict.fromkeys(versions, 0),
+                })
+                row['amounts'][r['budget_version']] = float(r['amount'])
+            return list(compared.values())
         except Exception as e:
             logger.warning(f"DB not ready: {e}")
             return []
@@ -177,11 +390,13 @@ class CashFlowService:
                 ),
                 weekly_expected AS (
                     SELECT
-                        DATE_TRUNC('week', due_date)::date as week,
-                        SUM(amount) as expected,
+                        DATE_TRUNC('week', ps.due_date)::date as week,
+                        SUM(ps.amount) as expected,
                         COUNT(*) as payment_count
-                    FROM more_house.payment_schedule
-                    WHERE due_date IS NOT NULL
+                    FROM more_house.payment_schedule ps
+                    JOIN more_house.contracts c ON c.id = ps.contract_id
+                    WHERE ps.due_date IS NOT NULL
+                    AND c.status <> 'deleted'
                     GROUP BY 1
                 )
                 SELECT
@@ -227,6 +442,7 @@ class CashFlowService:
                 FROM more_house.payment_schedule ps
                 JOIN more_house.contracts c ON c.id = ps.contract_id
                 WHERE ps.due_date BETWEEN %s AND %s
+                AND c.status <> 'deleted'
                 ORDER BY ps.due_date, c.resident_name
             """
             results = execute_query(query, (start_date, end_date))
@@ -261,6 +477,7 @@ class CashFlowService:
                 JOIN more_house.contracts c ON c.id = ps.contract_id
                 WHERE ps.status = 'pending'
                 AND ps.due_date < CURRENT_DATE
+                AND c.status <> 'deleted'
                 ORDER BY ps.due_date
             """
             results = execute_query(query)
@@ -289,6 +506,7 @@ class CashFlowService:
                     SUM(CASE WHEN ps.status = 'paid' THEN ps.amount ELSE 0 END) as paid_amount
                 FROM more_house.contracts c
                 LEFT JOIN more_house.payment_schedule ps ON ps.contract_id = c.id
+                WHERE c.status <> 'deleted'
                 GROUP BY c.payment_plan
                 ORDER BY total_value DESC
             """
@@ -304,14 +522,16 @@ class CashFlowService:
 
             query = """
                 SELECT
-                    TO_CHAR(due_date, 'YYYY-MM') as month,
+                    TO_CHAR(ps.due_date, 'YYYY-MM') as month,
                     COUNT(*) as num_payments,
-                    SUM(amount) as total_expected,
-                    SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) as total_paid,
-                    SUM(CASE WHEN status != 'paid' THEN amount ELSE 0 END) as outstanding
-                FROM more_house.payment_schedule
-                WHERE due_date IS NOT NULL
-                GROUP BY TO_CHAR(due_date, 'YYYY-MM')
+                    SUM(ps.amount) as total_expected,
+                    SUM(CASE WHEN ps.status = 'paid' THEN ps.amount ELSE 0 END) as total_paid,
+                    SUM(CASE WHEN ps.status != 'paid' THEN ps.amount ELSE 0 END) as outstanding
+                FROM more_house.payment_schedule ps
+                JOIN more_house.contracts c ON c.id = ps.contract_id
+                WHERE ps.due_date IS NOT NULL
+                AND c.status <> 'deleted'
+                GROUP BY TO_CHAR(ps.due_date, 'YYYY-MM')
                 ORDER BY month
             """
             return execute_query(query)
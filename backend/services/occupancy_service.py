@@ -353,6 +353,7 @@ class OccupancyService:
                     status
                 FROM more_house.contracts
                 WHERE room_id = %s
+                AND status <> 'deleted'
                 ORDER BY start_date
             """
             bookings = execute_query(query, (room_id,))
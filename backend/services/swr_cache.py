@@ -0,0 +1,119 @@
+# backend/services/swr_cache.py
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self):
+        self.value: Any = None
+        self.fetched_at: Optional[float] = None
+        self.invalidated_at: Optional[float] = None
+        # Set while a fetch is in flight; waiters block on it
+        self.inflight: Optional[threading.Event] = None
+        self.error: Optional[BaseException] = None
+
+
+class StaleWhileRevalidateCache:
+    """
+    Stale-while-revalidate cache for slow or flaky upstream calls.
+
+    - A value younger than `ttl_seconds` is served as is
+    - An older value is still served immediately, and one background thread
+      refreshes it; if the refresh fails the old value keeps being served
+    - With no value yet, concurrent callers coalesce into a single fetch
+      (single-flight) and all get its result or its exception
+
+    get() returns (value, data_age_seconds). Endpoints are plain `def`s run in
+    FastAPI's thread pool, so this is thread-based rather than asyncio-based.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "fetches": 0,
+            "errors": 0,
+            "last_error": None,
+        }
+
+    def get(self, fetch: Callable[[], Any], key: Hashable = None) -> Tuple[Any, float]:
+        """Cached value for `key` (fetched with `fetch()`) and its age in seconds."""
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            now = time.monotonic()
+
+            if entry.fetched_at is not None:
+                age = now - entry.fetched_at
+                invalidated = entry.invalidated_at is not None and entry.invalidated_at >= entry.fetched_at
+                if age <= self.ttl_seconds and not invalidated:
+                    self.stats["hits"] += 1
+                elif entry.inflight is None:
+                    self.stats["stale_hits"] += 1
+                    entry.inflight = threading.Event()
+                    threading.Thread(
+                        target=self._fetch, args=(entry, fetch),
+                        name=f"swr-{self.name}", daemon=True,
+                    ).start()
+                else:
+                    self.stats["stale_hits"] += 1
+                return entry.value, age
+
+            self.stats["misses"] += 1
+            leader = entry.inflight is None
+            if leader:
+                entry.inflight = threading.Event()
+            event = entry.inflight
+
+        if leader:
+            self._fetch(entry, fetch)
+        else:
+            event.wait()
+
+        with self._lock:
+            if entry.fetched_at is None:
+                raise entry.error
+            return entry.value, time.monotonic() - entry.fetched_at
+
+    def invalidate(self, key: Hashable = None):
+        """
+        Mark a value as stale: the next get() serves it and refreshes it.
+
+        Used when the source is known to have changed (e.g. after a sync).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.invalidated_at = time.monotonic()
+
+    def _fetch(self, entry: _Entry, fetch: Callable[[], Any]):
+        started = time.monotonic()
+        try:
+            value = fetch()
+        except Exception as e:
+            logger.warning(f"{self.name} cache refresh failed: {e}")
+            with self._lock:
+                entry.error = e
+                self.stats["errors"] += 1
+                self.stats["last_error"] = str(e)
+        else:
+            with self._lock:
+                entry.value = value
+                # Age counts from when the fetch started: the data is at least that old
+                entry.fetched_at = started
+                entry.error = None
+        finally:
+            with self._lock:
+                self.stats["fetches"] += 1
+                event, entry.inflight = entry.inflight, None
+            event.set()
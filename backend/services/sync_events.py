@@ -0,0 +1,128 @@
+# backend/services/sync_events.py
+
+import asyncio
+import json
+from typing import Dict, Optional, Set
+import logging
+
+from backend.services.sync_job_service import NOTIFY_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to (re)open the LISTEN connection
+RECONNECT_DELAYS = (1, 2, 5, 10, 30)
+
+
+class SyncEventBroadcaster:
+    """
+    Fans sync job progress out to Server-Sent Events clients.
+
+    Sync jobs publish their progress with pg_notify (see SyncJob._notify), so a
+    sync running in any worker, the scheduler or the CLI reaches every client.
+    Each worker holds a single LISTEN connection, opened when the first client
+    subscribes and closed when the last one leaves; no polling is involved.
+    Events published while the connection is down are missed: clients
+    re-read the status when their stream reconnects.
+    """
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._conn = None
+        self._connecting: Optional[asyncio.Task] = None
+        self.last_event: Optional[Dict] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queued)
+        self._subscribers.add(queue)
+        self._ensure_listening()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers:
+            self._close()
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _ensure_listening(self):
+        if self._conn is None and (self._connecting is None or self._connecting.done()):
+            self._connecting = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        """
+        Open the LISTEN connection, off the event loop. Retries with backoff
+        for as long as clients are subscribed, so a database that is down at
+        startup or drops the connection later is picked up when it returns.
+        """
+        attempt = 0
+        while self._subscribers:
+            try:
+                conn = await asyncio.to_thread(self._connect)
+            except Exception as e:
+                delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+                logger.warning(f"Sync events unavailable, retrying in {delay}s: {e}")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if not self._subscribers:
+                # Every client left while connecting
+                conn.close()
+                return
+            self._conn = conn
+            asyncio.get_running_loop().add_reader(conn.fileno(), self._on_notify)
+            if attempt:
+                logger.info(f"Sync events reconnected after {attempt} failed attempts")
+            return
+
+    @staticmethod
+    def _connect():
+        from utils.db_connection import get_db_connection
+
+        conn = get_db_connection()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _close(self):
+        if self._conn is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._conn.fileno())
+            self._conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing sync events connection: {e}")
+        self._conn = None
+
+    def _on_notify(self):
+        try:
+            self._conn.poll()
+        except Exception as e:
+            logger.error(f"Sync events connection lost: {e}")
+            self._close()
+            # Subscribers stay registered and get events again once reconnected
+            self._ensure_listening()
+            return
+
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self.last_event = event
+            self._publish(event)
+
+    def _publish(self, event: Dict):
+        for queue in self._subscribers:
+            if queue.full():
+                # A slow client only needs the latest progress
+                queue.get_nowait()
+            queue.put_nowait(event)
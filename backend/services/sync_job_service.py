@@ -0,0 +1,269 @@
+# backend/services/sync_job_service.py
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, List, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock key held by whichever process is running a sync.
+# Any constant works as long as every runner uses the same one.
+SYNC_LOCK_KEY = 8606133913
+
+# Minimum seconds between progress writes within one phase
+PROGRESS_WRITE_INTERVAL = 0.5
+
+# Postgres NOTIFY channel carrying job progress (see sync_events.py)
+NOTIFY_CHANNEL = 'sync_progress'
+
+
+class SyncJob:
+    """
+    A running sync, tracked in the sync_jobs table.
+
+    Holds its own autocommit connection, which also holds the sync advisory
+    lock until finish()/fail() (or until the process dies and the connection
+    drops), so only one sync runs at a time across all uvicorn workers.
+    """
+
+    def __init__(self, conn, job_id: int, kind: str = 'full'):
+        self.conn = conn
+        self.id = job_id
+        self.kind = kind
+        self.phase = None
+        self.items_processed = 0
+        self.pages_fetched = 0
+        self.timings: Dict[str, float] = {}
+        self._phase_started = time.perf_counter()
+        self._last_write = 0.0
+
+    def report(self, phase: str, items: int = 0, pages: int = 0):
+        """Record progress: switch to `phase` and add items/pages processed."""
+        now = time.perf_counter()
+        phase_changed = phase != self.phase
+        if phase_changed:
+            self._close_phase(now)
+            self.phase = phase
+
+        self.items_processed += items
+        self.pages_fetched += pages
+
+        if phase_changed or now - self._last_write >= PROGRESS_WRITE_INTERVAL:
+            self._write_progress()
+            self._last_write = now
+
+    def _close_phase(self, now: float):
+        if self.phase:
+            elapsed = now - self._phase_started
+            self.timings[self.phase] = round(self.timings.get(self.phase, 0) + elapsed, 3)
+        self._phase_started = now
+
+    def _write_progress(self):
+        from psycopg2.extras import Json
+
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE sync_jobs SET
+                    phase = %s,
+                    items_processed = %s,
+                    pages_fetched = %s,
+                    timings = %s,
+                    updated_at = NOW()
+                WHERE id = %s
+            """, (self.phase, self.items_processed, self.pages_fetched, Json(self.timings), self.id))
+            self._notify(cursor, 'running')
+
+    def _notify(self, cursor, status: str):
+        """Publish the job's progress to every worker listening on NOTIFY_CHANNEL."""
+        payload = json.dumps({
+            "id": self.id,
+            "kind": self.kind,
+            "status": status,
+            "phase": self.phase,
+            "items_processed": self.items_processed,
+            "pages_fetched": self.pages_fetched,
+        })
+        cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, payload))
+
+    def finish(self, result: Dict):
+        """Mark the job completed and release the sync lock."""
+        self._end('completed', result=result)
+
+    def fail(self, error: Exception):
+        """Mark the job failed and release the sync lock."""
+        logger.error(f"Sync job {self.id} failed: {error}")
+        self._end('error', error=str(error))
+
+    def _end(self, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        from psycopg2.extras import Json
+
+        self._close_phase(time.perf_counter())
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE sync_jobs SET
+                        status = %s,
+                        phase = %s,
+                        items_processed = %s,
+                        pages_fetched = %s,
+                        timings = %s,
+                        result = %s,
+                        error = %s,
+                        finished_at = NOW(),
+                        updated_at = NOW()
+                    WHERE id = %s
+                """, (
+                    status, 'done' if status == 'completed' else self.phase,
+                    self.items_processed, self.pages_fetched, Json(self.timings),
+                    Json(result) if result is not None else None, error, self.id
+                ))
+                if status == 'completed':
+                    self.phase = 'done'
+                self._notify(cursor, status)
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (SYNC_LOCK_KEY,))
+        finally:
+            self.conn.close()
+
+
+class SyncJobService:
+    """
+    Persistent sync job history and the single-runner guarantee.
+
+    Job rows live in the sync_jobs table, so every worker sees the same status.
+    """
+
+    def start_job(self, kind: str = 'full', triggered_by: str = 'manual') -> Optional[SyncJob]:
+        """
+        Take the sync lock and create a running job.
+
+        Returns None if another sync holds the lock.
+        """
+        from utils.db_connection import get_db_connection
+
+        conn = get_db_connection()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (SYNC_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                conn.close()
+                return None
+
+            # We hold the lock, so any job still marked running died with its worker
+            cursor.execute("""
+                UPDATE sync_jobs SET status = 'error', error = 'Interrupted', finished_at = NOW()
+                WHERE status = 'running'
+            """)
+
+            cursor.execute("""
+                INSERT INTO sync_jobs (kind, status, phase, triggered_by)
+                VALUES (%s, 'running', 'queued', %s)
+                RETURNING id
+            """, (kind, triggered_by))
+            job = SyncJob(conn, cursor.fetchone()[0], kind)
+            job._notify(cursor, 'running')
+
+        logger.info(f"Started sync job {job.id} ({kind}, {triggered_by})")
+        return job
+
+    @contextmanager
+    def try_lock(self):
+        """
+        Hold the sync lock, without a job, for a short sync that must not
+        overlap a running one (webhook item syncs). Yields False if another
+        sync holds the lock; it is released on exit.
+        """
+        from utils.db_connection import get_db_connection
+
+        conn = get_db_connection()
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", (SYNC_LOCK_KEY,))
+                locked = cursor.fetchone()[0]
+            try:
+                yield locked
+            finally:
+                if locked:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_advisory_unlock(%s)", (SYNC_LOCK_KEY,))
+        finally:
+            conn.close()
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """Most recent jobs first."""
+        try:
+            from utils.db_connection import execute_query
+
+            query = """
+                SELECT id, kind, status, phase, items_processed, pages_fetched,
+                       triggered_by, timings, result, error,
+                       started_at, finished_at, updated_at,
+                       EXTRACT(EPOCH FROM (COALESCE(finished_at, NOW()) - started_at)) as duration_seconds
+                FROM more_house.sync_jobs
+                ORDER BY started_at DESC
+                LIMIT %s
+            """
+            return execute_query(query, (limit,))
+        except Exception as e:
+            logger.warning(f"DB not ready: {e}")
+            return []
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        try:
+            from utils.db_connection import execute_query
+
+            query = """
+                SELECT id, kind, status, phase, items_processed, pages_fetched,
+                       triggered_by, timings, result, error,
+                       started_at, finished_at, updated_at,
+                       EXTRACT(EPOCH FROM (COALESCE(finished_at, NOW()) - started_at)) as duration_seconds
+                FROM more_house.sync_jobs
+                WHERE id = %s
+            """
+            result = execute_query(query, (job_id,))
+            return result[0] if result else None
+        except Exception as e:
+            logger.warning(f"DB not ready: {e}")
+            return None
+
+    def get_latest(self) -> Optional[Dict]:
+        jobs = self.list_jobs(limit=1)
+        return jobs[0] if jobs else None
+
+    def get_data_age_seconds(self) -> Optional[float]:
+        """Seconds since the most recent successful sync finished (None if never)."""
+        try:
+            from utils.db_connection import execute_query
+
+            query = """
+                SELECT EXTRACT(EPOCH FROM (NOW() - MAX(finished_at))) as age_seconds
+                FROM more_house.sync_jobs
+                WHERE status = 'completed'
+            """
+            result = execute_query(query)
+            age = result[0]["age_seconds"] if result else None
+            return float(age) if age is not None else None
+        except Exception as e:
+            logger.warning(f"DB not ready: {e}")
+            return None
+
+    @staticmethod
+    def as_legacy_status(job: Optional[Dict]) -> Dict:
+        """Shape a job like the old in-memory sync state the frontend reads."""
+        if not job:
+            return {"status": "idle", "last_synced_at": None, "result": None}
+
+        status = {"running": "syncing"}.get(job["status"], job["status"])
+        finished_at = job.get("finished_at")
+        return {
+            "status": status,
+            "last_synced_at": (
+                finished_at.isoformat() + "Z"
+                if job["status"] == "completed" and isinstance(finished_at, datetime) else None
+            ),
+            "result": {"error": job["error"]} if job["status"] == "error" else job.get("result"),
+            "job": job,
+        }
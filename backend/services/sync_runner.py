@@ -0,0 +1,71 @@
+# backend/services/sync_runner.py
+
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Called after every sync that committed, in this process
+_after_sync: List[Callable[[], None]] = []
+
+
+def after_sync(callback: Callable[[], None]) -> Callable[[], None]:
+    """
+    Register `callback()` to run after every successful sync: manual, scheduled,
+    webhook or CLI. Used to invalidate caches of synced data. Failures are
+    logged, not raised.
+    """
+    _after_sync.append(callback)
+    return callback
+
+
+def _synced():
+    for callback in _after_sync:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"After-sync hook {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+
+def run_sync_job(job, **sync_options) -> Dict:
+    """
+    Run a full sync (scripts.sync_monday.run_full_sync, with `sync_options`)
+    as `job`: progress is reported to it, and it is finished with the shared
+    job result (sync_job_result) or failed with the error, which is re-raised.
+    Any exit (including SystemExit or KeyboardInterrupt) fails the job, so it
+    never stays 'running' holding the sync lock.
+
+    Returns:
+        The job result
+    """
+    from scripts.sync_monday import run_full_sync, sync_job_result
+
+    try:
+        result = sync_job_result(run_full_sync(progress=job.report, **sync_options))
+        job.finish(result)
+    except BaseException as e:
+        job.fail(e)
+        raise
+
+    if not sync_options.get('dry_run'):
+        _synced()
+    return result
+
+
+def sync_items(board_id: str, item_ids: List[str]) -> Optional[Dict]:
+    """
+    Re-sync some items of a board (scripts.sync_monday.sync_items_from_monday)
+    under the sync lock, so it never overlaps a full sync writing the same rows.
+
+    Returns:
+        The sync stats, or None if another sync holds the lock (nothing done)
+    """
+    from backend.services.sync_job_service import SyncJobService
+    from scripts.sync_monday import sync_items_from_monday
+
+    with SyncJobService().try_lock() as locked:
+        if not locked:
+            return None
+        stats = sync_items_from_monday(board_id, item_ids)
+    _synced()
+    return stats
@@ -0,0 +1,195 @@
+# backend/services/sync_scheduler.py
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import logging
+
+from backend.services.sync_job_service import SyncJobService
+
+logger = logging.getLogger(__name__)
+
+# How often the data age is re-read from sync_jobs (covers syncs run by
+# other workers, the CLI or the sync button)
+DATA_AGE_REFRESH_SECONDS = 60
+
+
+class SyncScheduler:
+    """
+    Runs the Monday sync in the background of the API process.
+
+    - An incremental sync (unchanged contracts skipped by content hash) every
+      `interval_minutes`, plus up to `jitter_seconds` of random delay so several
+      workers/instances don't all fire at once
+    - A full sync (every contract rewritten) once a night at `nightly_hour`
+    - Runs are skipped while the database is busy (more than
+      `max_active_queries` other active queries), unless the data is older
+      than `stale_after_minutes`
+    - Every worker schedules, but the sync job lock lets only one run at a time
+    """
+
+    def __init__(
+        self,
+        interval_minutes: float = 15,
+        jitter_seconds: float = 60,
+        nightly_hour: Optional[int] = 3,
+        max_active_queries: int = 10,
+        stale_after_minutes: float = 60,
+        enabled: bool = True,
+    ):
+        self.interval_minutes = interval_minutes
+        self.jitter_seconds = jitter_seconds
+        self.nightly_hour = nightly_hour
+        self.max_active_queries = max_active_queries
+        self.stale_after_minutes = stale_after_minutes
+        self.enabled = enabled
+
+        self.job_service = SyncJobService()
+        self._task: Optional[asyncio.Task] = None
+        self._next_incremental: Optional[float] = None
+        self._next_nightly: Optional[datetime] = None
+
+        # Data age as last read from the DB, and when (monotonic) it was read
+        self._data_age: Optional[float] = None
+        self._data_age_read_at: Optional[float] = None
+
+        self.stats = {
+            "runs": 0,
+            "skipped_busy": 0,
+            "skipped_locked": 0,
+            "errors": 0,
+            "last_run": None,
+            "last_error": None,
+        }
+
+    def start(self):
+        """Start the scheduler loop (called from the app lifespan)."""
+        if not self.enabled:
+            logger.info("Sync scheduler disabled")
+            return
+        if self._task is None or self._task.done():
+            self._next_incremental = time.monotonic() + self._interval_with_jitter()
+            self._next_nightly = self._next_nightly_run(datetime.now())
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(
+                f"Sync scheduler started: incremental every {self.interval_minutes} min "
+                f"(+{self.jitter_seconds}s jitter), full nightly at {self.nightly_hour}:00"
+            )
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def data_age_seconds(self) -> Optional[float]:
+        """Seconds since the last successful sync, from the cached reading."""
+        if self._data_age is None:
+            return None
+        return self._data_age + (time.monotonic() - self._data_age_read_at)
+
+    def is_stale(self) -> bool:
+        age = self.data_age_seconds()
+        return age is None or age > self.stale_after_minutes * 60
+
+    def status(self) -> Dict:
+        """Scheduler configuration, next runs and counters."""
+        next_incremental_in = (
+            max(self._next_incremental - time.monotonic(), 0)
+            if self._task and self._next_incremental else None
+        )
+        return {
+            "enabled": self.enabled,
+            "running": bool(self._task and not self._task.done()),
+            "interval_minutes": self.interval_minutes,
+            "nightly_hour": self.nightly_hour,
+            "next_incremental_in_seconds": round(next_incremental_in) if next_incremental_in is not None else None,
+            "next_full_at": self._next_nightly.isoformat() if self._task and self._next_nightly else None,
+            "stats": self.stats,
+        }
+
+    async def refresh_data_age(self):
+        age = await asyncio.to_thread(self.job_service.get_data_age_seconds)
+        self._data_age = age
+        self._data_age_read_at = time.monotonic()
+
+    def _interval_with_jitter(self) -> float:
+        return self.interval_minutes * 60 + random.uniform(0, self.jitter_seconds)
+
+    def _next_nightly_run(self, now: datetime) -> Optional[datetime]:
+        if self.nightly_hour is None:
+            return None
+        run_at = now.replace(hour=self.nightly_hour, minute=0, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        # Same jitter as the incremental runs
+        return run_at + timedelta(seconds=random.uniform(0, self.jitter_seconds))
+
+    async def _run(self):
+        await self.refresh_data_age()
+
+        while True:
+            now = time.monotonic()
+            if self._next_nightly and datetime.now() >= self._next_nightly:
+                self._next_nightly = self._next_nightly_run(datetime.now())
+                self._next_incremental = now + self._interval_with_jitter()
+                await self._run_sync(kind='full')
+            elif now >= self._next_incremental:
+                self._next_incremental = now + self._interval_with_jitter()
+                await self._run_sync(kind='incremental')
+
+            wait = min(max(self._next_incremental - time.monotonic(), 0), DATA_AGE_REFRESH_SECONDS)
+            await asyncio.sleep(wait)
+            await self.refresh_data_age()
+
+    async def _run_sync(self, kind: str):
+        try:
+            active = await asyncio.to_thread(_active_query_count)
+            if active > self.max_active_queries and not self.is_stale():
+                logger.info(f"Skipping scheduled {kind} sync: {active} active queries")
+                self.stats["skipped_busy"] += 1
+                return
+
+            ran = await asyncio.to_thread(self._sync, kind)
+            if not ran:
+                self.stats["skipped_locked"] += 1
+                return
+
+            self.stats["runs"] += 1
+            self.stats["last_run"] = {"kind": kind, "at": datetime.now().isoformat()}
+            await self.refresh_data_age()
+        except Exception as e:
+            logger.error(f"Scheduled {kind} sync failed: {e}")
+            self.stats["errors"] += 1
+            self.stats["last_error"] = str(e)
+
+    def _sync(self, kind: str) -> bool:
+        """Run one sync as a tracked job. Returns False if another sync holds the lock."""
+        from backend.services.sync_runner import run_sync_job
+
+        job = self.job_service.start_job(kind=kind, triggered_by='scheduler')
+        if not job:
+            logger.info(f"Skipping scheduled {kind} sync: another sync is running")
+            return False
+
+        run_sync_job(job, force=(kind == 'full'))
+        return True
+
+
+def _active_query_count() -> int:
+    """Number of other queries currently running against this database."""
+    from utils.db_connection import execute_query
+
+    result = execute_query("""
+        SELECT COUNT(*) as active
+        FROM pg_stat_activity
+        WHERE state = 'active'
+          AND datname = current_database()
+          AND pid <> pg_backend_pid()
+    """)
+    return result[0]["active"]
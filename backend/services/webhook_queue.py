@@ -0,0 +1,114 @@
+# backend/services/webhook_queue.py
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MondayWebhookQueue:
+    """
+    Debounced queue of Monday item changes.
+
+    Monday sends one event per column edit, so editing a deal fires a burst of
+    events for the same item. Each (board, item) pair is kept once in the queue
+    and only synced after it has been quiet for `debounce_seconds` (or has been
+    waiting for `max_delay_seconds`, so a constantly edited item still syncs).
+    Items that come due while another sync holds the sync lock are put back
+    and retried after `locked_retry_seconds`.
+    """
+
+    def __init__(self, debounce_seconds: float = 3.0, max_delay_seconds: float = 30.0,
+                 locked_retry_seconds: float = 10.0):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.locked_retry_seconds = locked_retry_seconds
+
+        # (board_id, item_id) -> (first_seen, last_seen)
+        self._pending: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "events_received": 0,
+            "items_synced": 0,
+            "batches": 0,
+            "deferred": 0,
+            "errors": 0,
+            "last_error": None,
+        }
+
+    def enqueue(self, board_id: str, item_id: str):
+        """Queue an item for re-sync. Repeated events for the same item are merged."""
+        now = time.monotonic()
+        key = (str(board_id), str(item_id))
+        first_seen, _ = self._pending.get(key, (now, now))
+        self._pending[key] = (first_seen, now)
+        self.stats["events_received"] += 1
+
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def _defer(self, board_id: str, item_ids: List[str]):
+        """Put items back to sync `locked_retry_seconds` from now, unless an event already re-queued them."""
+        retry_at = time.monotonic() + self.locked_retry_seconds - self.debounce_seconds
+        for item_id in item_ids:
+            self._pending.setdefault((board_id, item_id), (retry_at, retry_at))
+        self.stats["deferred"] += len(item_ids)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _ensure_worker(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    def _take_ready(self) -> Tuple[Dict[str, List[str]], Optional[float]]:
+        """Pop items that are ready to sync, grouped by board, and the wait until the next one."""
+        now = time.monotonic()
+        ready: Dict[str, List[str]] = {}
+        next_due = None
+
+        for key, (first_seen, last_seen) in list(self._pending.items()):
+            due = min(last_seen + self.debounce_seconds, first_seen + self.max_delay_seconds)
+            if due <= now:
+                board_id, item_id = key
+                ready.setdefault(board_id, []).append(item_id)
+                del self._pending[key]
+            elif next_due is None or due < next_due:
+                next_due = due
+
+        wait = max(next_due - now, 0) if next_due is not None else None
+        return ready, wait
+
+    async def _run(self):
+        from backend.services.sync_runner import sync_items
+
+        while True:
+            ready, wait = self._take_ready()
+
+            for board_id, item_ids in ready.items():
+                try:
+                    if await asyncio.to_thread(sync_items, board_id, item_ids) is None:
+                        # A full sync is running; it may not have seen these changes
+                        self._defer(board_id, item_ids)
+                        continue
+                    self.stats["items_synced"] += len(item_ids)
+                    self.stats["batches"] += 1
+                except Exception as e:
+                    logger.error(f"Webhook sync failed for board {board_id} items {item_ids}: {e}")
+                    self.stats["errors"] += 1
+                    self.stats["last_error"] = str(e)
+
+            if ready:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
@@ -1,11 +1,15 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { RefreshCw, CheckCircle, AlertCircle } from 'lucide-react'
 import { API_BASE } from '../config'
 
+const SYNCING_POLL_MS = 15000
+
 export default function SyncStatusBar() {
   const [syncStatus, setSyncStatus] = useState(null)
   const [syncing, setSyncing] = useState(false)
+  const [progress, setProgress] = useState(null)
   const [loading, setLoading] = useState(true)
+  const startedHere = useRef(false)
 
   const fetchStatus = async () => {
     try {
@@ -24,30 +28,50 @@ export default function SyncStatusBar() {
 
   useEffect(() => {
     fetchStatus()
+
+    // Progress is pushed by the server; nothing is polled while idle
+    const events = new EventSource(`${API_BASE}/sync/events`)
+    // Sent on every (re)connect: catches up on anything missed while disconnected
+    events.addEventListener('status', (e) => {
+      const sync = JSON.parse(e.data)
+      setSyncStatus((prev) => ({ ...prev, sync }))
+      setSyncing(sync.status === 'syncing')
+      setProgress(sync.status === 'syncing' ? sync.job : null)
+    })
+    events.addEventListener('progress', (e) => {
+      const job = JSON.parse(e.data)
+      if (job.status === 'running') {
+        setSyncing(true)
+        setProgress(job)
+        return
+      }
+      setSyncing(false)
+      setProgress(null)
+      if (startedHere.current && job.status === 'completed') {
+        window.location.reload()
+        return
+      }
+      startedHere.current = false
+      fetchStatus()
+    })
+    // The browser reconnects on its own; until then, read the status directly
+    events.onerror = () => fetchStatus()
+    return () => events.close()
   }, [])
 
+  // Events can be missed if the server's listener drops mid-sync: check now and then
   useEffect(() => {
     if (!syncing) return
-    const interval = setInterval(fetchStatus, 2000)
-    return () => clearInterval(interval)
+    const timer = setInterval(fetchStatus, SYNCING_POLL_MS)
+    return () => clearInterval(timer)
   }, [syncing])
 
   const handleSync = async () => {
     setSyncing(true)
     try {
-      await fetch(`${API_BASE}/sync/run`, { method: 'POST' })
-      const poll = setInterval(async () => {
-        const res = await fetch(`${API_BASE}/sync/status`)
-        if (res.ok) {
-          const data = await res.json()
-          setSyncStatus(data)
-          if (data.sync.status !== 'syncing') {
-            setSyncing(false)
-            clearInterval(poll)
-            window.location.reload()
-          }
-        }
-      }, 2000)
+      const res = await fetch(`${API_BASE}/sync/run`, { method: 'POST' })
+      const data = await res.json()
+      startedHere.current = data.status === 'started'
     } catch (err) {
       console.error('Sync failed:', err)
       setSyncing(false)
@@ -81,7 +105,9 @@ export default function SyncStatusBar() {
         className="flex items-center gap-1.5 px-3 py-1.5 text-sm font-medium rounded-lg bg-slate-900 text-white hover:bg-slate-800 disabled:opacity-50 transition-colors"
       >
         <RefreshCw className={`w-3.5 h-3.5 ${syncing ? 'animate-spin' : ''}`} />
-        {syncing ? 'Syncing...' : 'Sync Now'}
+        {syncing
+          ? `Syncing${progress?.phase ? ` (${progress.phase}, ${progress.items_processed} items)` : '...'}`
+          : 'Sync Now'}
       </button>
     </div>
   )
@@ -7,12 +7,148 @@ Imports contract and room data from the occupancy report Excel files.
 
 import pandas as pd
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+from typing import Any, List, Dict, Iterator, Optional, Tuple, Union
+
+from openpyxl import load_workbook
+
+from integrations.sheet_cache import SheetCache, fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Date formats accepted in text cells, in order of preference
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y")
+
+# Rows per DataFrame yielded by iter_sheet_chunks
+CHUNK_ROWS = 5000
+
+# Processes parsing sheets in parallel on a cache miss
+PARSE_WORKERS = int(os.getenv("EXCEL_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def iter_sheet_rows(path, sheet_name: Union[str, int], min_row: int = 1,
+                    max_row: Optional[int] = None) -> Iterator[Tuple[Any, ...]]:
+    """
+    Cell values of a sheet (by name or 0-based position), row by row
+    (1-based rows, as in Excel).
+
+    Uses openpyxl's read-only mode, which parses the sheet XML as it goes:
+    memory stays flat however large the workbook. Values are typed by
+    openpyxl (datetime, int, float, str, bool or None); formulas give their
+    cached results.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        yield from sheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+    finally:
+        workbook.close()
+
+
+def _header_names(cells: Tuple[Any, ...]) -> List[str]:
+    """Column names from a header row, named like pd.read_excel does."""
+    names = []
+    seen: Dict[str, int] = {}
+    for i, cell in enumerate(cells):
+        name = f"Unnamed: {i}" if cell is None else str(cell)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_sheet_chunks(path, sheet_name: Union[str, int], header: int, columns: Optional[Dict[str, str]] = None,
+                      chunk_size: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    A sheet as DataFrames of up to `chunk_size` rows, streamed from disk.
+
+    Args:
+        header: 0-indexed header row (as for pd.read_excel)
+        columns: {header: name} of the columns to keep, renamed; the others
+            are dropped as rows are read. All columns are kept if omitted.
+
+    Blank rows are skipped. Columns in `columns` missing from the sheet are
+    absent from the chunks.
+    """
+    rows = iter_sheet_rows(path, sheet_name, min_row=header + 1)
+    try:
+        header_cells = next(rows, None)
+        if header_cells is None:
+            return
+        names = _header_names(header_cells)
+        keep = [i for i, name in enumerate(names) if columns is None or name in columns]
+        chunk_columns = [names[i] if columns is None else columns[names[i]] for i in keep]
+
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append([row[i] if i < len(row) else None for i in keep])
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=chunk_columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=chunk_columns)
+    finally:
+        rows.close()
+
+
+def parse_sheet(path, sheet_name: Union[str, int], header: int) -> pd.DataFrame:
+    """A whole sheet as one DataFrame of every column (top-level, so it can run in a process pool)."""
+    chunks = list(iter_sheet_chunks(path, sheet_name, header))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def text_column(values: pd.Series) -> pd.Series:
+    """Stripped strings; blank cells become None."""
+    text = values.astype("string").str.strip()
+    blank = text.isna() | text.eq("").fillna(False)
+    text = text.astype(object)
+    text[blank] = None
+    return text
+
+
+def date_column(values: pd.Series, formats: Tuple[str, ...] = DATE_FORMATS) -> pd.Series:
+    """
+    Dates (datetime64, midnight) from Excel date cells or text in one of
+    `formats`, tried in order; anything else becomes NaT.
+    """
+    parsed = pd.to_datetime(values, errors="coerce", format=formats[0])
+    for fmt in formats[1:]:
+        retry = parsed.isna() & values.notna()
+        if not retry.any():
+            break
+        parsed[retry] = pd.to_datetime(values[retry], errors="coerce", format=fmt)
+    return parsed.dt.normalize()
+
+
+def contract_import_key(names: pd.Series, start_dates: pd.Series) -> pd.Series:
+    """
+    Natural key of contracts imported from Excel (contracts.import_key):
+    lower-cased resident name and start date. Not the unit: a resident
+    moving rooms is the same contract.
+    """
+    return names.str.lower() + "|" + start_dates.dt.strftime("%Y-%m-%d")
+
+
+# Columns of the frames returned by ExcelImporter.booked_units_frames
+ROOM_COLUMNS = ["room_id", "floor", "sqm", "category", "weekly_rate"]
+CONTRACT_COLUMNS = [
+    "room_id", "resident_name", "start_date", "end_date", "weekly_rate", "total_value",
+    "weeks_booked", "payment_plan", "nationality", "university", "level_of_study",
+    "source", "lead_source", "status",
+]
+
+
+# Columns of the frame returned by ExcelImporter.opex_frame (as in opex_budget)
+OPEX_COLUMNS = ["budget_version", "source", "category", "month_date", "amount"]
+
 
 class ExcelImporter:
     """
@@ -41,165 +177,308 @@ class ExcelImporter:
         "Payment Plan": "payment_plan",
     }
 
-    def __init__(self, file_path: str):
+    # Tabular sheets (name -> 0-indexed header row) parsed by preload()
+    SHEETS = {
+        "Booked Units": 5,
+        "Income Forecast": 3,
+    }
+
+    # OPEX sheets: the row (0-indexed) with the months, from column 3 on, and
+    # the rows below it to read (None: every category row, totals skipped).
+    # Category labels are in columns 0-2. Cash Flow FC only has a total OPEX line.
+    OPEX_SHEETS = {
+        "Main Budget AY25": {"source": "budget", "month_row": 8, "rows": None},
+        "Cash Flow FC": {"source": "forecast", "month_row": 9, "rows": [20]},
+    }
+
+    def __init__(self, file_path: str, cache: Optional[SheetCache] = None, use_cache: bool = True):
+        """
+        Args:
+            cache: Where parsed sheets are cached (default: SheetCache()).
+                Unused without pyarrow, or if use_cache is False or
+                EXCEL_CACHE_ENABLED is 'false'.
+        """
         self.file_path = Path(file_path)
         if not self.file_path.exists():
             raise FileNotFoundError(f"Excel file not found: {file_path}")
 
-        self.excel_file = pd.ExcelFile(file_path)
-        logger.info(f"Loaded Excel file: {file_path}")
-        logger.info(f"Available sheets: {self.excel_file.sheet_names}")
+        # Sheets are streamed when read (see iter_sheet_rows); only the sheet list is loaded here
+        workbook = load_workbook(self.file_path, read_only=True)
+        self.sheet_names = workbook.sheetnames
+        workbook.close()
+        logger.info(f"Opened Excel file: {file_path}")
+        logger.info(f"Available sheets: {self.sheet_names}")
+
+        use_cache = use_cache and os.getenv("EXCEL_CACHE_ENABLED", "true").lower() == "true"
+        self.cache = (cache or SheetCache()) if use_cache else None
+        if self.cache is not None and not self.cache.enabled:
+            logger.info("pyarrow not installed: parsed sheets are not cached")
+            self.cache = None
+        self._fingerprint = None
 
     def get_sheet_names(self) -> List[str]:
         """Return list of sheet names in the Excel file."""
-        return self.excel_file.sheet_names
+        return self.sheet_names
 
-    def import_booked_units(self) -> Tuple[List[Dict], List[Dict]]:
+    @property
+    def fingerprint(self) -> str:
+        """Size and hash of the file, keying its cached sheets."""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self.file_path)
+        return self._fingerprint
+
+    def preload(self, sheets: Optional[Dict[str, int]] = None, workers: int = PARSE_WORKERS) -> List[str]:
         """
-        Import data from 'Booked Units' sheet.
+        Parse and cache `sheets` ({name: header row}, default SHEETS) that
+        aren't cached yet, in parallel processes: openpyxl parsing is
+        CPU-bound, so threads wouldn't overlap it. Sheets missing from the
+        workbook are ignored.
 
         Returns:
-            Tuple of (rooms, contracts) - lists of dictionaries
+            The sheets parsed (empty when all were cached, or without a cache)
         """
-        df = pd.read_excel(
-            self.excel_file,
-            sheet_name="Booked Units",
-            header=5  # Header is on row 6 (0-indexed: 5)
-        )
-
-        # Rename columns to our schema
-        df = df.rename(columns=self.BOOKED_UNITS_COLUMNS)
-
-        # Extract unique rooms
-        rooms = []
-        seen_rooms = set()
+        if self.cache is None:
+            return []
+        sheets = sheets if sheets is not None else self.SHEETS
+        misses = {
+            name: header for name, header in sheets.items()
+            if name in self.sheet_names and not self.cache.has(self.fingerprint, name, header)
+        }
+        if not misses:
+            return []
+
+        if workers > 1 and len(misses) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(misses))) as pool:
+                futures = {
+                    name: pool.submit(parse_sheet, self.file_path, name, header)
+                    for name, header in misses.items()
+                }
+                frames = {name: future.result() for name, future in futures.items()}
+        else:
+            frames = {name: parse_sheet(self.file_path, name, header) for name, header in misses.items()}
+
+        for name, df in frames.items():
+            self.cache.save(self.fingerprint, name, misses[name], df)
+        logger.info(f"Parsed and cached sheets: {', '.join(frames)}")
+        return list(frames)
+
+    def iter_chunks(self, sheet_name: Union[str, int], header: int,
+                    columns: Optional[Dict[str, str]] = None,
+                    chunk_size: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Like iter_sheet_chunks, read from the cache when there is one.
 
-        for _, row in df.iterrows():
-            room_id = str(row.get("room_id", "")).strip()
-            if not room_id or room_id in seen_rooms:
-                continue
+        A cached sheet is read from Parquet (only the `columns` wanted) and
+        sliced into chunks; on a miss the whole sheet is parsed and cached
+        first. Without a cache the sheet is streamed from the workbook.
+        """
+        if self.cache is None:
+            yield from iter_sheet_chunks(self.file_path, sheet_name, header, columns, chunk_size)
+            return
+
+        if isinstance(sheet_name, int):
+            sheet_name = self.sheet_names[sheet_name]
+        wanted = list(columns) if columns is not None else None
+        df = self.cache.load(self.fingerprint, sheet_name, header, columns=wanted)
+        if df is None:
+            self.preload({sheet_name: header}, workers=1)
+            df = self.cache.load(self.fingerprint, sheet_name, header, columns=wanted)
+        if df is None:  # Not cacheable: stream it
+            yield from iter_sheet_chunks(self.file_path, sheet_name, header, columns, chunk_size)
+            return
+
+        if columns is not None:
+            df = df.rename(columns=columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+
+    def booked_units_frames(self, chunk_size: int = CHUNK_ROWS) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Read the 'Booked Units' sheet into (rooms, contracts) DataFrames.
 
-            seen_rooms.add(room_id)
-            rooms.append({
-                "room_id": room_id,
-                "floor": str(row.get("floor", "")),
-                "sqm": float(row.get("sqm", 0)) if pd.notna(row.get("sqm")) else None,
-                "category": str(row.get("category", "")),
-                "weekly_rate": float(row.get("weekly_rate", 0)) if pd.notna(row.get("weekly_rate")) else None,
-            })
-
-        # Extract contracts
-        contracts = []
-        for _, row in df.iterrows():
-            room_id = str(row.get("room_id", "")).strip()
-            resident_name = str(row.get("resident_name", "")).strip()
-
-            if not room_id or not resident_name:
-                continue
+        The sheet is streamed in chunks of `chunk_size` rows, each cleaned and
+        typed column by column, so only the mapped columns of cleaned rows are
+        held. Rooms are the unique room ids (first row wins); contracts need a
+        room, a resident and valid start/end dates. Missing values are NaN/None.
+        """
+        rooms, contracts = [], []
+        skipped = []
+        for chunk in self.iter_chunks(
+            "Booked Units",
+            header=self.SHEETS["Booked Units"],  # Header is on row 6 (0-indexed: 5)
+            columns=self.BOOKED_UNITS_COLUMNS, chunk_size=chunk_size,
+        ):
+            chunk_rooms, chunk_contracts, chunk_skipped = self._clean_booked_units(chunk)
+            rooms.append(chunk_rooms)
+            contracts.append(chunk_contracts)
+            skipped.extend(chunk_skipped)
+
+        if skipped:
+            logger.warning(
+                f"Skipping {len(skipped)} contract(s) with missing or invalid dates: {', '.join(skipped)}"
+            )
+
+        rooms = self._concat(rooms, ROOM_COLUMNS).drop_duplicates(subset="room_id", keep="first")
+        contracts = self._concat(contracts, CONTRACT_COLUMNS)
 
-            # Parse dates
-            start_date = self._parse_date(row.get("start_date"))
-            end_date = self._parse_date(row.get("end_date"))
+        logger.info(f"Imported {len(rooms)} unique rooms and {len(contracts)} contracts")
+        return rooms.reset_index(drop=True), contracts
+
+    def _clean_booked_units(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+        """Clean one chunk of Booked Units rows into (rooms, contracts, skipped room ids)."""
+        # Columns missing from the sheet are empty
+        df = df.reindex(columns=list(self.BOOKED_UNITS_COLUMNS.values()))
+
+        for column in ("room_id", "resident_name", "floor", "category", "payment_plan",
+                       "nationality", "university", "level_of_study", "source", "lead_source"):
+            df[column] = text_column(df[column])
+        for column in ("sqm", "weekly_rate", "total_value", "weeks_booked"):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        for column in ("start_date", "end_date"):
+            df[column] = date_column(df[column])
+
+        df = df[df["room_id"].notna()]
+        rooms = df[ROOM_COLUMNS].drop_duplicates(subset="room_id", keep="first")
+
+        contracts = df[df["resident_name"].notna()]
+        valid_dates = (
+            contracts["start_date"].notna() & contracts["end_date"].notna()
+            & (contracts["end_date"] >= contracts["start_date"])
+        )
+        skipped = contracts.loc[~valid_dates, "room_id"].tolist()
+        contracts = contracts[valid_dates].assign(
+            weekly_rate=lambda c: c["weekly_rate"].fillna(0),
+            total_value=lambda c: c["total_value"].fillna(0),
+            weeks_booked=lambda c: c["weeks_booked"].fillna(0),
+            payment_plan=lambda c: c["payment_plan"].fillna("Installments"),
+            status="active",  # All booked units are active
+        )[CONTRACT_COLUMNS]
+        return rooms, contracts, skipped
 
-            if not start_date or not end_date:
-                logger.warning(f"Skipping contract for {room_id}: invalid dates")
-                continue
+    @staticmethod
+    def _concat(frames: List[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
 
-            contracts.append({
-                "room_id": room_id,
-                "resident_name": resident_name,
-                "start_date": start_date,
-                "end_date": end_date,
-                "weekly_rate": float(row.get("weekly_rate", 0)) if pd.notna(row.get("weekly_rate")) else 0,
-                "total_value": float(row.get("total_value", 0)) if pd.notna(row.get("total_value")) else 0,
-                "weeks_booked": float(row.get("weeks_booked", 0)) if pd.notna(row.get("weeks_booked")) else 0,
-                "payment_plan": str(row.get("payment_plan", "Installments")),
-                "nationality": str(row.get("nationality", "")) if pd.notna(row.get("nationality")) else None,
-                "university": str(row.get("university", "")) if pd.notna(row.get("university")) else None,
-                "source": str(row.get("source", "")) if pd.notna(row.get("source")) else None,
-                "status": "active",  # All booked units are active
-            })
+    def import_booked_units(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Import data from 'Booked Units' sheet.
 
-        logger.info(f"Imported {len(rooms)} unique rooms and {len(contracts)} contracts")
-        return rooms, contracts
+        Returns:
+            Tuple of (rooms, contracts) - lists of dictionaries
+        """
+        rooms, contracts = self.booked_units_frames()
+        return self._records(rooms), self._records(contracts)
 
     def import_income_forecast(self) -> pd.DataFrame:
         """
         Import the Income Forecast sheet for detailed monthly breakdowns.
         """
-        df = pd.read_excel(
-            self.excel_file,
-            sheet_name="Income Forecast",
-            header=3
-        )
-        return df
+        chunks = list(self.iter_chunks("Income Forecast", header=self.SHEETS["Income Forecast"]))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    def _sheet_rows(self, sheet_name: str, rows: int) -> List[List[Any]]:
+        """The first `rows` rows of a sheet (0-indexed, padded with empty rows), streamed."""
+        values = [list(row) for row in iter_sheet_rows(self.file_path, sheet_name, max_row=rows)]
+        return values + [[] for _ in range(rows - len(values))]
 
     def import_cash_flow(self) -> Dict:
         """
         Import Cash Flow FC sheet.
         Returns structured cash flow data.
         """
-        df = pd.read_excel(
-            self.excel_file,
-            sheet_name="Cash Flow FC",
-            header=None
-        )
+        # Only the header and metric rows are read, not the whole sheet
+        rows = self._sheet_rows("Cash Flow FC", 21)
 
         # Extract date headers (row 9)
-        dates = df.iloc[9, 3:].dropna().tolist()
+        dates = [d for d in rows[9][3:] if d is not None]
+
+        def metric(row: int) -> List:
+            values = rows[row][3:len(dates)+3]
+            return values + [None] * (len(dates) - len(values))
 
         # Extract key metrics
         cash_flow_data = {
             "dates": [d.strftime("%Y-%m") if hasattr(d, 'strftime') else str(d) for d in dates],
-            "booked_cfs": df.iloc[13, 3:len(dates)+3].tolist(),
-            "total_cash_flow": df.iloc[18, 3:len(dates)+3].tolist(),
-            "opex": df.iloc[20, 3:len(dates)+3].tolist(),
+            "booked_cfs": metric(13),
+            "total_cash_flow": metric(18),
+            "opex": metric(20),
         }
 
         return cash_flow_data
 
-    def import_opex_budget(self) -> List[Dict]:
+    def opex_frame(self, budget_version: Optional[str] = None) -> pd.DataFrame:
+        """
+        Monthly OPEX per category from the OPEX_SHEETS, as one long frame
+        (budget_version, source, category, month_date, amount) for opex_budget.
+
+        Args:
+            budget_version: Name the rows are stored under; versions are kept
+                side by side (default: the file name)
         """
-        Import OPEX budget from Main Budget sheet.
+        budget_version = budget_version or self.file_path.stem
+        frames = [
+            self._melt_opex_sheet(name, **spec)
+            for name, spec in self.OPEX_SHEETS.items() if name in self.sheet_names
+        ]
+        opex = self._concat(frames, OPEX_COLUMNS[1:]).assign(budget_version=budget_version)[OPEX_COLUMNS]
+        logger.info(f"Imported {len(opex)} OPEX amounts as budget version '{budget_version}'")
+        return opex
+
+    def _melt_opex_sheet(self, sheet_name: str, source: str, month_row: int,
+                         rows: Optional[List[int]]) -> pd.DataFrame:
         """
-        df = pd.read_excel(
-            self.excel_file,
-            sheet_name="Main Budget AY25",
-            header=None
+        The month columns x category rows of an OPEX sheet melted into
+        (source, category, month_date, amount) rows in one pass.
+
+        Month headers are the date cells from column 3 on (other headers,
+        e.g. a yearly total, are ignored); months are stored as their first
+        day. Blank and non-numeric amounts are dropped, and a category listed
+        twice is summed. Outflows are stored positive: a sheet whose amounts
+        sum negative (cash-flow sign) is negated.
+        """
+        cells = pd.DataFrame(iter_sheet_rows(self.file_path, sheet_name, min_row=month_row + 1))
+        if len(cells) < 2 or cells.shape[1] <= 3:
+            return pd.DataFrame(columns=OPEX_COLUMNS[1:])
+
+        months = date_column(cells.iloc[0, 3:]).dropna()
+        months = months.dt.to_period("M").dt.to_timestamp()
+        body = cells.iloc[1:] if rows is None else cells.iloc[[r - month_row for r in rows if r - month_row < len(cells)]]
+
+        # Most specific label: the rightmost text in the label columns
+        labels = body.iloc[:, :3].apply(text_column).ffill(axis=1).iloc[:, -1]
+        opex = (
+            body[months.index].set_axis(months, axis=1)
+            .assign(category=labels.str.slice(0, 100))
+            .melt(id_vars="category", var_name="month_date", value_name="amount")
         )
+        opex["amount"] = pd.to_numeric(opex["amount"], errors="coerce")
+        opex = opex[opex["category"].notna() & opex["amount"].notna()]
+        if rows is None:
+            opex = opex[~opex["category"].str.lower().str.startswith("total")]
 
-        # Extract monthly OPEX data
-        # Row 8 has date headers, subsequent rows have expense categories
-        opex_records = []
+        opex = opex.groupby(["category", "month_date"], as_index=False, sort=False)["amount"].sum()
+        if opex["amount"].sum() < 0:
+            opex["amount"] = -opex["amount"]
+        return opex.assign(source=source)[OPEX_COLUMNS[1:]]
 
-        # Date headers start at column 3
-        date_row = df.iloc[8, 3:15].tolist()
+    def import_opex_budget(self, budget_version: Optional[str] = None) -> List[Dict]:
+        """
+        Import OPEX budget from the Main Budget and Cash Flow FC sheets.
 
-        # Total OPEX might need to be calculated or found
-        # For now, we'll use the structure we found
-        return opex_records
+        Returns:
+            opex_budget rows as dictionaries (see opex_frame)
+        """
+        return self._records(self.opex_frame(budget_version))
 
     @staticmethod
-    def _parse_date(value) -> Optional[date]:
-        """Parse various date formats to date object."""
-        if pd.isna(value):
-            return None
-
-        if isinstance(value, datetime):
-            return value.date()
-
-        if isinstance(value, date):
-            return value
-
-        if isinstance(value, str):
-            # Try common formats
-            for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"]:
-                try:
-                    return datetime.strptime(value, fmt).date()
-                except ValueError:
-                    continue
-
-        return None
+    def _records(df: pd.DataFrame) -> List[Dict]:
+        """DataFrame rows as dicts, with dates as datetime.date and missing values as None."""
+        df = df.copy()
+        for column in df.select_dtypes(include="datetime").columns:
+            df[column] = df[column].dt.date
+        return df.astype(object).where(df.notna(), None).to_dict("records")
 
 
 def import_from_excel(file_path: str) -> Dict:
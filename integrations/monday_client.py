@@ -13,14 +13,81 @@ This module handles:
 import os
 import requests
 import logging
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-MONDAY_API_URL = "https://api.monday.com/v2"
+MONDAY_API_URL = os.getenv("MONDAY_API_URL", "https://api.monday.com/v2")
+
+# Item fields fetched by every items query
+ITEM_FIELDS = """
+    id
+    name
+    created_at
+    updated_at
+    column_values {
+        id
+        text
+        value
+    }
+"""
+
+
+# Selected by the sync queries so MondayClient.stats can track the complexity spent
+COMPLEXITY = "complexity { query }"
+
+
+class HttpTransport:
+    """
+    Sends GraphQL payloads to the Monday API over HTTP.
+
+    A transport is anything with `execute(payload, headers) -> dict` returning the
+    decoded response body. See integrations/monday_fake.py for offline transports.
+    """
+
+    requires_token = True
+
+    def __init__(self, url: str = MONDAY_API_URL):
+        self.url = url
+
+    def execute(self, payload: Dict, headers: Dict) -> Dict:
+        response = requests.post(
+            self.url,
+            json=payload,
+            headers=headers
+        )
+
+        if response.status_code != 200:
+            logger.error(f"Monday API error: {response.status_code} - {response.text}")
+            raise Exception(f"Monday API error: {response.status_code}")
+
+        self.last_response_bytes = len(response.content)
+        return response.json()
+
+
+def transport_from_env():
+    """
+    Build the transport selected by MONDAY_TRANSPORT.
+
+    - unset / "http": live Monday API
+    - "record:<dir>": live API, saving every response under <dir>
+    - "replay:<dir>": answer from responses previously recorded under <dir>
+    """
+    mode = os.getenv("MONDAY_TRANSPORT", "http")
+    if mode == "http":
+        return HttpTransport()
+
+    from integrations.monday_fake import RecordingTransport, ReplayTransport
+
+    kind, _, path = mode.partition(":")
+    if kind == "record":
+        return RecordingTransport(HttpTransport(), path)
+    if kind == "replay":
+        return ReplayTransport(path)
+    raise ValueError(f"Unknown MONDAY_TRANSPORT: {mode}")
 
 
 class MondayClient:
@@ -28,12 +95,15 @@ class MondayClient:
     Client for interacting with Monday.com API.
     """
 
-    def __init__(self):
+    def __init__(self, transport=None):
         self.api_token = os.getenv("MONDAY_API_TOKEN")
         self.contracts_board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS")
         self.payments_board_id = os.getenv("MONDAY_BOARD_ID_PAYMENTS")
+        self.transport = transport or transport_from_env()
+        # Usage since the client was created (see SyncProfile.add_monday_usage)
+        self.stats = {"requests": 0, "bytes": 0, "complexity": 0}
 
-        if not self.api_token:
+        if not self.api_token and self.transport.requires_token:
             logger.warning("MONDAY_API_TOKEN not set. Monday integration disabled.")
 
     @property
@@ -46,29 +116,26 @@ class MondayClient:
 
     def _execute_query(self, query: str, variables: Dict = None) -> Dict:
         """Execute a GraphQL query against Monday API."""
-        if not self.api_token:
+        if not self.api_token and self.transport.requires_token:
             raise ValueError("Monday API token not configured")
 
         payload = {"query": query}
         if variables:
             payload["variables"] = variables
 
-        response = requests.post(
-            MONDAY_API_URL,
-            json=payload,
-            headers=self.headers
-        )
-
-        if response.status_code != 200:
-            logger.error(f"Monday API error: {response.status_code} - {response.text}")
-            raise Exception(f"Monday API error: {response.status_code}")
-
-        data = response.json()
+        data = self.transport.execute(payload, self.headers)
+        self.stats["requests"] += 1
+        self.stats["bytes"] += getattr(self.transport, "last_response_bytes", 0)
         if "errors" in data:
             logger.error(f"Monday GraphQL errors: {data['errors']}")
             raise Exception(f"Monday GraphQL error: {data['errors']}")
 
-        return data.get("data", {})
+        result = data.get("data", {})
+        # Queries that select `complexity { query }` report their cost
+        complexity = result.pop("complexity", None)
+        if complexity:
+            self.stats["complexity"] += complexity.get("query") or 0
+        return result
 
     def get_boards(self) -> List[Dict]:
         """Get list of all boards accessible to the user."""
@@ -154,8 +221,17 @@ class MondayClient:
             }
         return {"items": [], "cursor": None}
 
-    def get_all_board_items(self, board_id: str) -> List[Dict]:
-        """Get all items from a board (handles pagination)."""
+    def get_all_board_items(
+        self,
+        board_id: str,
+        on_page: Optional[Callable[[str, int], None]] = None
+    ) -> List[Dict]:
+        """
+        Get all items from a board (handles pagination).
+
+        Args:
+            on_page: Called with (board_id, items_in_page) after each page
+        """
         all_items = []
         cursor = None
 
@@ -163,6 +239,8 @@ class MondayClient:
             result = self.get_board_items(board_id, limit=100, cursor=cursor)
             items = result.get("items", [])
             all_items.extend(items)
+            if on_page:
+                on_page(board_id, len(items))
 
             cursor = result.get("cursor")
             if not cursor or not items:
@@ -170,6 +248,134 @@ class MondayClient:
 
         return all_items
 
+    def iter_boards_pages(
+        self,
+        board_ids: List[str],
+        limit: int = 100,
+        with_items: bool = True
+    ) -> Iterator[Tuple[str, Optional[Dict], List[Dict], bool]]:
+        """
+        Fetch several boards (metadata and all items) with as few requests as possible.
+
+        The first request asks for every board's metadata and first page in one
+        aliased query (b0: boards(...), b1: boards(...)). Follow-up requests batch
+        next_items_page for only the boards that still have a cursor.
+
+        Yields each page as soon as its request returns, so callers can process
+        one round while the next is in flight:
+            (board_id, metadata or None after the first round, items, last_page)
+        """
+        board_ids = [str(board_id) for board_id in board_ids]
+        page_fields = f"""
+                items_page (limit: $limit) {{
+                    cursor
+                    items {{ {ITEM_FIELDS} }}
+                }}
+        """ if with_items else ""
+
+        declarations = ", ".join(f"$b{i}: [ID!]" for i in range(len(board_ids)))
+        selections = "\n".join(
+            f"""
+            b{i}: boards (ids: $b{i}) {{
+                id
+                name
+                updated_at
+                items_count
+                {page_fields}
+            }}
+            """
+            for i in range(len(board_ids))
+        )
+        query = f"query ({declarations}{', $limit: Int!' if with_items else ''}) {{ {COMPLEXITY} {selections} }}"
+        variables = {f"b{i}": [board_id] for i, board_id in enumerate(board_ids)}
+        if with_items:
+            variables["limit"] = limit
+
+        result = self._execute_query(query, variables)
+
+        cursors = {}
+        for i, board_id in enumerate(board_ids):
+            found = result.get(f"b{i}") or []
+            board = found[0] if found else {}
+            page = board.pop("items_page", None) or {}
+            items = page.get("items", [])
+            if page.get("cursor") and items:
+                cursors[board_id] = page["cursor"]
+            yield board_id, board, items, board_id not in cursors
+
+        # Continue only the boards that still have pages, all in one request per round
+        while cursors:
+            open_ids = list(cursors)
+            declarations = ", ".join(f"$c{i}: String!" for i in range(len(open_ids)))
+            selections = "\n".join(
+                f"p{i}: next_items_page (limit: $limit, cursor: $c{i}) {{ cursor items {{ {ITEM_FIELDS} }} }}"
+                for i in range(len(open_ids))
+            )
+            query = f"query ({declarations}, $limit: Int!) {{ {COMPLEXITY} {selections} }}"
+            variables = {f"c{i}": cursors[board_id] for i, board_id in enumerate(open_ids)}
+            variables["limit"] = limit
+
+            result = self._execute_query(query, variables)
+
+            cursors = {}
+            for i, board_id in enumerate(open_ids):
+                page = result.get(f"p{i}") or {}
+                items = page.get("items", [])
+                if page.get("cursor") and items:
+                    cursors[board_id] = page["cursor"]
+                yield board_id, None, items, board_id not in cursors
+
+    def get_boards_items(
+        self,
+        board_ids: List[str],
+        limit: int = 100,
+        with_items: bool = True,
+        on_page: Optional[Callable[[str, int], None]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Fetch several boards in batched requests (see iter_boards_pages).
+
+        Args:
+            on_page: Called with (board_id, items_in_page) for each page received
+
+        Returns:
+            Dict of board_id -> {'board': metadata, 'items': [...]}
+        """
+        boards = {}
+        for board_id, board, items, _ in self.iter_boards_pages(board_ids, limit, with_items):
+            if board is not None:
+                boards[board_id] = {"board": board, "items": []}
+            boards[board_id]["items"].extend(items)
+            if on_page and with_items:
+                on_page(board_id, len(items))
+        return boards
+
+    def get_items(self, item_ids: List[str]) -> List[Dict]:
+        """
+        Get specific items by ID, with the board each one belongs to.
+
+        Deleted or archived items are simply absent from the result.
+        """
+        query = f"""
+        query ($itemIds: [ID!]) {{
+            items (ids: $itemIds, limit: 100) {{
+                {ITEM_FIELDS}
+                board {{
+                    id
+                }}
+            }}
+        }}
+        """
+        all_items = []
+        item_ids = [str(item_id) for item_id in item_ids]
+
+        # Monday caps items(ids:) at 100 per request
+        for start in range(0, len(item_ids), 100):
+            result = self._execute_query(query, {"itemIds": item_ids[start:start + 100]})
+            all_items.extend(result.get("items", []))
+
+        return all_items
+
     def fetch_contracts(self) -> List[Dict]:
         """
         Fetch contract data from the contracts board.
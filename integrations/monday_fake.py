@@ -0,0 +1,518 @@
+# integrations/monday_fake.py
+"""
+Offline stand-ins for the Monday API.
+
+Used to benchmark and regression-test the sync and activity code without
+touching the live Monday account:
+
+- RecordingTransport: wraps the live transport and saves every response
+- ReplayTransport: answers from previously recorded responses
+- FakeMondayTransport: serves synthetic boards of any size, with Monday-style
+  pagination cursors, a complexity budget, and injected latency/errors
+- serve(): exposes any transport as a local GraphQL endpoint, so the backend
+  can be pointed at it with MONDAY_API_URL=http://localhost:<port>
+
+All transports implement `execute(payload, headers) -> dict`, the same
+interface as monday_client.HttpTransport.
+"""
+
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import logging
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _payload_key(payload: Dict) -> str:
+    """Stable key for a request: whitespace-normalised query + sorted variables."""
+    query = " ".join(payload.get("query", "").split())
+    variables = json.dumps(payload.get("variables") or {}, sort_keys=True)
+    return hashlib.sha256(f"{query}\n{variables}".encode()).hexdigest()[:24]
+
+
+class RecordingTransport:
+    """Pass requests through to another transport and save each response as a fixture."""
+
+    def __init__(self, inner, fixtures_dir: str):
+        self.inner = inner
+        self.requires_token = inner.requires_token
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+
+    def execute(self, payload: Dict, headers: Dict) -> Dict:
+        body = self.inner.execute(payload, headers)
+        self.last_response_bytes = getattr(self.inner, "last_response_bytes", 0)
+        fixture = self.fixtures_dir / f"{_payload_key(payload)}.json"
+        fixture.write_text(json.dumps({"request": payload, "response": body}))
+        return body
+
+
+class ReplayTransport:
+    """Answer requests from fixtures saved by RecordingTransport."""
+
+    requires_token = False
+
+    def __init__(self, fixtures_dir: str, latency: float = 0.0):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.latency = latency
+        if not self.fixtures_dir.is_dir():
+            raise FileNotFoundError(f"Fixtures directory not found: {fixtures_dir}")
+
+    def execute(self, payload: Dict, headers: Dict) -> Dict:
+        fixture = self.fixtures_dir / f"{_payload_key(payload)}.json"
+        if not fixture.exists():
+            raise Exception(f"No recorded Monday response for request {fixture.stem}")
+        if self.latency:
+            time.sleep(self.latency)
+        recorded = json.loads(fixture.read_text())["response"]
+        self.last_response_bytes = len(json.dumps(recorded))
+        return recorded
+
+
+# ---------------------------------------------------------------------------
+# Synthetic boards
+# ---------------------------------------------------------------------------
+
+STATUS_LABELS = ["Paid", "Pending", "Overdue", "Partial", "Received"]
+PLAN_LABELS = ["Installments", "Single Payment", "Studentluxe", "Special Payment Terms"]
+COUNTRIES = [("GB", "United Kingdom"), ("CN", "China"), ("US", "United States"), ("IN", "India"), ("FR", "France")]
+DROPDOWN_LABELS = ["UCL", "KCL", "LSE", "Imperial", "SOAS", "Classic", "Deluxe", "Double", "Ground"]
+FIRST_NAMES = ["Alex", "Sam", "Li", "Priya", "Omar", "Chloe", "Ana", "Tom", "Yuki", "Noah"]
+LAST_NAMES = ["Smith", "Wang", "Patel", "Garcia", "Brown", "Kim", "Silva", "Martin", "Khan", "Rossi"]
+
+
+def _room_names(count: int) -> List[str]:
+    """Room ids in the Unit Schedule style (-1.1, 0.12, 3.4, MEZZ 10, ...)."""
+    rooms = []
+    floor = -1
+    while len(rooms) < count:
+        for n in range(1, 21):
+            rooms.append(f"{floor}.{n}")
+        rooms.append(f"MEZZ {floor + 2}")
+        floor += 1
+    return rooms[:count]
+
+
+def _synthetic_cell(rng: random.Random, key: str, column_id: str, room_names: List[str], empty_rate: float) -> Dict:
+    """Generate a column value shaped like Monday's, based on the column id prefix."""
+    if rng.random() < empty_rate:
+        return {"id": column_id, "text": "", "value": None}
+
+    kind = column_id.split("_")[0]
+    if key == "unit" or (kind == "text" and "unit" in key):
+        room = rng.choice(room_names)
+        # Won Deals writes mezzanines as M10, the Unit Schedule as MEZZ 10
+        if room.startswith("MEZZ ") and rng.random() < 0.5:
+            room = f"M{room[5:]}"
+        return {"id": column_id, "text": room, "value": json.dumps(room)}
+    if kind == "timerange":
+        start = date(2025, 8, 1) + timedelta(days=rng.randint(0, 60))
+        end = start + timedelta(weeks=rng.randint(20, 51))
+        return {
+            "id": column_id,
+            "text": f"{start} - {end}",
+            "value": json.dumps({"from": start.isoformat(), "to": end.isoformat()}),
+        }
+    if kind == "date":
+        d = date(2025, 1, 1) + timedelta(days=rng.randint(0, 600))
+        return {"id": column_id, "text": d.isoformat(), "value": json.dumps({"date": d.isoformat()})}
+    if kind in ("numeric", "formula"):
+        number = round(rng.uniform(200, 9000), 2)
+        value = json.dumps(str(number)) if kind == "numeric" else None
+        return {"id": column_id, "text": f"{number:,.2f}", "value": value}
+    if kind in ("color", "status", "deal") or column_id == "deal_stage":
+        labels = PLAN_LABELS if "plan" in key else STATUS_LABELS
+        index = rng.randrange(len(labels))
+        return {"id": column_id, "text": labels[index], "value": json.dumps({"index": index})}
+    if kind == "country":
+        code, name = rng.choice(COUNTRIES)
+        return {"id": column_id, "text": name, "value": json.dumps({"countryCode": code, "countryName": name})}
+    if kind == "dropdown":
+        index = rng.randrange(len(DROPDOWN_LABELS))
+        return {"id": column_id, "text": DROPDOWN_LABELS[index], "value": json.dumps({"ids": [index]})}
+    if kind == "boolean":
+        checked = rng.random() < 0.5
+        return {"id": column_id, "text": "v" if checked else "", "value": json.dumps({"checked": checked}) if checked else None}
+
+    word = rng.choice(DROPDOWN_LABELS)
+    return {"id": column_id, "text": word, "value": json.dumps(word)}
+
+
+class FakeBoard:
+    """An in-memory Monday board: metadata, columns and items."""
+
+    def __init__(self, board_id: str, name: str, columns: List[Dict], items: List[Dict]):
+        self.board_id = str(board_id)
+        self.name = name
+        self.columns = columns
+        self.items = items
+        self.updated_at = max((item["updated_at"] for item in items), default="2025-01-01T00:00:00Z")
+
+    def as_metadata(self) -> Dict:
+        return {
+            "id": self.board_id,
+            "name": self.name,
+            "description": None,
+            "state": "active",
+            "updated_at": self.updated_at,
+            "items_count": len(self.items),
+            "columns": self.columns,
+        }
+
+
+def synthetic_board(
+    board_id: str,
+    name: str,
+    column_map: Dict[str, str],
+    n_items: int,
+    seed: int = 0,
+    empty_rate: float = 0.03,
+    item_names: Optional[List[str]] = None,
+) -> FakeBoard:
+    """
+    Build a board with `n_items` items using the given {field: column_id} map,
+    e.g. COLUMN_MAP or ROOM_COLUMN_MAP from scripts/sync_monday.py.
+
+    Values are generated from the Monday column type encoded in each column id
+    prefix (date_, numeric_, timerange_, color_, ...). A small share of cells is
+    left empty so the skip paths get exercised too.
+    """
+    rng = random.Random(seed)
+    room_names = _room_names(120)
+    columns = [
+        {"id": column_id, "title": key.replace("_", " ").title(), "type": column_id.split("_")[0]}
+        for key, column_id in column_map.items()
+    ]
+
+    base_id = int(board_id) * 1000
+    items = []
+    for n in range(n_items):
+        if item_names:
+            item_name = item_names[n % len(item_names)]
+        else:
+            item_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}"
+        updated = date(2025, 1, 1) + timedelta(days=rng.randint(0, 600))
+        items.append({
+            "id": str(base_id + n),
+            "name": item_name,
+            "created_at": f"{updated}T09:00:00Z",
+            "updated_at": f"{updated}T12:00:00Z",
+            "board": {"id": str(board_id)},
+            "column_values": [
+                _synthetic_cell(rng, key, column_id, room_names, empty_rate)
+                for key, column_id in column_map.items()
+            ],
+        })
+
+    return FakeBoard(board_id, name, columns, items)
+
+
+# ---------------------------------------------------------------------------
+# Minimal GraphQL evaluation
+# ---------------------------------------------------------------------------
+
+_FIELD_RE = re.compile(r"\s*(?:(\w+)\s*:\s*)?(\w+)\s*")
+_ARG_RE = re.compile(r'(\w+)\s*:\s*(\$\w+|\[[^\]]*\]|"[^"]*"|[\w.-]+)')
+
+
+def _matching_brace(text: str, start: int) -> int:
+    depth = 0
+    for pos in range(start, len(text)):
+        if text[pos] == "{":
+            depth += 1
+        elif text[pos] == "}":
+            depth -= 1
+            if depth == 0:
+                return pos
+    raise ValueError("Unbalanced braces in query")
+
+
+def _resolve_arg(raw: str, variables: Dict):
+    raw = raw.strip()
+    if raw.startswith("$"):
+        return variables.get(raw[1:])
+    if raw.startswith("["):
+        return [_resolve_arg(part, variables) for part in raw[1:-1].split(",") if part.strip()]
+    if raw.startswith('"'):
+        return raw[1:-1]
+    if raw.lstrip("-").isdigit():
+        return int(raw)
+    return raw
+
+
+def _parse_args(text: str, variables: Dict) -> Dict:
+    return {name: _resolve_arg(raw, variables) for name, raw in _ARG_RE.findall(text)}
+
+
+def _selections(body: str, variables: Dict) -> List[Dict]:
+    """Split a selection set body into fields: alias, name, args and sub-selection text."""
+    fields = []
+    pos = 0
+    while pos < len(body):
+        match = _FIELD_RE.match(body, pos)
+        if not match or not match.group(2):
+            pos += 1
+            continue
+        alias, name = match.group(1), match.group(2)
+        pos = match.end()
+
+        args = {}
+        if pos < len(body) and body[pos] == "(":
+            close = body.index(")", pos)
+            args = _parse_args(body[pos + 1:close], variables)
+            pos = close + 1
+            while pos < len(body) and body[pos].isspace():
+                pos += 1
+
+        sub = None
+        if pos < len(body) and body[pos] == "{":
+            close = _matching_brace(body, pos)
+            sub = body[pos + 1:close]
+            pos = close + 1
+
+        fields.append({"alias": alias or name, "name": name, "args": args, "sub": sub})
+    return fields
+
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+class FakeMondayTransport:
+    """
+    Serve synthetic boards through the Monday GraphQL shapes the client uses:
+    boards (metadata, columns, items_page), next_items_page, items(ids:) and
+    complexity, including aliased top-level fields.
+
+    Args:
+        boards: FakeBoard instances to serve
+        latency: seconds added to every request
+        jitter: extra random latency, up to this many seconds
+        error_rate: probability of a transient HTTP 500 per request
+        complexity_budget: complexity points available per window (None = unlimited)
+        complexity_window: seconds after which the budget resets
+        seed: seed for the error/jitter generator
+    """
+
+    requires_token = False
+
+    def __init__(
+        self,
+        boards: List[FakeBoard],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        complexity_budget: Optional[int] = None,
+        complexity_window: float = 60.0,
+        seed: int = 0,
+    ):
+        self.boards = {board.board_id: board for board in boards}
+        self.items_by_id = {item["id"]: item for board in boards for item in board.items}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.complexity_budget = complexity_budget
+        self.complexity_window = complexity_window
+        self._rng = random.Random(seed)
+        self._budget_used = 0
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.stats = {"requests": 0, "errors_injected": 0, "complexity_used": 0, "bytes_sent": 0}
+
+    # Cursors are opaque to clients; encode board and offset like Monday's do
+    @staticmethod
+    def _encode_cursor(board_id: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{board_id}:{offset}".encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        board_id, _, offset = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+        return board_id, int(offset)
+
+    def _page(self, board: FakeBoard, offset: int, limit: int) -> Dict:
+        items = board.items[offset:offset + limit]
+        next_offset = offset + limit
+        cursor = self._encode_cursor(board.board_id, next_offset) if next_offset < len(board.items) else None
+        return {"cursor": cursor, "items": items}
+
+    @staticmethod
+    def _cost(field: Dict, returned_items: int) -> int:
+        # Rough model of Monday's complexity: a base cost per field plus a
+        # cost per item proportional to the columns requested
+        per_item = 10 if "column_values" in (field["sub"] or "") else 1
+        return 1000 + returned_items * per_item
+
+    def _resolve_field(self, field: Dict, variables: Dict):
+        name, args, sub = field["name"], field["args"], field["sub"] or ""
+
+        if name == "boards":
+            ids = _as_list(args.get("ids")) or list(self.boards)
+            result = []
+            returned = 0
+            for board_id in ids:
+                board = self.boards.get(board_id)
+                if not board:
+                    continue
+                data = board.as_metadata()
+                page_match = re.search(r"items_page\s*(\(([^)]*)\))?", sub)
+                if page_match:
+                    page_args = _parse_args(page_match.group(2) or "", variables)
+                    limit = int(page_args.get("limit") or 25)
+                    cursor = page_args.get("cursor")
+                    offset = self._decode_cursor(cursor)[1] if cursor else 0
+                    data["items_page"] = self._page(board, offset, limit)
+                    returned += len(data["items_page"]["items"])
+                result.append(data)
+            return result, self._cost(field, returned)
+
+        if name == "next_items_page":
+            board_id, offset = self._decode_cursor(args["cursor"])
+            page = self._page(self.boards[board_id], offset, int(args.get("limit") or 25))
+            return page, self._cost(field, len(page["items"]))
+
+        if name == "items":
+            items = [self.items_by_id[i] for i in _as_list(args.get("ids")) if i in self.items_by_id]
+            return items, self._cost(field, len(items))
+
+        return None, 0
+
+    def execute(self, payload: Dict, headers: Dict) -> Dict:
+        self.stats["requests"] += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self._rng.uniform(0, self.jitter))
+
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.stats["errors_injected"] += 1
+            raise Exception("Monday API error: 500")
+
+        with self._lock:
+            return self._evaluate(payload.get("query", ""), payload.get("variables") or {})
+
+    def _evaluate(self, query: str, variables: Dict) -> Dict:
+        open_pos = query.index("{")
+        fields = _selections(query[open_pos + 1:_matching_brace(query, open_pos)], variables)
+
+        if time.monotonic() - self._window_start >= self.complexity_window:
+            self._budget_used = 0
+            self._window_start = time.monotonic()
+
+        data = {}
+        query_cost = 0
+        complexity_fields = []
+        for field in fields:
+            if field["name"] == "complexity":
+                complexity_fields.append(field)
+                continue
+            value, cost = self._resolve_field(field, variables)
+            data[field["alias"]] = value
+            query_cost += cost
+
+        if self.complexity_budget is not None:
+            remaining = self.complexity_budget - self._budget_used
+            if query_cost > remaining:
+                retry_in = int(self.complexity_window - (time.monotonic() - self._window_start)) + 1
+                return {
+                    "errors": [{
+                        "message": f"Complexity budget exhausted, query cost {query_cost} budget remaining {remaining}",
+                        "extensions": {"code": "ComplexityException", "retry_in_seconds": retry_in},
+                    }]
+                }
+
+        before = (self.complexity_budget or 10_000_000) - self._budget_used
+        self._budget_used += query_cost
+        self.stats["complexity_used"] += query_cost
+        for field in complexity_fields:
+            data[field["alias"]] = {
+                "before": before,
+                "after": before - query_cost,
+                "query": query_cost,
+                "reset_in_x_seconds": int(self.complexity_window - (time.monotonic() - self._window_start)),
+            }
+
+        body = {"data": data}
+        self.last_response_bytes = len(json.dumps(body))
+        self.stats["bytes_sent"] += self.last_response_bytes
+        return body
+
+
+def serve(transport, port: int = 8765):
+    """Expose a transport as a local Monday GraphQL endpoint (blocking)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            try:
+                body = transport.execute(payload, dict(self.headers))
+                status = 200
+            except Exception as e:
+                body = {"error_message": str(e)}
+                status = 500
+            encoded = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    logger.info(f"Fake Monday API listening on http://127.0.0.1:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    project_root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(project_root))
+
+    from scripts.sync_monday import COLUMN_MAP, ROOM_COLUMN_MAP
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Serve a fake Monday API")
+    parser.add_argument("--items", type=int, default=1000, help="Items on the Won Deals board")
+    parser.add_argument("--rooms", type=int, default=120, help="Items on the Unit Schedule board")
+    parser.add_argument("--replay", help="Serve recorded fixtures from this directory instead")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an HTTP 500 per request")
+    parser.add_argument("--complexity-budget", type=int, default=None, help="Complexity points per minute")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.replay:
+        fake = ReplayTransport(args.replay, latency=args.latency)
+    else:
+        rooms_board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770")
+        deals_board_id = os.getenv("MONDAY_BOARD_ID_PAYMENTS", "8606133913")
+        fake = FakeMondayTransport(
+            [
+                synthetic_board(rooms_board_id, "MH - Unit Schedule", ROOM_COLUMN_MAP, args.rooms,
+                                item_names=_room_names(args.rooms)),
+                synthetic_board(deals_board_id, "Won Deals", COLUMN_MAP, args.items, seed=1),
+            ],
+            latency=args.latency,
+            error_rate=args.error_rate,
+            complexity_budget=args.complexity_budget,
+        )
+
+    serve(fake, port=args.port)
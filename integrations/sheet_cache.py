@@ -0,0 +1,143 @@
+# integrations/sheet_cache.py
+"""
+On-disk cache of parsed Excel sheets.
+
+Parsing a large workbook with openpyxl is the slow part of an import, and
+the same report is often imported several times. Each parsed sheet is stored
+as a Parquet file under a directory named after the workbook's fingerprint
+(size + SHA-256 of its bytes), so a re-run of an unchanged file reads Parquet
+instead of XML, and any edit to the file is a new fingerprint (a cache miss).
+
+Needs pyarrow; without it `SheetCache.enabled` is False and sheets are
+always parsed from the workbook.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional: the cache is disabled without it
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "excel"
+
+# Bumped when parsing changes, so older cached frames are not reused
+CACHE_VERSION = 1
+
+# Workbooks (fingerprint directories) kept; the least recently used are removed
+MAX_CACHED_WORKBOOKS = 20
+
+_HASH_BLOCK = 1 << 20
+
+
+def fingerprint(path) -> str:
+    """Size and SHA-256 of a file's contents, as '<size>-<sha256>'."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK):
+            digest.update(block)
+    return f"{os.path.getsize(path)}-{digest.hexdigest()}"
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    `df` with object columns Arrow can't type (mixed cell types, e.g. dates
+    and text) as text: midnight datetimes as YYYY-MM-DD, anything else via
+    str(). Cleaning parses text the same way it parses typed cells.
+    """
+    df = df.copy()
+    for column in df.select_dtypes(include="object").columns:
+        try:
+            pyarrow.array(df[column], from_pandas=True)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            df[column] = df[column].map(_as_text, na_action="ignore")
+    return df
+
+
+def _as_text(value) -> str:
+    if isinstance(value, datetime) and value == datetime.combine(value.date(), datetime.min.time()):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+class SheetCache:
+    """
+    Parsed sheets as Parquet files: <cache_dir>/v<version>-<fingerprint>/<sheet>.h<header>.parquet
+
+    The directory defaults to EXCEL_CACHE_DIR (or .cache/excel in the project).
+    Files are written to a temporary name and renamed, so a crashed or
+    concurrent import never leaves a partial file behind.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("EXCEL_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+    @property
+    def enabled(self) -> bool:
+        return pyarrow is not None
+
+    def _path(self, fp: str, sheet_name: str, header: int) -> Path:
+        slug = "".join(c if c.isalnum() else "_" for c in sheet_name)
+        return self.cache_dir / f"v{CACHE_VERSION}-{fp}" / f"{slug}.h{header}.parquet"
+
+    def has(self, fp: str, sheet_name: str, header: int) -> bool:
+        return self.enabled and self._path(fp, sheet_name, header).exists()
+
+    def load(self, fp: str, sheet_name: str, header: int,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        A cached sheet, or None on a miss. Only `columns` present in the sheet
+        are read (all if omitted).
+        """
+        if not self.enabled:
+            return None
+        path = self._path(fp, sheet_name, header)
+        if not path.exists():
+            return None
+        try:
+            if columns is not None:
+                names = set(pyarrow.parquet.read_schema(path).names)
+                columns = [c for c in columns if c in names]
+            df = pd.read_parquet(path, columns=columns)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached sheet {path}: {e}")
+            return None
+        # Marks the workbook as recently used, for pruning
+        os.utime(path.parent)
+        return df
+
+    def save(self, fp: str, sheet_name: str, header: int, df: pd.DataFrame):
+        """Cache a parsed sheet. Failures are logged, not raised: the cache is an optimisation."""
+        if not self.enabled:
+            return
+        path = self._path(fp, sheet_name, header)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _arrow_safe(df).to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Could not cache sheet '{sheet_name}' at {path}: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+        self._prune()
+
+    def _prune(self):
+        workbooks = sorted(
+            (d for d in self.cache_dir.iterdir() if d.is_dir()),
+            key=lambda d: d.stat().st_mtime, reverse=True,
+        )
+        for stale in workbooks[MAX_CACHED_WORKBOOKS:]:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,125 @@
+# scripts/bench_sync.py
+"""
+Benchmark the Monday sync against a local fake Monday API.
+
+Generates synthetic Unit Schedule / Won Deals boards using the real column ids
+(ROOM_COLUMN_MAP / COLUMN_MAP), or replays recorded responses, and times the
+fetch + mapping path. With --db it runs the full sync against the database
+in TIMESCALE_SERVICE_URL (use a scratch schema via DB_SCHEMA).
+
+Record fixtures from the live account once with:
+    MONDAY_TRANSPORT=record:fixtures/monday python scripts/sync_monday.py --dry-run
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import logging
+
+from integrations.monday_client import MondayClient
+from integrations.monday_fake import FakeMondayTransport, ReplayTransport, synthetic_board, _room_names
+from utils.sync_profile import format_profile
+from scripts.sync_monday import (
+    COLUMN_MAP,
+    ROOM_COLUMN_MAP,
+    map_contract_item,
+    map_room_item,
+    run_full_sync,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def build_transport(args):
+    """Fake transport from the CLI options."""
+    if args.replay:
+        return ReplayTransport(args.replay, latency=args.latency)
+
+    rooms_board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770")
+    deals_board_id = os.getenv("MONDAY_BOARD_ID_PAYMENTS", "8606133913")
+    # run_full_sync reads the Won Deals board id from the environment
+    os.environ.setdefault("MONDAY_BOARD_ID_PAYMENTS", deals_board_id)
+
+    return FakeMondayTransport(
+        [
+            synthetic_board(rooms_board_id, "MH - Unit Schedule", ROOM_COLUMN_MAP, args.rooms,
+                            item_names=_room_names(args.rooms)),
+            synthetic_board(deals_board_id, "Won Deals", COLUMN_MAP, args.items, seed=args.seed),
+        ],
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        complexity_budget=args.complexity_budget,
+        seed=args.seed,
+    )
+
+
+def bench_fetch_and_map(client: MondayClient):
+    """Time fetching and mapping both boards, without touching the database."""
+    rooms_board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770")
+    deals_board_id = os.getenv("MONDAY_BOARD_ID_PAYMENTS", "8606133913")
+
+    timings = {}
+
+    start = time.perf_counter()
+    room_items = client.get_all_board_items(rooms_board_id)
+    timings['fetch_rooms'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    deal_items = client.get_all_board_items(deals_board_id)
+    timings['fetch_contracts'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rooms = [r for r in (map_room_item(item) for item in room_items) if r]
+    timings['map_rooms'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contracts = [c for c in (map_contract_item(item) for item in deal_items) if c]
+    timings['map_contracts'] = time.perf_counter() - start
+
+    logger.info(f"Rooms: {len(room_items)} fetched, {len(rooms)} mapped")
+    logger.info(f"Contracts: {len(deal_items)} fetched, {len(contracts)} mapped")
+    return timings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the Monday sync offline")
+    parser.add_argument("--items", type=int, default=1000, help="Won Deals items to generate")
+    parser.add_argument("--rooms", type=int, default=120, help="Unit Schedule items to generate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replay", help="Replay recorded fixtures from this directory")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an HTTP 500 per request")
+    parser.add_argument("--complexity-budget", type=int, default=None, help="Complexity points per minute")
+    parser.add_argument("--db", action="store_true", help="Run the full sync against the database")
+    args = parser.parse_args()
+
+    transport = build_transport(args)
+    client = MondayClient(transport=transport)
+
+    if args.db:
+        start = time.perf_counter()
+        stats = run_full_sync(client=client)
+        timings = {'full_sync': time.perf_counter() - start}
+        timings.update({
+            stage: stats['pipeline'][f'{stage}_seconds'] for stage in ('fetch', 'map', 'write')
+        })
+        logger.info("\n" + format_profile(stats['profile']))
+    else:
+        timings = bench_fetch_and_map(client)
+
+    logger.info("\n=== Benchmark ===")
+    for phase, seconds in timings.items():
+        logger.info(f"{phase:<18} {seconds * 1000:10.1f} ms")
+    if isinstance(transport, FakeMondayTransport):
+        logger.info(f"Fake API stats: {transport.stats}")
@@ -11,11 +11,13 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
+import pandas as pd
 import psycopg2
 from dotenv import load_dotenv
 import logging
-from integrations.excel_importer import ExcelImporter
 from backend.services.cashflow_service import CashFlowService
+from integrations.excel_importer import CONTRACT_COLUMNS, OPEX_COLUMNS, ExcelImporter, contract_import_key
+from utils.bulk_load import copy_dataframe
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,14 +26,115 @@ load_dotenv()
 
 SCHEMA_NAME = os.getenv("DB_SCHEMA", "more_house")
 
+STAGE_ROOMS_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS stage_rooms (
+    room_id VARCHAR(20),
+    floor VARCHAR(10),
+    sqm DECIMAL(6,2),
+    category VARCHAR(50),
+    weekly_rate DECIMAL(10,2)
+) ON COMMIT DROP;
 
-def import_data(file_path: str, clear_existing: bool = False):
+TRUNCATE stage_rooms;
+"""
+
+STAGE_CONTRACTS_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS stage_excel_contracts (
+    import_key VARCHAR(300) PRIMARY KEY,
+    room_id VARCHAR(20),
+    resident_name VARCHAR(200),
+    start_date DATE,
+    end_date DATE,
+    weekly_rate DECIMAL(10,2),
+    total_value DECIMAL(12,2),
+    weeks_booked DECIMAL(6,2),
+    payment_plan VARCHAR(50),
+    nationality VARCHAR(100),
+    university VARCHAR(200),
+    level_of_study VARCHAR(100),
+    source VARCHAR(100),
+    lead_source VARCHAR(100),
+    status VARCHAR(30)
+) ON COMMIT DROP;
+
+-- Contract ids returned by the upsert, by import key
+CREATE TEMP TABLE IF NOT EXISTS stage_excel_contract_ids (
+    import_key VARCHAR(300) PRIMARY KEY,
+    contract_id INTEGER,
+    inserted BOOLEAN
+) ON COMMIT DROP;
+
+TRUNCATE stage_excel_contracts, stage_excel_contract_ids;
+"""
+
+_CONTRACT_UPDATES = ",\n        ".join(f"{column} = EXCLUDED.{column}" for column in CONTRACT_COLUMNS)
+
+UPSERT_CONTRACTS_SQL = f"""
+WITH upserted AS (
+    INSERT INTO contracts (import_key, {', '.join(CONTRACT_COLUMNS)})
+    SELECT import_key, {', '.join(CONTRACT_COLUMNS)} FROM stage_excel_contracts
+    ON CONFLICT (import_key) DO UPDATE SET
+        {_CONTRACT_UPDATES},
+        updated_at = NOW()
+    RETURNING import_key, id, (xmax = 0)
+)
+INSERT INTO stage_excel_contract_ids SELECT * FROM upserted
+"""
+
+
+def load_contracts(cursor, contracts) -> dict:
+    """
+    Upsert Booked Units contracts by import key (so a re-import updates them),
+    and generate expected payment schedules for those that have none.
+
+    Schedules already in the database, with actual due dates from Monday or
+    the Installments export, are left alone.
+    """
+    contracts = contracts.assign(
+        import_key=contract_import_key(contracts["resident_name"], contracts["start_date"])
+    )
+    duplicated = contracts["import_key"].duplicated(keep="last")
+    if duplicated.any():
+        logger.warning(f"{duplicated.sum()} duplicate contract(s) (same name and start date); keeping the last")
+        contracts = contracts[~duplicated]
+
+    cursor.execute(STAGE_CONTRACTS_SQL)
+    copy_dataframe(cursor, "stage_excel_contracts", contracts, columns=["import_key"] + CONTRACT_COLUMNS)
+    cursor.execute(UPSERT_CONTRACTS_SQL)
+    cursor.execute("SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM stage_excel_contract_ids")
+    created, updated = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT i.import_key, i.contract_id
+        FROM stage_excel_contract_ids i
+        WHERE NOT EXISTS (SELECT 1 FROM payment_schedule ps WHERE ps.contract_id = i.contract_id)
+    """)
+    ids = pd.DataFrame(cursor.fetchall(), columns=["import_key", "contract_id"])
+    schedule = CashFlowService.generate_payment_schedules(contracts.merge(ids, on="import_key"))
+    payments = copy_dataframe(cursor, "payment_schedule", schedule)
+
+    return {"created": created, "updated": updated, "payments": payments}
+
+
+def load_opex(cursor, opex) -> int:
+    """
+    Replace the budget versions in `opex` (an ExcelImporter.opex_frame) with
+    its rows: one DELETE and one COPY, so a re-import doesn't add duplicates
+    and other versions are left as they are.
+    """
+    versions = opex["budget_version"].unique().tolist()
+    cursor.execute("DELETE FROM opex_budget WHERE budget_version = ANY(%s)", (versions,))
+    return copy_dataframe(cursor, "opex_budget", opex, columns=OPEX_COLUMNS)
+
+
+def import_data(file_path: str, clear_existing: bool = False, budget_version: str = None):
     """
     Import data from Excel file into database.
 
     Args:
         file_path: Path to the Excel file
         clear_existing: If True, clear existing data before import
+        budget_version: Name to store the OPEX budget under (default: the file name)
     """
     connection_string = os.getenv("TIMESCALE_SERVICE_URL")
     if not connection_string:
@@ -41,7 +144,10 @@ def import_data(file_path: str, clear_existing: bool = False):
     # Load Excel data
     logger.info(f"Loading Excel file: {file_path}")
     importer = ExcelImporter(file_path)
-    rooms, contracts = importer.import_booked_units()
+    # Parses (in parallel) and caches the report's sheets, unless already cached
+    importer.preload()
+    rooms, contracts = importer.booked_units_frames()
+    opex = importer.opex_frame(budget_version)
 
     logger.info(f"Found {len(rooms)} rooms and {len(contracts)} contracts")
 
@@ -59,86 +165,31 @@ def import_data(file_path: str, clear_existing: bool = False):
             cursor.execute(f"DELETE FROM {SCHEMA_NAME}.rooms")
             conn.commit()
 
-        # Insert rooms
-        logger.info("Inserting rooms...")
-        for room in rooms:
-            cursor.execute("""
-                INSERT INTO rooms (room_id, floor, category, sqm, weekly_rate)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (room_id) DO UPDATE SET
-                    floor = EXCLUDED.floor,
-                    category = EXCLUDED.category,
-                    sqm = EXCLUDED.sqm,
-                    weekly_rate = EXCLUDED.weekly_rate
-            """, (
-                room['room_id'],
-                room['floor'],
-                room['category'],
-                room['sqm'],
-                room['weekly_rate']
-            ))
-        conn.commit()
-        logger.info(f"Inserted/updated {len(rooms)} rooms")
-
-        # Insert contracts and generate payment schedules
-        logger.info("Inserting contracts...")
-        contracts_inserted = 0
-        payments_inserted = 0
-
-        for contract in contracts:
-            cursor.execute("""
-                INSERT INTO contracts (
-                    room_id, resident_name, start_date, end_date,
-                    weekly_rate, total_value, weeks_booked,
-                    payment_plan, status, nationality, university, source
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                contract['room_id'],
-                contract['resident_name'],
-                contract['start_date'],
-                contract['end_date'],
-                contract['weekly_rate'],
-                contract['total_value'],
-                contract['weeks_booked'],
-                contract['payment_plan'],
-                contract['status'],
-                contract.get('nationality'),
-                contract.get('university'),
-                contract.get('source')
-            ))
-
-            contract_id = cursor.fetchone()[0]
-            contracts_inserted += 1
-
-            # Generate payment schedule
-            payments = CashFlowService.generate_payment_schedule(
-                contract_id=contract_id,
-                total_value=contract['total_value'],
-                start_date=contract['start_date'],
-                end_date=contract['end_date'],
-                payment_plan=contract['payment_plan']
-            )
-
-            for payment in payments:
-                cursor.execute("""
-                    INSERT INTO payment_schedule (
-                        contract_id, due_date, amount, payment_type, status
-                    )
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    payment['contract_id'],
-                    payment['due_date'],
-                    payment['amount'],
-                    payment['payment_type'],
-                    payment['status']
-                ))
-                payments_inserted += 1
+        # Rooms: COPY into a staging table, then upsert in one statement
+        logger.info("Loading rooms...")
+        cursor.execute(STAGE_ROOMS_SQL)
+        copy_dataframe(cursor, "stage_rooms", rooms)
+        cursor.execute("""
+            INSERT INTO rooms (room_id, floor, category, sqm, weekly_rate)
+            SELECT room_id, floor, category, sqm, weekly_rate FROM stage_rooms
+            ON CONFLICT (room_id) DO UPDATE SET
+                floor = EXCLUDED.floor,
+                category = EXCLUDED.category,
+                sqm = EXCLUDED.sqm,
+                weekly_rate = EXCLUDED.weekly_rate
+        """)
+        logger.info(f"Inserted/updated {cursor.rowcount} rooms")
+
+        logger.info("Loading contracts and payment schedules...")
+        loaded = load_contracts(cursor, contracts)
+
+        logger.info("Loading OPEX budget...")
+        opex_inserted = load_opex(cursor, opex)
 
         conn.commit()
-        logger.info(f"Inserted {contracts_inserted} contracts")
-        logger.info(f"Generated {payments_inserted} payment schedule entries")
+        logger.info(f"Contracts created: {loaded['created']}, updated: {loaded['updated']}")
+        logger.info(f"Generated {loaded['payments']} payment schedule entries")
+        logger.info(f"Inserted {opex_inserted} OPEX amounts")
 
         # Summary
         cursor.execute("SELECT COUNT(*) FROM rooms")
@@ -169,6 +220,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import Excel data into database")
     parser.add_argument("file", help="Path to Excel file")
     parser.add_argument("--clear", action="store_true", help="Clear existing data before import")
+    parser.add_argument("--budget-version", help="Name of the OPEX budget version (default: the file name); "
+                                                 "an existing version of that name is replaced")
     args = parser.parse_args()
 
-    import_data(args.file, clear_existing=args.clear)
+    import_data(args.file, clear_existing=args.clear, budget_version=args.budget_version)
@@ -17,7 +17,11 @@ import pandas as pd
 import psycopg2
 from dotenv import load_dotenv
 import logging
-from datetime import datetime
+from typing import Tuple
+
+from integrations.excel_importer import CHUNK_ROWS, ExcelImporter, contract_import_key, date_column, text_column
+from utils.bulk_load import copy_dataframe
+from utils.room_registry import RoomRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,19 +30,133 @@ load_dotenv()
 
 SCHEMA_NAME = os.getenv("DB_SCHEMA", "more_house")
 
+# The export writes dates as YYYY-MM-DD
+DATE_FORMATS = ("%Y-%m-%d",)
+
+
+# Installment number -> (due date column, amount column); 0 is the booking fee
+SCHEDULE_COLUMNS = {
+    0: ('📅Booking Fee Due Date', 'Booking Fee Payment Amount'),
+    **{i: (f'📅Installment {i} Due Date', f'Installment {i} Amount') for i in range(1, 6)},
+}
+
+# Export columns read (the rest of the sheet is skipped as it streams)
+SHEET_COLUMNS = [
+    'Name', 'Unit Booked New', 'Gross Income', 'Payment Plan',
+    'Actual Length of Stay - Start', 'Actual Length of Stay - End',
+    *(column for pair in SCHEDULE_COLUMNS.values() for column in pair),
+]
+
+STAGE_TABLES_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS stage_installment_contracts (
+    import_key VARCHAR(300) PRIMARY KEY,
+    room_id VARCHAR(20),
+    resident_name VARCHAR(200),
+    start_date DATE,
+    end_date DATE,
+    total_value DECIMAL(12,2),
+    payment_plan VARCHAR(50)
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE IF NOT EXISTS stage_installment_schedule (
+    import_key VARCHAR(300),
+    installment_number SMALLINT,
+    due_date DATE,
+    amount DECIMAL(10,2)
+) ON COMMIT DROP;
+
+-- Contract ids returned by the upsert, by import key
+CREATE TEMP TABLE IF NOT EXISTS stage_installment_ids (
+    import_key VARCHAR(300) PRIMARY KEY,
+    contract_id INTEGER,
+    inserted BOOLEAN
+) ON COMMIT DROP;
+
+TRUNCATE stage_installment_contracts, stage_installment_schedule, stage_installment_ids;
+"""
+
+
+def _clean_installments(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Clean one chunk of export rows into (contracts, schedule).
+
+    Both keep the sheet row number in 'row'; contracts are not yet validated.
+    """
+    df = df.reindex(columns=SHEET_COLUMNS + ['row'])
+
+    contracts = pd.DataFrame({
+        'row': df['row'],
+        'resident_name': text_column(df['Name']),
+        'unit': text_column(df['Unit Booked New']),
+        'total_value': pd.to_numeric(df['Gross Income'], errors='coerce'),
+        'payment_plan': text_column(df['Payment Plan']).fillna('Unknown'),
+        'start_date': date_column(df['Actual Length of Stay - Start'], formats=DATE_FORMATS),
+        'end_date': date_column(df['Actual Length of Stay - End'], formats=DATE_FORMATS),
+    })
+
+    # Wide -> long: one row per (sheet row, installment number)
+    due_columns, amount_columns = zip(*SCHEDULE_COLUMNS.values())
+    due = df[list(due_columns)].set_axis(list(SCHEDULE_COLUMNS), axis=1)
+    amounts = df[list(amount_columns)].set_axis(list(SCHEDULE_COLUMNS), axis=1)
+    due = due.apply(date_column, formats=DATE_FORMATS)
+    amounts = amounts.apply(pd.to_numeric, errors='coerce')
+
+    schedule = amounts.assign(row=df['row']).melt(
+        id_vars='row', var_name='installment_number', value_name='amount'
+    )
+    # Same shape and column order, so the melted rows line up
+    schedule['due_date'] = due.assign(row=df['row']).melt(id_vars='row')['value'].to_numpy()
+    return contracts, schedule[schedule['amount'] > 0]
+
+
+def read_installments(file_path: str, chunk_size: int = CHUNK_ROWS) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    Read the Installments export into (contracts, schedule) frames.
+
+    The sheet is read (from the parsed-sheet cache after the first run) and
+    cleaned in chunks. Contracts need a name, unit, gross income and valid
+    stay dates, and are keyed by an import_key (name and start date) so
+    re-imports update them instead of adding duplicates. The booking fee and
+    installment due-date/amount column pairs are melted into one long
+    schedule frame (import_key, installment_number, due_date, amount) of
+    positive amounts.
+
+    Returns:
+        (contracts, schedule, rows skipped)
+    """
+    contracts, schedule = [], []
+    rows = 0
+    for chunk in ExcelImporter(file_path).iter_chunks(
+        0, header=4, columns={name: name for name in SHEET_COLUMNS}, chunk_size=chunk_size
+    ):
+        chunk['row'] = range(rows, rows + len(chunk))
+        rows += len(chunk)
+        chunk_contracts, chunk_schedule = _clean_installments(chunk)
+        contracts.append(chunk_contracts)
+        schedule.append(chunk_schedule)
+    logger.info(f"Found {rows} records")
+    if not rows:
+        return pd.DataFrame(), pd.DataFrame(), 0
+
+    contracts = pd.concat(contracts, ignore_index=True)
+    schedule = pd.concat(schedule, ignore_index=True)
+
+    valid = (
+        contracts['resident_name'].notna() & contracts['unit'].notna() & contracts['total_value'].notna()
+        & contracts['start_date'].notna() & contracts['end_date'].notna()
+        & (contracts['end_date'] >= contracts['start_date'])
+    )
+    skipped = int((~valid).sum())
+    contracts = contracts[valid].copy()
 
-def parse_date(value):
-    """Parse date from various formats."""
-    if pd.isna(value):
-        return None
-    if isinstance(value, datetime):
-        return value.date()
-    if isinstance(value, str):
-        try:
-            return datetime.strptime(value, "%Y-%m-%d").date()
-        except:
-            return None
-    return None
+    contracts['import_key'] = contract_import_key(contracts['resident_name'], contracts['start_date'])
+    duplicated = contracts['import_key'].duplicated(keep='last')
+    if duplicated.any():
+        logger.warning(f"{duplicated.sum()} duplicate row(s) (same name and start date); keeping the last")
+        contracts = contracts[~duplicated]
+
+    schedule = schedule.merge(contracts[['row', 'import_key']], on='row')
+    return contracts.reset_index(drop=True), schedule, skipped
 
 
 def import_installments(file_path: str, clear_existing: bool = False):
@@ -53,18 +171,20 @@ def import_installments(file_path: str, clear_existing: bool = False):
     - Actual Length of Stay - Start/End
     - Booking Fee Due Date + Amount
     - Installment 1-5 Due Date + Amount
+
+    Idempotent: contracts are upserted by import key and their schedules
+    replaced, so importing the same file twice changes nothing.
     """
     connection_string = os.getenv("TIMESCALE_SERVICE_URL")
     if not connection_string:
         logger.error("TIMESCALE_SERVICE_URL not set")
         sys.exit(1)
 
-    # Read Excel
     logger.info(f"Reading: {file_path}")
-    df = pd.read_excel(file_path, sheet_name=0, header=4)
-
-    logger.info(f"Found {len(df)} records")
-    logger.info(f"Columns: {df.columns.tolist()}")
+    contracts, schedule, skipped = read_installments(file_path)
+    if contracts.empty:
+        logger.warning(f"No contracts to import ({skipped} rows skipped)")
+        return
 
     try:
         conn = psycopg2.connect(dsn=connection_string)
@@ -77,89 +197,87 @@ def import_installments(file_path: str, clear_existing: bool = False):
             cursor.execute("DELETE FROM contracts")
             conn.commit()
 
-        contracts_created = 0
-        payments_created = 0
-        skipped = 0
-
-        for idx, row in df.iterrows():
-            resident_name = str(row.get('Name', '')).strip()
-            room_id = str(row.get('Unit Booked New', '')).strip()
-            total_value = row.get('Gross Income')
-            payment_plan = str(row.get('Payment Plan', '')).strip()
-            start_date = parse_date(row.get('Actual Length of Stay - Start'))
-            end_date = parse_date(row.get('Actual Length of Stay - End'))
-
-            if not resident_name or not room_id or pd.isna(total_value):
-                skipped += 1
-                continue
-
-            # Check if room exists, create if not
-            cursor.execute(
-                "SELECT room_id FROM rooms WHERE room_id = %s",
-                (room_id,)
-            )
-            if not cursor.fetchone():
-                cursor.execute("""
-                    INSERT INTO rooms (room_id, floor, category)
-                    VALUES (%s, %s, %s)
-                """, (room_id, 'TBD', 'TBD'))
-                logger.info(f"Created room: {room_id}")
-
-            # Create contract
-            cursor.execute("""
+        # Resolve each unit once; missing rooms are created in one statement
+        registry = RoomRegistry.load(cursor)
+        room_ids = {}
+        for unit, names in contracts.groupby('unit')['resident_name']:
+            for name in names:
+                room_ids[unit] = registry.resolve(unit, source=name)
+        registry.create_missing(cursor)
+        contracts['room_id'] = contracts['unit'].map(room_ids)
+
+        cursor.execute(STAGE_TABLES_SQL)
+        copy_dataframe(cursor, 'stage_installment_contracts', contracts, columns=[
+            'import_key', 'room_id', 'resident_name', 'start_date', 'end_date', 'total_value', 'payment_plan',
+        ])
+        copy_dataframe(cursor, 'stage_installment_schedule', schedule, columns=[
+            'import_key', 'installment_number', 'due_date', 'amount',
+        ])
+
+        # Upsert contracts, keeping the returned ids to map schedule rows onto
+        cursor.execute("""
+            WITH upserted AS (
                 INSERT INTO contracts (
-                    room_id, resident_name, start_date, end_date,
+                    import_key, room_id, resident_name, start_date, end_date,
                     total_value, payment_plan, status
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, 'active')
-                RETURNING id
-            """, (
-                room_id,
-                resident_name,
-                start_date,
-                end_date,
-                float(total_value) if pd.notna(total_value) else 0,
-                payment_plan if payment_plan else 'Unknown'
-            ))
-            contract_id = cursor.fetchone()[0]
-            contracts_created += 1
-
-            # Insert payment schedule entries
-            # Booking Fee (installment_number = 0)
-            booking_fee_due = parse_date(row.get('📅Booking Fee Due Date'))
-            booking_fee_amt = row.get('Booking Fee Payment Amount')
-            if pd.notna(booking_fee_amt) and float(booking_fee_amt) > 0:
-                cursor.execute("""
-                    INSERT INTO payment_schedule (
-                        contract_id, installment_number, due_date, amount, status
-                    )
-                    VALUES (%s, %s, %s, %s, 'pending')
-                """, (contract_id, 0, booking_fee_due, float(booking_fee_amt)))
-                payments_created += 1
-
-            # Installments 1-5
-            for i in range(1, 6):
-                due_date_col = f'📅Installment {i} Due Date'
-                amount_col = f'Installment {i} Amount'
-
-                due_date = parse_date(row.get(due_date_col))
-                amount = row.get(amount_col)
-
-                if pd.notna(amount) and float(amount) > 0:
-                    cursor.execute("""
-                        INSERT INTO payment_schedule (
-                            contract_id, installment_number, due_date, amount, status
-                        )
-                        VALUES (%s, %s, %s, %s, 'pending')
-                    """, (contract_id, i, due_date, float(amount)))
-                    payments_created += 1
+                SELECT import_key, room_id, resident_name, start_date, end_date,
+                       total_value, payment_plan, 'active'
+                FROM stage_installment_contracts
+                ON CONFLICT (import_key) DO UPDATE SET
+                    room_id = EXCLUDED.room_id,
+                    resident_name = EXCLUDED.resident_name,
+                    start_date = EXCLUDED.start_date,
+                    end_date = EXCLUDED.end_date,
+                    total_value = EXCLUDED.total_value,
+                    payment_plan = EXCLUDED.payment_plan,
+                    updated_at = NOW()
+                RETURNING import_key, id, (xmax = 0)
+            )
+            INSERT INTO stage_installment_ids SELECT * FROM upserted
+        """)
+        cursor.execute("SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM stage_installment_ids")
+        contracts_created, contracts_updated = cursor.fetchone()
+
+        # Installments dropped from the sheet since the last import (paid
+        # ones are kept: they record money received)
+        cursor.execute("""
+            DELETE FROM payment_schedule ps
+            USING stage_installment_ids i
+            WHERE ps.contract_id = i.contract_id
+            AND ps.status = 'pending'
+            AND NOT EXISTS (
+                SELECT 1 FROM stage_installment_schedule s
+                WHERE s.import_key = i.import_key AND s.installment_number = ps.installment_number
+            )
+        """)
+        payments_deleted = cursor.rowcount
+
+        cursor.execute("""
+            INSERT INTO payment_schedule (contract_id, installment_number, due_date, amount, status)
+            SELECT i.contract_id, s.installment_number, s.due_date, s.amount, 'pending'
+            FROM stage_installment_schedule s
+            JOIN stage_installment_ids i ON i.import_key = s.import_key
+            ON CONFLICT (contract_id, installment_number) DO UPDATE SET
+                due_date = EXCLUDED.due_date,
+                amount = EXCLUDED.amount,
+                updated_at = NOW()
+            WHERE (payment_schedule.due_date, payment_schedule.amount)
+                IS DISTINCT FROM (EXCLUDED.due_date, EXCLUDED.amount)
+        """)
+        payments_written = cursor.rowcount
 
         conn.commit()
 
         logger.info(f"\n=== Import Complete ===")
-        logger.info(f"Contracts created: {contracts_created}")
-        logger.info(f"Payment entries created: {payments_created}")
+        logger.info(f"Contracts created: {contracts_created}, updated: {contracts_updated}")
+        logger.info(f"Payment entries: {len(schedule)} in file, {payments_written} written, {payments_deleted} removed")
         logger.info(f"Rows skipped: {skipped}")
+        for unknown in registry.unknown_report():
+            logger.warning(
+                f"Unknown room {unknown['room_id']} (written as {', '.join(unknown['raw_ids'])}) "
+                f"on {unknown['references']} contract(s), e.g. {', '.join(unknown['sources'])}"
+            )
 
         # Summary stats
         cursor.execute("SELECT COUNT(*) FROM contracts")
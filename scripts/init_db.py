@@ -65,7 +65,10 @@ CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.contracts (
     level_of_study VARCHAR(100),
     source VARCHAR(100),
     lead_source VARCHAR(100),
+    viewing_date DATE,
+    sign_date DATE,
     monday_id VARCHAR(50),
+    import_key VARCHAR(300),           -- natural key of contracts imported from Excel
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
 
@@ -105,25 +108,160 @@ CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.payments_received (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- OPEX budget table
+-- OPEX budget table: monthly amounts per category, per imported budget version
+-- (versions are kept side by side; re-importing a version replaces it)
 CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.opex_budget (
     id SERIAL PRIMARY KEY,
+    budget_version VARCHAR(200) NOT NULL DEFAULT 'default',
+    source VARCHAR(20) NOT NULL DEFAULT 'budget',  -- budget (Main Budget sheet), forecast (Cash Flow FC)
     month_date DATE NOT NULL,
     category VARCHAR(100),
     amount DECIMAL(12,2),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Leads from the Qualified board, mirrored by the sync (activity summary)
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.leads (
+    id SERIAL PRIMARY KEY,
+    monday_id VARCHAR(50) UNIQUE NOT NULL,
+    name VARCHAR(200),
+    stage VARCHAR(100),
+    viewing_date DATE,
+    sign_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Viewing and signing dates of every Won Deals item, mirrored by the sync
+-- (activity summary). Unlike contracts, kept for items the contract mapping
+-- rejects (no unit, no length of stay, ...).
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.won_deals (
+    monday_id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(200),
+    viewing_date DATE,
+    sign_date DATE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Viewing-to-signing funnel: viewers per viewing week (Monday), overall and by
+-- nationality/university/lead source, with how many signed within 7/14/30 days.
+-- Kept up to date by the sync (only changed cohorts are rewritten).
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.viewing_cohorts (
+    cohort_week DATE NOT NULL,
+    dimension VARCHAR(20) NOT NULL,     -- all, nationality, university, lead_source
+    value VARCHAR(200) NOT NULL,
+    viewings INTEGER NOT NULL,
+    signed_7d INTEGER NOT NULL,
+    signed_14d INTEGER NOT NULL,
+    signed_30d INTEGER NOT NULL,
+    signed INTEGER NOT NULL,            -- signed at any time
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (cohort_week, dimension, value)
+);
+
+-- Content hashes of synced Monday items, used to skip unchanged items
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.monday_item_hashes (
+    monday_id VARCHAR(50) PRIMARY KEY,
+    board_id VARCHAR(50) NOT NULL,
+    mapped_hash CHAR(32) NOT NULL,  -- mapped contract + installments, as written to the DB
+    raw_hash CHAR(32) NOT NULL,     -- raw Monday name + column_values payload
+    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Raw Monday items as fetched, one row per item version, so mappings can be
+-- re-applied without re-downloading the boards (sync_monday.py --reprocess)
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.monday_item_archive (
+    monday_id VARCHAR(50) NOT NULL,
+    board_id VARCHAR(50) NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,           -- Monday's item updated_at
+    item JSONB COMPRESSION lz4 NOT NULL,       -- id, name, created_at, updated_at, column_values
+    raw_hash CHAR(32) NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (monday_id, updated_at)
+);
+
+-- Items currently on each board as of the last full fetch (what --reprocess rebuilds from)
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.monday_board_items (
+    board_id VARCHAR(50) NOT NULL,
+    monday_id VARCHAR(50) NOT NULL,
+    PRIMARY KEY (board_id, monday_id)
+);
+
+-- Monday items the sync rejected or could only partly parse, with why.
+-- Replaced on every sync, so it lists current problems only.
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.sync_quarantine (
+    id SERIAL PRIMARY KEY,
+    board_id VARCHAR(50) NOT NULL,
+    monday_id VARCHAR(50) NOT NULL,
+    item_name VARCHAR(200),
+    reason VARCHAR(50) NOT NULL,       -- missing_name, missing_unit, missing_dates, invalid_dates,
+                                       -- unknown_room, unparseable_date/number/timeline
+    field VARCHAR(100) NOT NULL DEFAULT '',
+    raw_value TEXT,
+    detail TEXT,
+    first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (monday_id, reason, field)
+);
+
+-- Sync job history (one row per sync run, shared by all workers)
+CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.sync_jobs (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(30) NOT NULL DEFAULT 'full',
+    status VARCHAR(20) NOT NULL DEFAULT 'running',  -- running, completed, error
+    phase VARCHAR(50),                              -- fetch, rooms, map_contracts, write_contracts, ...
+    items_processed INTEGER DEFAULT 0,
+    pages_fetched INTEGER DEFAULT 0,
+    triggered_by VARCHAR(50),                       -- manual, cli, scheduler
+    timings JSONB,                                  -- seconds per phase
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Migrations for databases created before these columns existed
+ALTER TABLE {SCHEMA_NAME}.contracts ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;  -- set when soft-deleted by the sync
+ALTER TABLE {SCHEMA_NAME}.contracts ADD COLUMN IF NOT EXISTS viewing_date DATE;
+ALTER TABLE {SCHEMA_NAME}.contracts ADD COLUMN IF NOT EXISTS sign_date DATE;
+ALTER TABLE {SCHEMA_NAME}.contracts ADD COLUMN IF NOT EXISTS import_key VARCHAR(300);  -- set by import_installments.py
+ALTER TABLE {SCHEMA_NAME}.opex_budget ADD COLUMN IF NOT EXISTS budget_version VARCHAR(200) NOT NULL DEFAULT 'default';
+ALTER TABLE {SCHEMA_NAME}.opex_budget ADD COLUMN IF NOT EXISTS source VARCHAR(20) NOT NULL DEFAULT 'budget';
+
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_contracts_room_id ON {SCHEMA_NAME}.contracts(room_id);
 CREATE INDEX IF NOT EXISTS idx_contracts_dates ON {SCHEMA_NAME}.contracts(start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_contracts_status ON {SCHEMA_NAME}.contracts(status);
 CREATE INDEX IF NOT EXISTS idx_contracts_resident ON {SCHEMA_NAME}.contracts(resident_name);
+CREATE INDEX IF NOT EXISTS idx_contracts_viewing_date ON {SCHEMA_NAME}.contracts(viewing_date);
+CREATE INDEX IF NOT EXISTS idx_contracts_sign_date ON {SCHEMA_NAME}.contracts(sign_date);
+CREATE INDEX IF NOT EXISTS idx_contracts_name_key ON {SCHEMA_NAME}.contracts(LOWER(TRIM(resident_name)));
+CREATE INDEX IF NOT EXISTS idx_leads_viewing_date ON {SCHEMA_NAME}.leads(viewing_date);
+CREATE INDEX IF NOT EXISTS idx_leads_sign_date ON {SCHEMA_NAME}.leads(sign_date);
+CREATE INDEX IF NOT EXISTS idx_leads_name_key ON {SCHEMA_NAME}.leads(LOWER(TRIM(name)));
+CREATE INDEX IF NOT EXISTS idx_won_deals_viewing_date ON {SCHEMA_NAME}.won_deals(viewing_date);
+CREATE INDEX IF NOT EXISTS idx_won_deals_sign_date ON {SCHEMA_NAME}.won_deals(sign_date);
+CREATE INDEX IF NOT EXISTS idx_won_deals_name_key ON {SCHEMA_NAME}.won_deals(LOWER(TRIM(name)));
 CREATE INDEX IF NOT EXISTS idx_payment_schedule_due_date ON {SCHEMA_NAME}.payment_schedule(due_date);
 CREATE INDEX IF NOT EXISTS idx_payment_schedule_status ON {SCHEMA_NAME}.payment_schedule(status);
 CREATE INDEX IF NOT EXISTS idx_payment_schedule_contract ON {SCHEMA_NAME}.payment_schedule(contract_id);
 CREATE INDEX IF NOT EXISTS idx_payments_received_date ON {SCHEMA_NAME}.payments_received(payment_date);
 CREATE INDEX IF NOT EXISTS idx_payments_received_contract ON {SCHEMA_NAME}.payments_received(contract_id);
+CREATE INDEX IF NOT EXISTS idx_sync_quarantine_board ON {SCHEMA_NAME}.sync_quarantine(board_id, reason);
+CREATE INDEX IF NOT EXISTS idx_viewing_cohorts_dimension ON {SCHEMA_NAME}.viewing_cohorts(dimension, cohort_week);
+CREATE INDEX IF NOT EXISTS idx_sync_jobs_started ON {SCHEMA_NAME}.sync_jobs(started_at DESC);
+CREATE INDEX IF NOT EXISTS idx_monday_item_hashes_board ON {SCHEMA_NAME}.monday_item_hashes(board_id);
+CREATE INDEX IF NOT EXISTS idx_monday_item_archive_board ON {SCHEMA_NAME}.monday_item_archive(board_id, monday_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_monday_item_archive_item ON {SCHEMA_NAME}.monday_item_archive USING GIN (item jsonb_path_ops);
+
+-- Unique keys used by the Monday sync's INSERT ... ON CONFLICT merges
+CREATE UNIQUE INDEX IF NOT EXISTS uq_contracts_monday_id ON {SCHEMA_NAME}.contracts(monday_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_contracts_import_key ON {SCHEMA_NAME}.contracts(import_key);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_opex_budget_version
+    ON {SCHEMA_NAME}.opex_budget(budget_version, source, category, month_date);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_payments_received_installment
+    ON {SCHEMA_NAME}.payments_received(contract_id, allocated_to_installment);
 
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION {SCHEMA_NAME}.update_updated_at_column()
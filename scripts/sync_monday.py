@@ -1,26 +1,48 @@
 # scripts/sync_monday.py
 """
-Live sync from Monday CRM Won Deals / Installments board.
-
-Board ID: 8606133913
-Fetches contracts and payment schedules directly from Monday.
+Sync from Monday CRM into the More House database.
+
+Mirrors three boards:
+- MH - Unit Schedule (9376648770): rooms
+- Won Deals (8606133913): contracts, payment schedules and payments received,
+  plus won_deals (viewing and signing dates of every item)
+- Qualified (9188309936): leads
+
+Modes:
+- run_full_sync: every board fetched, mapped and written as a pipeline, and
+  published in one transaction. Unchanged items are skipped by content hash,
+  and contracts whose items left the board are soft-deleted.
+- Reprocess: re-maps the raw items kept in monday_item_archive, without
+  calling Monday.
+- sync_items_from_monday: re-syncs a few items (used by the Monday webhook).
+
+Run as a script for a tracked sync job from the command line (see --help).
 """
 
 import os
 import sys
 import json
+import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # Add project root to path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
 import psycopg2
+from psycopg2.extras import Json, execute_values
 from dotenv import load_dotenv
 import logging
 
+from integrations.monday_decoder import BoardDecoder
+from utils.room_registry import RoomRegistry, normalize_room_id
+from utils.sync_profile import SyncProfile, format_profile, timed
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +50,11 @@ logger = logging.getLogger(__name__)
 
 SCHEMA_NAME = os.getenv("DB_SCHEMA", "more_house")
 
+# Pipelined sync (see _run_pipeline): mapper threads, and pages in flight
+# between the fetcher and the writer
+PIPELINE_MAP_WORKERS = int(os.getenv("SYNC_MAP_WORKERS", 2))
+PIPELINE_QUEUE_PAGES = int(os.getenv("SYNC_PIPELINE_QUEUE_PAGES", 8))
+
 # Monday column mappings for board 9376648770 (MH - Unit Schedule / Rooms)
 ROOM_COLUMN_MAP = {
     'floor': 'dropdown_mkrs7zx2',
@@ -52,6 +79,8 @@ COLUMN_MAP = {
     'nationality': 'country_mks9cg7q',       # Nationality
     'university': 'dropdown_mks9rbmv',       # University
     'stage': 'deal_stage',                   # Stage (status)
+    'viewing_date': 'date_mks29j00',         # Viewing Date
+    'sign_date': 'date_mks2y4vg',            # Contract Signed Date
 
     # Due dates
     'booking_fee_due': 'date_mkszxxzx',
@@ -98,419 +127,1660 @@ COLUMN_MAP = {
     'balance': 'formula_mksj1fzq',
 }
 
+# Monday column mappings for board 9188309936 (Qualified: leads and viewings)
+LEAD_COLUMN_MAP = {
+    'stage': 'status__1',
+    'viewing_date': 'date_mkr5m8jk',
+    'sign_date': 'date_mkr5cxqh',
+}
 
-def get_column_value(item: Dict, column_id: str) -> Optional[str]:
-    """Extract text value from a Monday item's column."""
-    for cv in item.get('column_values', []):
-        if cv['id'] == column_id:
-            return cv.get('text') or None
-    return None
+ROOM_DECODER = BoardDecoder(ROOM_COLUMN_MAP)
+CONTRACT_DECODER = BoardDecoder(COLUMN_MAP)
+LEAD_DECODER = BoardDecoder(LEAD_COLUMN_MAP)
 
 
-def get_column_raw_value(item: Dict, column_id: str) -> Optional[Any]:
-    """Extract raw JSON value from a Monday item's column."""
-    for cv in item.get('column_values', []):
-        if cv['id'] == column_id:
-            val = cv.get('value')
-            if val:
-                try:
-                    return json.loads(val)
-                except:
-                    return val
-    return None
+def map_payment_status(status_text: Optional[str]) -> str:
+    """Map Monday payment status to database status."""
+    if not status_text:
+        return 'pending'
+    status_lower = status_text.lower()
+    if 'paid' in status_lower or 'received' in status_lower:
+        return 'paid'
+    if 'partial' in status_lower:
+        return 'partial'
+    if 'overdue' in status_lower or 'late' in status_lower:
+        return 'overdue'
+    return 'pending'
 
 
-def parse_date(date_str: Optional[str]) -> Optional[str]:
-    """Parse date string to YYYY-MM-DD format."""
-    if not date_str:
-        return None
-    try:
-        # Monday dates come as "YYYY-MM-DD" in text field
-        datetime.strptime(date_str, "%Y-%m-%d")
-        return date_str
-    except:
-        return None
+def stable_hash(value: Any) -> str:
+    """Order-independent MD5 of a JSON-serialisable value."""
+    return hashlib.md5(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def item_raw_hash(item: Dict) -> str:
+    """Hash of a Monday item's name and raw column payload."""
+    return stable_hash({
+        'name': item.get('name'),
+        'column_values': sorted(
+            (cv['id'], cv.get('text'), cv.get('value')) for cv in item.get('column_values', [])
+        ),
+    })
+
+
+INSTALLMENTS = [
+    (0, 'booking_fee'),
+    (1, 'instalment_1'),
+    (2, 'instalment_2'),
+    (3, 'instalment_3'),
+    (4, 'instalment_4'),
+    (5, 'instalment_5'),
+]
+
+
+def _connect():
+    """Open a database connection with the More House search path."""
+    connection_string = os.getenv("TIMESCALE_SERVICE_URL")
+    if not connection_string:
+        raise RuntimeError("TIMESCALE_SERVICE_URL not set")
 
+    conn = psycopg2.connect(dsn=connection_string)
+    cursor = conn.cursor()
+    cursor.execute(f"SET search_path TO {SCHEMA_NAME}, public")
+    cursor.close()
+    return conn
+
+
+def _quarantine(quarantine: Optional[List[Dict]], record: Dict, reason: str,
+                field: str = '', raw_value: Any = None, detail: Optional[str] = None):
+    """Record why an item was rejected or only partially parsed."""
+    if quarantine is None:
+        return
+    quarantine.append({
+        'monday_id': record['monday_id'],
+        'item_name': record['name'],
+        'reason': reason,
+        'field': field,
+        'raw_value': None if raw_value is None else str(raw_value),
+        'detail': detail,
+    })
+
+
+def _quarantine_issues(quarantine: Optional[List[Dict]], record: Dict):
+    """Quarantine the columns the decoder couldn't parse."""
+    for issue in record['issues']:
+        _quarantine(quarantine, record, issue['reason'], issue['field'], issue['raw_value'],
+                    detail=f"column {issue['column_id']}")
+
+
+def _resolve_room(contract: Dict, registry: RoomRegistry, quarantine: List[Dict]):
+    """Point the contract at its room in the rooms table, quarantining unknown units."""
+    contract['room_id'] = registry.resolve(contract['room_id'], source=contract['monday_id'])
+    if registry.is_unknown(contract['room_id']):
+        _quarantine(
+            quarantine, {'monday_id': contract['monday_id'], 'name': contract['resident_name']},
+            'unknown_room', 'unit', contract['room_id'],
+            detail='No such room on the Unit Schedule; a TBD placeholder room is used'
+        )
 
-def parse_number(value: Optional[str]) -> Optional[float]:
-    """Parse number from string, handling currency formatting."""
-    if not value:
+
+def map_room_item(item: Dict, quarantine: Optional[List[Dict]] = None) -> Optional[Dict]:
+    """
+    Map a Unit Schedule item to a rooms row. Returns None if it has no name.
+
+    Rejections and unparseable columns are appended to `quarantine` if given.
+    """
+    record = ROOM_DECODER.decode(item)
+    _quarantine_issues(quarantine, record)
+    if not record['name']:
+        _quarantine(quarantine, record, 'missing_name', 'name')
         return None
-    try:
-        # Remove currency symbols and commas
-        clean = str(value).replace('£', '').replace(',', '').replace(' ', '').strip()
-        if clean:
-            return float(clean)
-    except:
-        pass
-    return None
+
+    return {
+        'room_id': record['name'],
+        'floor': record['floor'],
+        'category': record['category'],
+        'sqm': record['sqm'],
+        'weekly_rate': record['weekly_rate'],
+        'mattress_size': record['mattress_size'],
+    }
 
 
-def normalize_room_id(room_id: str) -> str:
+def map_contract_item(item: Dict, quarantine: Optional[List[Dict]] = None) -> Optional[Dict]:
     """
-    Normalize room ID to match Unit Schedule format.
-    - M10 -> MEZZ 10
-    - -1.10 -> -1.1 (remove trailing zero)
+    Map a Won Deals item to a contract with its payment schedule and payments received.
+
+    Returns None if the item is missing data the database requires
+    (resident name, unit or length of stay). Rejections and unparseable
+    columns are appended to `quarantine` if given.
     """
+    return _map_contract_record(CONTRACT_DECODER.decode(item), quarantine)
+
+
+def _map_contract_record(record: Dict, quarantine: Optional[List[Dict]] = None) -> Optional[Dict]:
+    """map_contract_item for an already decoded item."""
+    _quarantine_issues(quarantine, record)
+    monday_id = record['monday_id']
+    resident_name = record['name']
+
+    # Get contract data
+    room_id = normalize_room_id(record['unit']) if record['unit'] else None
+
+    # Timeline gives start/end dates
+    start_date, end_date = record['length_of_stay']
+
+    # Skip if missing critical data
+    if not resident_name:
+        _quarantine(quarantine, record, 'missing_name', 'name')
+        return None
     if not room_id:
-        return room_id
+        _quarantine(quarantine, record, 'missing_unit', 'unit')
+        return None
 
-    room_id = room_id.strip()
+    # Skip if missing dates (required by database)
+    if not start_date or not end_date:
+        _quarantine(quarantine, record, 'missing_dates', 'length_of_stay',
+                    detail=f"start={start_date} end={end_date}")
+        return None
+    if end_date < start_date:
+        _quarantine(quarantine, record, 'invalid_dates', 'length_of_stay',
+                    detail=f"end {end_date} is before start {start_date}")
+        return None
 
-    # Convert Mxx to MEZZ xx
-    if room_id.upper().startswith('M') and room_id[1:].isdigit():
-        return f"MEZZ {room_id[1:]}"
+    gross_income = record['gross_income']
+
+    # Calculate total value from installments if gross_income formula is empty
+    if not gross_income:
+        installment_amounts = [record[f'{inst_key}_amount'] for _, inst_key in INSTALLMENTS]
+        gross_income = sum(a for a in installment_amounts if a) or 0
+
+    schedule = []
+    received = []
+    for inst_num, inst_key in INSTALLMENTS:
+        amount = record[f'{inst_key}_amount']
+        # Skip if no amount
+        if amount and amount > 0:
+            schedule.append({
+                'installment_number': inst_num,
+                'due_date': record[f'{inst_key}_due'],
+                'amount': amount,
+                'status': map_payment_status(record[f'{inst_key}_status']),
+            })
+
+        paid_amount = record[f'{inst_key}_paid']
+        paid_date = record[f'{inst_key}_paid_date']
+        if paid_amount and paid_amount > 0 and paid_date:
+            received.append({
+                'installment_number': inst_num,
+                'payment_date': paid_date,
+                'amount': paid_amount,
+            })
+
+    return {
+        'monday_id': monday_id,
+        'room_id': room_id,
+        'resident_name': resident_name,
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_value': gross_income or 0,
+        'weekly_rate': record['rate_agreed'],
+        'payment_plan': record['payment_plan'] or 'Unknown',
+        'nationality': record['nationality'],
+        'university': record['university'],
+        'viewing_date': record['viewing_date'],
+        'sign_date': record['sign_date'],
+        'stage': record['stage'],
+        'schedule': schedule,
+        'received': received,
+    }
 
-    # Normalize decimal format (e.g., -1.10 -> -1.1, 0.10 -> 0.1)
-    # Match patterns like X.Y0 where Y0 ends in 0
-    import re
-    match = re.match(r'^(-?\d+)\.(\d)0$', room_id)
-    if match:
-        return f"{match.group(1)}.{match.group(2)}"
 
-    return room_id
+def map_deal_record(record: Dict) -> Dict:
+    """The won_deals row of a decoded Won Deals item: every item has one, mapped to a contract or not."""
+    return {
+        'monday_id': record['monday_id'],
+        'name': record['name'],
+        'viewing_date': record['viewing_date'],
+        'sign_date': record['sign_date'],
+    }
 
 
-def parse_timeline(item: Dict, column_id: str) -> tuple:
-    """Parse timeline column to get start and end dates."""
-    raw = get_column_raw_value(item, column_id)
-    if raw and isinstance(raw, dict):
-        return raw.get('from'), raw.get('to')
-    return None, None
+def map_lead_item(item: Dict, quarantine: Optional[List[Dict]] = None) -> Dict:
+    """
+    Map a Qualified board item to a leads row.
 
+    Every item is kept, dated or not; unparseable columns are appended to
+    `quarantine` if given.
+    """
+    record = LEAD_DECODER.decode(item)
+    _quarantine_issues(quarantine, record)
+    return {
+        'monday_id': record['monday_id'],
+        'name': record['name'],
+        'stage': record['stage'],
+        'viewing_date': record['viewing_date'],
+        'sign_date': record['sign_date'],
+    }
 
-def map_payment_status(status_text: Optional[str]) -> str:
-    """Map Monday payment status to database status."""
-    if not status_text:
-        return 'pending'
-    status_lower = status_text.lower()
-    if 'paid' in status_lower or 'received' in status_lower:
-        return 'paid'
-    if 'partial' in status_lower:
-        return 'partial'
-    if 'overdue' in status_lower or 'late' in status_lower:
-        return 'overdue'
-    return 'pending'
 
+def map_room_page(items: List[Dict]) -> Dict:
+    """
+    Map one page of Unit Schedule items (the pipeline's transform stage).
 
-def sync_rooms_from_monday(dry_run: bool = False):
+    Pure: safe to run on a worker thread. Returns {'rooms', 'quarantine', 'skipped',
+    'seconds', 'cpu_seconds'}.
     """
-    Sync room inventory from Monday CRM (MH - Unit Schedule board).
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    quarantine = []
+    rooms = [room for room in (map_room_item(item, quarantine) for item in items) if room]
+    return {
+        'rooms': rooms,
+        'quarantine': quarantine,
+        'skipped': len(items) - len(rooms),
+        'seconds': time.perf_counter() - start,
+        'cpu_seconds': time.thread_time() - cpu_start,
+    }
 
-    Board ID: 9376648770
+
+def map_contract_page(items: List[Dict]) -> Dict:
     """
-    from integrations.monday_client import MondayClient
+    Map one page of Won Deals items (the pipeline's transform stage).
 
-    client = MondayClient()
-    board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770")
+    Pure: safe to run on a worker thread. Room ids are resolved later by the
+    writer, once the rooms are in the database. Returns {'contracts': [(contract,
+    raw_hash), ...], 'deals' (one per item, see map_deal_record), 'quarantine',
+    'skipped', 'seconds', 'cpu_seconds'}.
+    """
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    quarantine = []
+    contracts = []
+    deals = []
+    for item in items:
+        record = CONTRACT_DECODER.decode(item)
+        deals.append(map_deal_record(record))
+        contract = _map_contract_record(record, quarantine)
+        if contract:
+            contracts.append((contract, item_raw_hash(item)))
+    return {
+        'contracts': contracts,
+        'deals': deals,
+        'quarantine': quarantine,
+        'skipped': len(items) - len(contracts),
+        'seconds': time.perf_counter() - start,
+        'cpu_seconds': time.thread_time() - cpu_start,
+    }
 
-    logger.info(f"Fetching rooms from Monday board {board_id}...")
-    items = client.get_all_board_items(board_id)
-    logger.info(f"Found {len(items)} rooms")
 
-    if dry_run:
-        logger.info("DRY RUN - no database changes will be made")
+def map_lead_page(items: List[Dict]) -> Dict:
+    """
+    Map one page of Qualified board items (the pipeline's transform stage).
 
-    connection_string = os.getenv("TIMESCALE_SERVICE_URL")
-    if not connection_string:
-        logger.error("TIMESCALE_SERVICE_URL not set")
-        sys.exit(1)
+    Pure: safe to run on a worker thread. Returns {'leads', 'quarantine', 'skipped',
+    'seconds', 'cpu_seconds'}.
+    """
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    quarantine = []
+    leads = [map_lead_item(item, quarantine) for item in items]
+    return {
+        'leads': leads,
+        'quarantine': quarantine,
+        'skipped': 0,
+        'seconds': time.perf_counter() - start,
+        'cpu_seconds': time.thread_time() - cpu_start,
+    }
 
-    conn = psycopg2.connect(dsn=connection_string)
-    cursor = conn.cursor()
-    cursor.execute(f"SET search_path TO {SCHEMA_NAME}, public")
 
-    stats = {'created': 0, 'updated': 0, 'skipped': 0}
+def _write_rooms(cursor, rooms: List[Dict], stats: Dict):
+    """Upsert rooms in one statement; unchanged rooms are left untouched."""
+    if not rooms:
+        return
+
+    # Monday can list the same unit twice; the last one wins, as before
+    rooms = list({room['room_id']: room for room in rooms}.values())
+
+    results = execute_values(cursor, """
+        INSERT INTO rooms (room_id, floor, category, sqm, weekly_rate, mattress_size)
+        VALUES %s
+        ON CONFLICT (room_id) DO UPDATE SET
+            floor = EXCLUDED.floor,
+            category = EXCLUDED.category,
+            sqm = EXCLUDED.sqm,
+            weekly_rate = EXCLUDED.weekly_rate,
+            mattress_size = EXCLUDED.mattress_size,
+            updated_at = NOW()
+        WHERE (rooms.floor, rooms.category, rooms.sqm, rooms.weekly_rate, rooms.mattress_size)
+            IS DISTINCT FROM (
+                EXCLUDED.floor, EXCLUDED.category, EXCLUDED.sqm,
+                EXCLUDED.weekly_rate, EXCLUDED.mattress_size
+            )
+        RETURNING (xmax = 0)
+    """, [
+        (room['room_id'], room['floor'], room['category'], room['sqm'],
+         room['weekly_rate'], room['mattress_size'])
+        for room in rooms
+    ], page_size=1000, fetch=True)
+
+    created = sum(1 for (inserted,) in results if inserted)
+    stats['created'] += created
+    stats['updated'] += len(results) - created
+    stats['unchanged'] += len(rooms) - len(results)
+
+
+def _write_leads(cursor, leads: List[Dict], stats: Dict):
+    """Upsert leads in one statement; unchanged leads are left untouched."""
+    if not leads:
+        return
+
+    results = execute_values(cursor, """
+        INSERT INTO leads (monday_id, name, stage, viewing_date, sign_date)
+        VALUES %s
+        ON CONFLICT (monday_id) DO UPDATE SET
+            name = EXCLUDED.name,
+            stage = EXCLUDED.stage,
+            viewing_date = EXCLUDED.viewing_date,
+            sign_date = EXCLUDED.sign_date,
+            updated_at = NOW()
+        WHERE (leads.name, leads.stage, leads.viewing_date, leads.sign_date)
+            IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.stage, EXCLUDED.viewing_date, EXCLUDED.sign_date)
+        RETURNING (xmax = 0)
+    """, [
+        (lead['monday_id'], lead['name'], lead['stage'], lead['viewing_date'], lead['sign_date'])
+        for lead in leads
+    ], page_size=1000, fetch=True)
+
+    created = sum(1 for (inserted,) in results if inserted)
+    stats['created'] += created
+    stats['updated'] += len(results) - created
+    stats['unchanged'] += len(leads) - len(results)
+
+
+def _write_deals(cursor, deals: List[Dict]):
+    """Upsert won_deals rows in one statement; unchanged rows are left untouched."""
+    if not deals:
+        return
+    execute_values(cursor, """
+        INSERT INTO won_deals (monday_id, name, viewing_date, sign_date)
+        VALUES %s
+        ON CONFLICT (monday_id) DO UPDATE SET
+            name = EXCLUDED.name,
+            viewing_date = EXCLUDED.viewing_date,
+            sign_date = EXCLUDED.sign_date,
+            updated_at = NOW()
+        WHERE (won_deals.name, won_deals.viewing_date, won_deals.sign_date)
+            IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.viewing_date, EXCLUDED.sign_date)
+    """, [
+        (deal['monday_id'], deal['name'], deal['viewing_date'], deal['sign_date'])
+        for deal in deals
+    ], page_size=1000)
+
+
+def _delete_missing_leads(cursor, item_ids: List[str]) -> int:
+    """Delete leads whose item is no longer on the Qualified board (after a full fetch)."""
+    cursor.execute("DELETE FROM leads WHERE NOT (monday_id = ANY(%s))", (list(item_ids),))
+    return cursor.rowcount
+
+
+STAGE_TABLES_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS stage_contracts (
+    monday_id VARCHAR(50) PRIMARY KEY,
+    room_id VARCHAR(20),
+    resident_name VARCHAR(200),
+    start_date DATE,
+    end_date DATE,
+    total_value DECIMAL(12,2),
+    weekly_rate DECIMAL(10,2),
+    payment_plan VARCHAR(50),
+    nationality VARCHAR(100),
+    university VARCHAR(200),
+    viewing_date DATE,
+    sign_date DATE
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE IF NOT EXISTS stage_payment_schedule (
+    monday_id VARCHAR(50),
+    installment_number SMALLINT,
+    due_date DATE,
+    amount DECIMAL(10,2),
+    status VARCHAR(20)
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE IF NOT EXISTS stage_payments_received (
+    monday_id VARCHAR(50),
+    installment_number SMALLINT,
+    payment_date DATE,
+    amount DECIMAL(10,2)
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE IF NOT EXISTS stage_board_items (
+    monday_id VARCHAR(50) PRIMARY KEY
+) ON COMMIT DROP;
+
+TRUNCATE stage_contracts, stage_payment_schedule, stage_payments_received, stage_board_items;
+"""
+
 
-    for item in items:
-        room_id = item.get('name', '').strip()
-        if not room_id:
-            stats['skipped'] += 1
-            continue
+def _stage_contracts(cursor, contracts: List[Dict]):
+    """Bulk-load mapped contracts into the staging tables (see STAGE_TABLES_SQL)."""
+    execute_values(cursor, "INSERT INTO stage_contracts VALUES %s", [
+        (
+            c['monday_id'], c['room_id'], c['resident_name'], c['start_date'], c['end_date'],
+            c['total_value'], c['weekly_rate'], c['payment_plan'], c['nationality'], c['university'],
+            c['viewing_date'], c['sign_date'],
+        )
+        for c in contracts
+    ], page_size=1000)
 
-        floor = get_column_value(item, ROOM_COLUMN_MAP['floor'])
-        category = get_column_value(item, ROOM_COLUMN_MAP['category'])
-        sqm = parse_number(get_column_value(item, ROOM_COLUMN_MAP['sqm']))
-        weekly_rate = parse_number(get_column_value(item, ROOM_COLUMN_MAP['weekly_rate']))
-        mattress_size = get_column_value(item, ROOM_COLUMN_MAP['mattress_size'])
+    execute_values(cursor, "INSERT INTO stage_payment_schedule VALUES %s", [
+        (c['monday_id'], p['installment_number'], p['due_date'], p['amount'], p['status'])
+        for c in contracts for p in c['schedule']
+    ], page_size=1000)
 
-        if dry_run:
-            logger.info(f"Would sync room: {room_id} | {floor} | {category} | {sqm}sqm | £{weekly_rate}/wk")
-            continue
+    execute_values(cursor, "INSERT INTO stage_payments_received VALUES %s", [
+        (c['monday_id'], p['installment_number'], p['payment_date'], p['amount'])
+        for c in contracts for p in c['received']
+    ], page_size=1000)
+
+
+def _write_contracts(cursor, contracts: List[Dict], stats: Dict, registry: RoomRegistry):
+    """
+    Write contracts with their payment schedules and payments received, set-based.
 
-        # Check if room exists
-        cursor.execute("SELECT room_id FROM rooms WHERE room_id = %s", (room_id,))
-        existing = cursor.fetchone()
-
-        if existing:
-            cursor.execute("""
-                UPDATE rooms SET
-                    floor = %s,
-                    category = %s,
-                    sqm = %s,
-                    weekly_rate = %s,
-                    mattress_size = %s,
+    Mapped rows are bulk-loaded into temp staging tables, then merged into the
+    live tables with one INSERT ... ON CONFLICT per table. Must run inside the
+    caller's transaction; the staging tables are dropped on commit.
+
+    Room ids must already be resolved through `registry`; placeholder rooms
+    for unknown ids are created here, before the contracts referencing them.
+    """
+    if not contracts:
+        return
+
+    registry.create_missing(cursor)
+
+    cursor.execute(STAGE_TABLES_SQL)
+    _stage_contracts(cursor, contracts)
+    _merge_contracts(cursor, stats)
+
+
+def _merge_contracts(cursor, stats: Dict, profile: Optional[SyncProfile] = None):
+    """Merge the staging tables into contracts, payment_schedule and payments_received."""
+    # (xmax = 0) is true for freshly inserted rows, false for rows updated by ON CONFLICT
+    with timed(profile, 'write_contracts'):
+        cursor.execute("""
+            WITH upserted AS (
+                INSERT INTO contracts (
+                    monday_id, room_id, resident_name, start_date, end_date,
+                    total_value, weekly_rate, payment_plan, status, nationality, university,
+                    viewing_date, sign_date
+                )
+                SELECT
+                    monday_id, room_id, resident_name, start_date, end_date,
+                    total_value, weekly_rate, payment_plan, 'active', nationality, university,
+                    viewing_date, sign_date
+                FROM stage_contracts
+                ON CONFLICT (monday_id) DO UPDATE SET
+                    room_id = EXCLUDED.room_id,
+                    resident_name = EXCLUDED.resident_name,
+                    start_date = EXCLUDED.start_date,
+                    end_date = EXCLUDED.end_date,
+                    total_value = EXCLUDED.total_value,
+                    weekly_rate = EXCLUDED.weekly_rate,
+                    payment_plan = EXCLUDED.payment_plan,
+                    nationality = EXCLUDED.nationality,
+                    university = EXCLUDED.university,
+                    viewing_date = EXCLUDED.viewing_date,
+                    sign_date = EXCLUDED.sign_date,
+                    -- Bring back contracts that were soft-deleted and reappeared on the board
+                    status = CASE WHEN contracts.status = 'deleted' THEN 'active' ELSE contracts.status END,
+                    deleted_at = NULL,
                     updated_at = NOW()
-                WHERE room_id = %s
-            """, (floor, category, sqm, weekly_rate, mattress_size, room_id))
-            stats['updated'] += 1
-        else:
-            cursor.execute("""
-                INSERT INTO rooms (room_id, floor, category, sqm, weekly_rate, mattress_size)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (room_id, floor, category, sqm, weekly_rate, mattress_size))
-            stats['created'] += 1
+                WHERE contracts.status = 'deleted' OR (
+                    contracts.room_id, contracts.resident_name, contracts.start_date, contracts.end_date,
+                    contracts.total_value, contracts.weekly_rate, contracts.payment_plan,
+                    contracts.nationality, contracts.university, contracts.viewing_date, contracts.sign_date
+                ) IS DISTINCT FROM (
+                    EXCLUDED.room_id, EXCLUDED.resident_name, EXCLUDED.start_date, EXCLUDED.end_date,
+                    EXCLUDED.total_value, EXCLUDED.weekly_rate, EXCLUDED.payment_plan,
+                    EXCLUDED.nationality, EXCLUDED.university, EXCLUDED.viewing_date, EXCLUDED.sign_date
+                )
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted),
+                   (SELECT COUNT(*) FROM stage_contracts)
+            FROM upserted
+        """)
+        created, updated, staged = cursor.fetchone()
+        stats['contracts_created'] += created
+        stats['contracts_updated'] += updated
+        # Staged but identical to the live row (e.g. only installments or the raw
+        # payload changed, or --force): counted, so created + updated + unchanged
+        # is every item mapped
+        stats['contracts_unchanged'] = stats.get('contracts_unchanged', 0) + staged - created - updated
+
+    with timed(profile, 'write_payment_schedule'):
+        cursor.execute("""
+            WITH upserted AS (
+                INSERT INTO payment_schedule (contract_id, installment_number, due_date, amount, status)
+                SELECT c.id, s.installment_number, s.due_date, s.amount, s.status
+                FROM stage_payment_schedule s
+                JOIN contracts c ON c.monday_id = s.monday_id
+                ON CONFLICT (contract_id, installment_number) DO UPDATE SET
+                    due_date = EXCLUDED.due_date,
+                    amount = EXCLUDED.amount,
+                    status = EXCLUDED.status
+                WHERE (payment_schedule.due_date, payment_schedule.amount, payment_schedule.status)
+                    IS DISTINCT FROM (EXCLUDED.due_date, EXCLUDED.amount, EXCLUDED.status)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted)
+            FROM upserted
+        """)
+        created, updated = cursor.fetchone()
+        stats['payments_created'] += created
+        stats['payments_updated'] += updated
+
+    with timed(profile, 'write_payments_received'):
+        cursor.execute("""
+            INSERT INTO payments_received (
+                contract_id, payment_date, amount, payment_method, allocated_to_installment
+            )
+            SELECT c.id, r.payment_date, r.amount, 'monday_sync', r.installment_number
+            FROM stage_payments_received r
+            JOIN contracts c ON c.monday_id = r.monday_id
+            ON CONFLICT (contract_id, allocated_to_installment) DO UPDATE SET
+                payment_date = EXCLUDED.payment_date,
+                amount = EXCLUDED.amount
+            WHERE (payments_received.payment_date, payments_received.amount)
+                IS DISTINCT FROM (EXCLUDED.payment_date, EXCLUDED.amount)
+        """)
+
+
+def _tombstone_missing(cursor, board_id: str, item_ids: List[str]) -> int:
+    """
+    Soft-delete contracts whose Monday item is no longer on the board, and
+    remove its won_deals row.
 
-    if not dry_run:
-        conn.commit()
+    `item_ids` must be the full set of items fetched from the board (including
+    skipped and unchanged ones). Returns the number of contracts soft-deleted.
+    """
+    cursor.execute(STAGE_TABLES_SQL)
+    execute_values(
+        cursor,
+        "INSERT INTO stage_board_items VALUES %s ON CONFLICT DO NOTHING",
+        [(item_id,) for item_id in item_ids],
+        page_size=1000
+    )
+
+    cursor.execute("""
+        UPDATE contracts c SET
+            status = 'deleted',
+            deleted_at = NOW()
+        WHERE c.monday_id IS NOT NULL
+        AND c.status <> 'deleted'
+        AND NOT EXISTS (SELECT 1 FROM stage_board_items s WHERE s.monday_id = c.monday_id)
+    """)
+    tombstoned = cursor.rowcount
+
+    cursor.execute("""
+        DELETE FROM won_deals d
+        WHERE NOT EXISTS (SELECT 1 FROM stage_board_items s WHERE s.monday_id = d.monday_id)
+    """)
+
+    # Forget hashes of items that left the board, so they are rewritten if they come back
+    cursor.execute("""
+        DELETE FROM monday_item_hashes h
+        WHERE h.board_id = %s
+        AND NOT EXISTS (SELECT 1 FROM stage_board_items s WHERE s.monday_id = h.monday_id)
+    """, (str(board_id),))
+
+    return tombstoned
+
+
+def _tombstone_items(cursor, board_id: str, monday_ids: List[str]) -> int:
+    """
+    Soft-delete the contracts of specific Monday items known to be gone
+    (deleted or moved off the board), as _tombstone_missing does for a full
+    board. Returns the number of contracts soft-deleted.
+    """
+    cursor.execute("DELETE FROM won_deals WHERE monday_id = ANY(%s)", (list(monday_ids),))
+    cursor.execute("""
+        UPDATE contracts SET
+            status = 'deleted',
+            deleted_at = NOW()
+        WHERE monday_id = ANY(%s)
+        AND status <> 'deleted'
+    """, (list(monday_ids),))
+    tombstoned = cursor.rowcount
+
+    cursor.execute(
+        "DELETE FROM monday_item_hashes WHERE board_id = %s AND monday_id = ANY(%s)",
+        (str(board_id), list(monday_ids))
+    )
+    return tombstoned
+
+
+def _load_item_hashes(cursor, board_id: str) -> Dict[str, str]:
+    """Mapped-content hashes of the items last synced from a board, by monday_id."""
+    cursor.execute(
+        "SELECT monday_id, mapped_hash FROM monday_item_hashes WHERE board_id = %s",
+        (str(board_id),)
+    )
+    return dict(cursor.fetchall())
+
+
+def _save_item_hashes(cursor, board_id: str, hashes: List[tuple]):
+    """Upsert (monday_id, mapped_hash, raw_hash) rows for a board."""
+    execute_values(cursor, """
+        INSERT INTO monday_item_hashes (monday_id, board_id, mapped_hash, raw_hash)
+        VALUES %s
+        ON CONFLICT (monday_id) DO UPDATE SET
+            board_id = EXCLUDED.board_id,
+            mapped_hash = EXCLUDED.mapped_hash,
+            raw_hash = EXCLUDED.raw_hash,
+            synced_at = NOW()
+    """, [(monday_id, str(board_id), mapped, raw) for monday_id, mapped, raw in hashes], page_size=1000)
+
+
+def _save_quarantine(cursor, board_id: str, entries: List[Dict],
+                     item_ids: Optional[List[str]] = None) -> int:
+    """
+    Replace a board's quarantine rows with this sync's entries, in bulk.
+
+    Entries seen before keep their first_seen_at. Rows no longer reported
+    are removed: for the whole board, or only for `item_ids` after a partial
+    (webhook) sync. Returns the number of entries.
+    """
+    # One row per (item, reason, field)
+    entries = list({(e['monday_id'], e['reason'], e['field']): e for e in entries}.values())
+
+    if entries:
+        execute_values(cursor, """
+            INSERT INTO sync_quarantine (board_id, monday_id, item_name, reason, field, raw_value, detail)
+            VALUES %s
+            ON CONFLICT (monday_id, reason, field) DO UPDATE SET
+                board_id = EXCLUDED.board_id,
+                item_name = EXCLUDED.item_name,
+                raw_value = EXCLUDED.raw_value,
+                detail = EXCLUDED.detail,
+                last_seen_at = NOW()
+        """, [
+            (str(board_id), e['monday_id'], e['item_name'], e['reason'], e['field'], e['raw_value'], e['detail'])
+            for e in entries
+        ], page_size=1000)
+
+    # NOW() is the transaction start, so rows touched above have last_seen_at = NOW()
+    if item_ids is None:
+        cursor.execute("""
+            DELETE FROM sync_quarantine WHERE board_id = %s AND last_seen_at < NOW()
+        """, (str(board_id),))
+    else:
+        cursor.execute("""
+            DELETE FROM sync_quarantine
+            WHERE board_id = %s AND monday_id = ANY(%s) AND last_seen_at < NOW()
+        """, (str(board_id), list(item_ids)))
+
+    return len(entries)
+
+
+def _log_quarantine(entries: List[Dict]):
+    by_reason: Dict[str, int] = {}
+    for entry in entries:
+        by_reason[entry['reason']] = by_reason.get(entry['reason'], 0) + 1
+    if by_reason:
+        logger.warning(f"Quarantined: {', '.join(f'{r}={n}' for r, n in sorted(by_reason.items()))}")
 
+
+ARCHIVED_FIELDS = ('id', 'name', 'created_at', 'updated_at', 'column_values')
+
+
+def _archive_items(cursor, board_id: str, items: List[Dict]) -> int:
+    """
+    Store raw Monday items in monday_item_archive, one row per item version.
+
+    Versions are keyed by Monday's updated_at, so re-archiving an unchanged
+    item is a no-op. The items are also recorded in monday_board_items
+    (see _prune_board_items). Returns new versions stored.
+    """
+    rows = [
+        (
+            item['id'],
+            str(board_id),
+            item.get('updated_at') or item.get('created_at'),
+            Json({field: item.get(field) for field in ARCHIVED_FIELDS}),
+            item_raw_hash(item),
+        )
+        for item in items
+    ]
+    inserted = execute_values(cursor, """
+        INSERT INTO monday_item_archive (monday_id, board_id, updated_at, item, raw_hash)
+        VALUES %s
+        ON CONFLICT (monday_id, updated_at) DO NOTHING
+        RETURNING monday_id
+    """, rows, template="(%s, %s, COALESCE(%s::timestamptz, NOW()), %s, %s)", page_size=1000, fetch=True)
+
+    execute_values(cursor, """
+        INSERT INTO monday_board_items (board_id, monday_id)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+    """, [(str(board_id), item['id']) for item in items], page_size=1000)
+
+    return len(inserted)
+
+
+def _prune_board_items(cursor, board_id: str, item_ids: List[str]):
+    """After a full fetch of a board, drop items no longer on it from monday_board_items."""
+    cursor.execute("""
+        DELETE FROM monday_board_items
+        WHERE board_id = %s AND NOT (monday_id = ANY(%s))
+    """, (str(board_id), list(item_ids)))
+
+
+def load_archived_items(cursor, board_id: str) -> List[Dict]:
+    """Latest archived version of every item currently on a board."""
+    cursor.execute("""
+        SELECT DISTINCT ON (a.monday_id) a.item
+        FROM monday_item_archive a
+        JOIN monday_board_items b ON b.monday_id = a.monday_id AND b.board_id = a.board_id
+        WHERE a.board_id = %s
+        ORDER BY a.monday_id, a.updated_at DESC
+    """, (str(board_id),))
+    return [row[0] for row in cursor.fetchall()]
+
+
+# Conversion windows (days from viewing to signing) tracked per viewing cohort
+COHORT_WINDOWS = (7, 14, 30)
+
+# Viewers for the funnel: Won Deals with a viewing date, plus Qualified leads
+# with a viewing and no Won Deal of the same name (as in the activity summary).
+# Leads carry no nationality/university/source, so they count as 'Unknown'.
+COHORT_VIEWERS_SQL = """
+    SELECT viewing_date, sign_date,
+           COALESCE(NULLIF(TRIM(nationality), ''), 'Unknown') AS nationality,
+           COALESCE(NULLIF(TRIM(university), ''), 'Unknown') AS university,
+           COALESCE(NULLIF(TRIM(lead_source), ''), NULLIF(TRIM(source), ''), 'Unknown') AS lead_source
+    FROM contracts
+    WHERE status <> 'deleted' AND viewing_date IS NOT NULL
+
+    UNION ALL
+
+    SELECT l.viewing_date, l.sign_date, 'Unknown', 'Unknown', 'Unknown'
+    FROM leads l
+    WHERE l.viewing_date IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM contracts c
+          WHERE c.status <> 'deleted'
+            AND c.viewing_date IS NOT NULL
+            AND LOWER(TRIM(c.resident_name)) = LOWER(TRIM(l.name))
+      )
+"""
+
+
+def _cohort_weeks(cursor, contract_ids: List[str] = (), lead_ids: List[str] = ()) -> List:
+    """
+    Viewing weeks whose cohorts the given contracts/leads count towards.
+
+    Called before and after writing them, so both the old and new weeks are
+    refreshed. Includes leads sharing a name with the contracts, since a Won
+    Deal's viewing hides the lead's.
+    """
+    cursor.execute("""
+        SELECT date_trunc('week', viewing_date)::date
+        FROM contracts
+        WHERE monday_id = ANY(%(contracts)s) AND viewing_date IS NOT NULL
+        UNION
+        SELECT date_trunc('week', l.viewing_date)::date
+        FROM leads l
+        WHERE l.viewing_date IS NOT NULL
+          AND (l.monday_id = ANY(%(leads)s) OR LOWER(TRIM(l.name)) IN (
+              SELECT LOWER(TRIM(resident_name)) FROM contracts WHERE monday_id = ANY(%(contracts)s)
+          ))
+    """, {'contracts': list(contract_ids), 'leads': list(lead_ids)})
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _refresh_viewing_cohorts(cursor, weeks: Optional[List] = None) -> Dict[str, int]:
+    """
+    Bring viewing_cohorts up to date with contracts and leads.
+
+    Aggregates viewers by viewing week, overall and by nationality, university
+    and lead source, with how many signed within each of COHORT_WINDOWS days.
+    Only cohort rows whose numbers changed are written, and rows for groups
+    with no viewers left are deleted. `weeks` limits the refresh to those
+    cohort weeks (e.g. from _cohort_weeks after a webhook sync).
+    """
+    if weeks is not None and not weeks:
+        return {'upserted': 0, 'deleted': 0}
+
+    week_filter = "WHERE date_trunc('week', viewing_date)::date = ANY(%(weeks)s)" if weeks is not None else ""
+    delete_filter = "AND vc.cohort_week = ANY(%(weeks)s)" if weeks is not None else ""
+    signed_within = ",\n".join(
+        f"COUNT(*) FILTER (WHERE sign_date <= viewing_date + {days}) AS signed_{days}d"
+        for days in COHORT_WINDOWS
+    )
+    counts = ['viewings'] + [f"signed_{days}d" for days in COHORT_WINDOWS] + ['signed']
+    columns = ", ".join(counts)
+    current = ", ".join(f"viewing_cohorts.{c}" for c in counts)
+    excluded = ", ".join(f"EXCLUDED.{c}" for c in counts)
+
+    cursor.execute(f"""
+        WITH viewers AS (
+            SELECT * FROM ({COHORT_VIEWERS_SQL}) v
+            {week_filter}
+        ),
+        cohorts AS (
+            SELECT date_trunc('week', viewing_date)::date AS cohort_week,
+                   d.dimension, d.value,
+                   COUNT(*) AS viewings,
+                   {signed_within},
+                   COUNT(sign_date) AS signed
+            FROM viewers
+            CROSS JOIN LATERAL (VALUES
+                ('all', 'All'),
+                ('nationality', nationality),
+                ('university', university),
+                ('lead_source', lead_source)
+            ) AS d(dimension, value)
+            GROUP BY 1, 2, 3
+        ),
+        upserted AS (
+            INSERT INTO viewing_cohorts (cohort_week, dimension, value, {columns})
+            SELECT cohort_week, dimension, value, {columns}
+            FROM cohorts
+            ON CONFLICT (cohort_week, dimension, value) DO UPDATE SET
+                ({columns}) = ROW({excluded}),
+                updated_at = NOW()
+            WHERE ({current}) IS DISTINCT FROM ({excluded})
+            RETURNING 1
+        ),
+        deleted AS (
+            DELETE FROM viewing_cohorts vc
+            WHERE NOT EXISTS (
+                SELECT 1 FROM cohorts c
+                WHERE c.cohort_week = vc.cohort_week AND c.dimension = vc.dimension AND c.value = vc.value
+            )
+            {delete_filter}
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM upserted), (SELECT COUNT(*) FROM deleted)
+    """, {'weeks': weeks})
+    upserted, deleted = cursor.fetchone()
+    return {'upserted': upserted, 'deleted': deleted}
+
+
+def _table_counts(conn) -> Dict[str, int]:
+    """Row counts of the synced tables, as this transaction will publish them."""
+    cursor = conn.cursor()
+    counts = {}
+    for table in ["rooms", "contracts", "payment_schedule", "payments_received", "leads"]:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table] = cursor.fetchone()[0]
     cursor.close()
-    conn.close()
+    return counts
+
+
+def _no_progress(phase: str, items: int = 0, pages: int = 0):
+    """Default progress callback: progress(phase, items=..., pages=...) increments."""
+
+
+def _board_ids():
+    """(Unit Schedule, Won Deals, Qualified) board ids from .env."""
+    rooms_board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770")
+    contracts_board_id = os.getenv("MONDAY_BOARD_ID_PAYMENTS")
+    leads_board_id = os.getenv("MONDAY_BOARD_ID_QUALIFIED", "9188309936")
+
+    if not contracts_board_id:
+        raise RuntimeError("MONDAY_BOARD_ID_PAYMENTS not set in .env")
+
+    return rooms_board_id, contracts_board_id, leads_board_id
+
+
+class _RoomWriter:
+    """
+    Writes mapped Unit Schedule pages (see map_room_page) into the caller's
+    transaction, one page at a time, then finishes the board.
+    """
+
+    name = 'rooms'
+
+    def __init__(self, cursor, board_id: str, dry_run: bool = False, archive: bool = True,
+                 profile: Optional[SyncProfile] = None):
+        self.cursor = cursor
+        self.board_id = board_id
+        self.dry_run = dry_run
+        self.archive = archive
+        self.profile = profile
+        self.item_ids = []
+        self.quarantine = []
+        self.stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'archived': 0}
+
+    def write_page(self, items: List[Dict], page: Dict):
+        self.item_ids.extend(item['id'] for item in items)
+        self.quarantine.extend(page['quarantine'])
+        self.stats['skipped'] += page['skipped']
+
+        if self.dry_run:
+            for room in page['rooms']:
+                logger.info(
+                    f"Would sync room: {room['room_id']} | {room['floor']} | {room['category']} | "
+                    f"{room['sqm']}sqm | £{room['weekly_rate']}/wk"
+                )
+            return
+
+        if self.archive and items:
+            with timed(self.profile, 'write_archive', rows=len(items)):
+                self.stats['archived'] += _archive_items(self.cursor, self.board_id, items)
+        with timed(self.profile, 'write_rooms', rows=len(page['rooms'])):
+            _write_rooms(self.cursor, page['rooms'], self.stats)
+
+    def finish(self) -> Dict:
+        if not self.dry_run and self.item_ids:
+            if self.archive:
+                with timed(self.profile, 'write_archive'):
+                    _prune_board_items(self.cursor, self.board_id, self.item_ids)
+            with timed(self.profile, 'write_quarantine', rows=len(self.quarantine)):
+                _save_quarantine(self.cursor, self.board_id, self.quarantine)
+        self.stats['quarantined'] = len(self.quarantine)
+        _log_quarantine(self.quarantine)
+
+        logger.info("\n=== Room Sync Complete ===")
+        logger.info(f"Rooms created: {self.stats['created']}")
+        logger.info(f"Rooms updated: {self.stats['updated']}")
+        logger.info(f"Rooms unchanged: {self.stats['unchanged']}")
+        logger.info(f"Skipped: {self.stats['skipped']}")
+        return self.stats
+
+
+class _ContractWriter:
+    """
+    Writes mapped Won Deals pages (see map_contract_page) into the caller's
+    transaction, then finishes the board.
+
+    Pages are resolved against the rooms table and staged as they arrive;
+    finish() merges the staging tables into the live tables, soft-deletes
+    contracts no longer on the board and records the quarantine. The rooms
+    must be written before the first page (placeholders are created for
+    units that match no room).
+    """
+
+    name = 'contracts'
+
+    def __init__(self, cursor, board_id: str, dry_run: bool = False, force: bool = False,
+                 archive: bool = True, clear_existing: bool = False,
+                 profile: Optional[SyncProfile] = None):
+        self.cursor = cursor
+        self.board_id = board_id
+        self.dry_run = dry_run
+        self.archive = archive
+        self.profile = profile
+        self.registry: Optional[RoomRegistry] = None
+        self.item_ids = []
+        self.hashes = []
+        self.quarantine = []
+        self.stats = {
+            'contracts_created': 0,
+            'contracts_updated': 0,
+            'contracts_unchanged': 0,
+            'contracts_deleted': 0,
+            'payments_created': 0,
+            'payments_updated': 0,
+            'skipped': 0,
+            'archived': 0,
+        }
+
+        if clear_existing and not dry_run:
+            logger.info("Clearing existing data...")
+            cursor.execute("DELETE FROM payments_received")
+            cursor.execute("DELETE FROM payment_schedule")
+            cursor.execute("DELETE FROM contracts")
+            cursor.execute("DELETE FROM won_deals")
+            cursor.execute("DELETE FROM monday_item_hashes WHERE board_id = %s", (board_id,))
+
+        self.known_hashes = {}
+        if not dry_run and not force:
+            with timed(profile, 'load_item_hashes'):
+                self.known_hashes = _load_item_hashes(cursor, board_id)
+        if not dry_run:
+            cursor.execute(STAGE_TABLES_SQL)
+
+    def write_page(self, items: List[Dict], page: Dict):
+        self.item_ids.extend(item['id'] for item in items)
+        self.quarantine.extend(page['quarantine'])
+        self.stats['skipped'] += page['skipped']
+
+        # Loaded on the first page, after the rooms are written
+        if self.registry is None:
+            with timed(self.profile, 'load_rooms'):
+                self.registry = RoomRegistry.load(self.cursor)
+
+        # Archive every item, including ones the mapping skipped, so they can be recovered later
+        if self.archive and items and not self.dry_run:
+            with timed(self.profile, 'write_archive', rows=len(items)):
+                self.stats['archived'] += _archive_items(self.cursor, self.board_id, items)
+
+        if not self.dry_run:
+            with timed(self.profile, 'write_deals', rows=len(page['deals'])):
+                _write_deals(self.cursor, page['deals'])
+
+        staged = []
+        for contract, raw_hash in page['contracts']:
+            _resolve_room(contract, self.registry, self.quarantine)
+
+            if self.dry_run:
+                logger.info(
+                    f"Would sync: {contract['resident_name']} - Room {contract['room_id']} - "
+                    f"£{contract['total_value']:,.0f}"
+                )
+                continue
+
+            # Skip items whose mapped fields haven't changed since the last sync
+            mapped_hash = stable_hash(contract)
+            if self.known_hashes.get(contract['monday_id']) == mapped_hash:
+                self.stats['contracts_unchanged'] += 1
+                continue
+
+            staged.append(contract)
+            self.hashes.append((contract['monday_id'], mapped_hash, raw_hash))
+
+        if staged:
+            with timed(self.profile, 'stage_contracts', rows=len(staged)):
+                _stage_contracts(self.cursor, staged)
+
+    def finish(self, progress=_no_progress) -> Dict:
+        stats = self.stats
+        if not self.dry_run:
+            if self.hashes:
+                progress('write_contracts')
+                with timed(self.profile, 'write_placeholder_rooms'):
+                    self.registry.create_missing(self.cursor)
+                _merge_contracts(self.cursor, stats, self.profile)
+                with timed(self.profile, 'write_item_hashes', rows=len(self.hashes)):
+                    _save_item_hashes(self.cursor, self.board_id, self.hashes)
+            progress('tombstone')
+
+            # An empty board is far more likely a Monday glitch than every contract being removed
+            if self.item_ids:
+                if self.archive:
+                    with timed(self.profile, 'write_archive'):
+                        _prune_board_items(self.cursor, self.board_id, self.item_ids)
+                with timed(self.profile, 'tombstone'):
+                    stats['contracts_deleted'] = _tombstone_missing(self.cursor, self.board_id, self.item_ids)
+                with timed(self.profile, 'write_quarantine', rows=len(self.quarantine)):
+                    _save_quarantine(self.cursor, self.board_id, self.quarantine)
+            else:
+                logger.warning("Board returned no items; not soft-deleting any contracts")
+
+        stats['quarantined'] = len(self.quarantine)
+        _log_quarantine(self.quarantine)
+
+        stats['unknown_rooms'] = self.registry.unknown_report() if self.registry else []
+
+        logger.info("\n=== Sync Complete ===")
+        logger.info(f"Contracts created: {stats['contracts_created']}")
+        logger.info(f"Contracts updated: {stats['contracts_updated']}")
+        logger.info(f"Contracts unchanged: {stats['contracts_unchanged']}")
+        logger.info(f"Contracts soft-deleted (no longer on board): {stats['contracts_deleted']}")
+        logger.info(f"Payments created: {stats['payments_created']}")
+        logger.info(f"Payments updated: {stats['payments_updated']}")
+        logger.info(f"Items skipped: {stats['skipped']}")
+        logger.info(f"Item versions archived: {stats['archived']}")
+        for unknown in stats['unknown_rooms']:
+            logger.warning(
+                f"Unknown room {unknown['room_id']} (written as {', '.join(unknown['raw_ids'])}) "
+                f"on {unknown['references']} contract(s), e.g. items {', '.join(unknown['sources'])}"
+            )
+        return stats
+
+
+class _LeadWriter:
+    """
+    Writes mapped Qualified board pages (see map_lead_page) into the caller's
+    transaction, then deletes leads no longer on the board.
+    """
+
+    name = 'leads'
+
+    def __init__(self, cursor, board_id: str, dry_run: bool = False, archive: bool = True,
+                 profile: Optional[SyncProfile] = None):
+        self.cursor = cursor
+        self.board_id = board_id
+        self.dry_run = dry_run
+        self.archive = archive
+        self.profile = profile
+        self.item_ids = []
+        self.quarantine = []
+        self.stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'skipped': 0, 'archived': 0}
+
+    def write_page(self, items: List[Dict], page: Dict):
+        self.item_ids.extend(item['id'] for item in items)
+        self.quarantine.extend(page['quarantine'])
+        if self.dry_run:
+            return
+
+        if self.archive and items:
+            with timed(self.profile, 'write_archive', rows=len(items)):
+                self.stats['archived'] += _archive_items(self.cursor, self.board_id, items)
+        with timed(self.profile, 'write_leads', rows=len(page['leads'])):
+            _write_leads(self.cursor, page['leads'], self.stats)
+
+    def finish(self) -> Dict:
+        # As for contracts, an empty board is treated as a Monday glitch
+        if not self.dry_run and self.item_ids:
+            if self.archive:
+                with timed(self.profile, 'write_archive'):
+                    _prune_board_items(self.cursor, self.board_id, self.item_ids)
+            with timed(self.profile, 'delete_leads'):
+                self.stats['deleted'] = _delete_missing_leads(self.cursor, self.item_ids)
+            with timed(self.profile, 'write_quarantine', rows=len(self.quarantine)):
+                _save_quarantine(self.cursor, self.board_id, self.quarantine)
+        self.stats['quarantined'] = len(self.quarantine)
+        _log_quarantine(self.quarantine)
+
+        logger.info(
+            f"Leads: {self.stats['created']} created, {self.stats['updated']} updated, "
+            f"{self.stats['unchanged']} unchanged, {self.stats['deleted']} deleted"
+        )
+        return self.stats
+
+
+def sync_rooms_from_monday(
+    dry_run: bool = False,
+    client=None,
+    items: Optional[List[Dict]] = None,
+    conn=None,
+    progress=_no_progress,
+    archive: bool = True
+):
+    """
+    Sync room inventory from Monday CRM (MH - Unit Schedule board).
+
+    Board ID: 9376648770
+
+    Args:
+        dry_run: If True, don't write to database, just show what would happen
+        client: MondayClient to fetch with (defaults to one built from .env)
+        items: Already-fetched board items (skips the fetch)
+        conn: Open connection to write through; the caller commits (see run_full_sync)
+        progress: Callback for job progress, progress(phase, items=..., pages=...)
+        archive: Store the raw items in monday_item_archive (off when reprocessing)
+    """
+    from integrations.monday_client import MondayClient
+
+    board_id = os.getenv("MONDAY_BOARD_ID_CONTRACTS", "9376648770")
+
+    if items is None:
+        client = client or MondayClient()
+
+        logger.info(f"Fetching rooms from Monday board {board_id}...")
+        items = client.get_all_board_items(
+            board_id, on_page=lambda _, n: progress('fetch', items=n, pages=1)
+        )
+    logger.info(f"Found {len(items)} rooms")
+
+    if dry_run:
+        logger.info("DRY RUN - no database changes will be made")
+
+    own_conn = conn is None
+    conn = conn or _connect()
+    cursor = conn.cursor()
+
+    writer = _RoomWriter(cursor, board_id, dry_run=dry_run, archive=archive)
+    writer.write_page(items, map_room_page(items))
+    progress('rooms', items=len(items))
+    stats = writer.finish()
 
-    logger.info("\n=== Room Sync Complete ===")
-    logger.info(f"Rooms created: {stats['created']}")
-    logger.info(f"Rooms updated: {stats['updated']}")
-    logger.info(f"Skipped: {stats['skipped']}")
+    cursor.close()
+    if own_conn:
+        if not dry_run:
+            conn.commit()
+        conn.close()
 
     return stats
 
 
-def sync_from_monday(clear_existing: bool = False, dry_run: bool = False):
+def sync_from_monday(
+    clear_existing: bool = False,
+    dry_run: bool = False,
+    client=None,
+    items: Optional[List[Dict]] = None,
+    conn=None,
+    progress=_no_progress,
+    force: bool = False,
+    archive: bool = True
+):
     """
     Sync contracts and payment schedules from Monday CRM.
 
+    All writes happen in one transaction: the board is staged, merged into the
+    live tables, and contracts no longer on the board are soft-deleted
+    (status 'deleted'). Readers see either the old state or the new one.
+
     Args:
         clear_existing: If True, delete all existing data before import
+            (inside the same transaction, so readers never see empty tables)
         dry_run: If True, don't write to database, just show what would happen
+        client: MondayClient to fetch with (defaults to one built from .env)
+        items: Already-fetched Won Deals items (skips the fetch)
+        conn: Open connection to write through; the caller commits (see run_full_sync)
+        progress: Callback for job progress, progress(phase, items=..., pages=...)
+        force: If True, rewrite every item even if its content hash is unchanged
+        archive: Store the raw items in monday_item_archive (off when reprocessing)
     """
     from integrations.monday_client import MondayClient
 
-    client = MondayClient()
-    board_id = os.getenv("MONDAY_BOARD_ID_PAYMENTS")
+    _, board_id, _ = _board_ids()
 
-    if not board_id:
-        logger.error("MONDAY_BOARD_ID_PAYMENTS not set in .env")
-        sys.exit(1)
-
-    logger.info(f"Fetching data from Monday board {board_id}...")
-    items = client.get_all_board_items(board_id)
+    if items is None:
+        client = client or MondayClient()
+        logger.info(f"Fetching data from Monday board {board_id}...")
+        items = client.get_all_board_items(
+            board_id, on_page=lambda _, n: progress('fetch', items=n, pages=1)
+        )
     logger.info(f"Found {len(items)} items")
 
     if dry_run:
         logger.info("DRY RUN - no database changes will be made")
 
-    connection_string = os.getenv("TIMESCALE_SERVICE_URL")
-    if not connection_string:
-        logger.error("TIMESCALE_SERVICE_URL not set")
-        sys.exit(1)
+    own_conn = conn is None
+    conn = conn or _connect()
+    cursor = conn.cursor()
+
+    writer = _ContractWriter(
+        cursor, board_id, dry_run=dry_run, force=force, archive=archive, clear_existing=clear_existing
+    )
+    writer.write_page(items, map_contract_page(items))
+    progress('map_contracts', items=len(items))
+    stats = writer.finish(progress)
+
+    cursor.close()
+    if own_conn:
+        if not dry_run:
+            conn.commit()
+        conn.close()
+
+    return stats
+
+
+def load_archived_boards(conn, progress=_no_progress) -> Dict[str, Dict]:
+    """The boards as last fetched, rebuilt from monday_item_archive, as {'rooms', 'contracts', 'leads'}."""
+    rooms_board_id, contracts_board_id, leads_board_id = _board_ids()
 
-    conn = psycopg2.connect(dsn=connection_string)
     cursor = conn.cursor()
-    cursor.execute(f"SET search_path TO {SCHEMA_NAME}, public")
+    boards = {}
+    for key, board_id in (('rooms', rooms_board_id), ('contracts', contracts_board_id), ('leads', leads_board_id)):
+        items = load_archived_items(cursor, board_id)
+        progress('load_archive', items=len(items))
+        logger.info(f"Loaded {len(items)} archived items for board {board_id}")
+        boards[key] = {'board': {'id': board_id}, 'items': items}
+    cursor.close()
+    return boards
 
-    if clear_existing and not dry_run:
-        logger.info("Clearing existing data...")
-        cursor.execute("DELETE FROM payments_received")
-        cursor.execute("DELETE FROM payment_schedule")
-        cursor.execute("DELETE FROM contracts")
-        conn.commit()
 
+def _put(pages: queue.Queue, entry, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            pages.put(entry, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _fetch_stage(client, board_ids: List[str], mappers: Dict, pool: ThreadPoolExecutor,
+                 pages: queue.Queue, stop: threading.Event, timings: Dict,
+                 profile: Optional[SyncProfile] = None):
+    """
+    Pipeline producer: fetch both boards page by page and hand each page to the mapper pool.
+
+    Puts (board_id, items, last_page, mapped future) on `pages` in fetch order,
+    then None when done, or the exception if fetching failed. The queue is
+    bounded, so the fetcher waits when the writer falls behind.
+    """
+    try:
+        fetched = client.iter_boards_pages(board_ids)
+        while not stop.is_set():
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            bytes_before = client.stats['bytes']
+            page = next(fetched, None)
+            wall = time.perf_counter() - start
+            timings['fetch_seconds'] += wall
+            if page is None:
+                break
+            board_id, _, items, last_page = page
+            if profile:
+                profile.record_page(board_id, len(items), wall, time.thread_time() - cpu_start,
+                                    client.stats['bytes'] - bytes_before)
+            future = pool.submit(mappers[board_id], items)
+            if not _put(pages, (board_id, items, last_page, future), stop):
+                return
+        _put(pages, None, stop)
+    except Exception as e:
+        _put(pages, e, stop)
+
+
+def _run_pipeline(client, boards: List[tuple], progress=_no_progress,
+                  profile: Optional[SyncProfile] = None) -> Dict:
+    """
+    Fetch, map and write the boards as three overlapping stages.
+
+    - Fetch: one thread walks all the boards in batched requests (see
+      MondayClient.iter_boards_pages), so they are fetched together
+    - Map: pages are decoded on a pool of PIPELINE_MAP_WORKERS threads
+    - Write: this thread, which owns the connection, writes each page as its
+      mapping completes
+
+    `boards` is [(board_id, writer, mapper, after), ...]: a board's pages are
+    held back until the board `after` (if any, listed earlier) is complete;
+    contracts need the rooms. At most PIPELINE_QUEUE_PAGES pages are in flight.
+
+    Returns the time spent in each stage; wall time approaches the slowest.
+    """
+    board_ids = [board_id for board_id, _, _, _ in boards]
+    writers = {board_id: writer for board_id, writer, _, _ in boards}
+    mappers = {board_id: mapper for board_id, _, mapper, _ in boards}
+    after = {board_id: waits_for for board_id, _, _, waits_for in boards}
+
+    pages = queue.Queue(maxsize=PIPELINE_QUEUE_PAGES)
+    stop = threading.Event()
+    timings = {'fetch_seconds': 0.0, 'map_seconds': 0.0, 'write_seconds': 0.0}
+    pending = {board_id: [] for board_id in board_ids}
+    complete = set()
+    page_count = 0
+
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=PIPELINE_MAP_WORKERS, thread_name_prefix='sync-map')
+    fetcher = threading.Thread(
+        target=_fetch_stage, args=(client, board_ids, mappers, pool, pages, stop, timings, profile),
+        name='sync-fetch', daemon=True
+    )
+    fetcher.start()
+    try:
+        while True:
+            entry = pages.get()
+            if entry is None:
+                break
+            if isinstance(entry, Exception):
+                raise entry
+
+            board_id, items, last_page, future = entry
+            mapped = future.result()
+            timings['map_seconds'] += mapped['seconds']
+            if profile:
+                profile.record(f"decode_{writers[board_id].name}", mapped['seconds'],
+                               mapped['cpu_seconds'], rows=len(items))
+            page_count += 1
+            progress('sync', items=len(items), pages=1)
+            pending[board_id].append((items, mapped, last_page))
+
+            write_start = time.perf_counter()
+            for ready_id in board_ids:
+                if after[ready_id] and after[ready_id] not in complete:
+                    continue
+                for page_items, page, page_last in pending[ready_id]:
+                    writers[ready_id].write_page(page_items, page)
+                    if page_last:
+                        complete.add(ready_id)
+                pending[ready_id] = []
+            timings['write_seconds'] += time.perf_counter() - write_start
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    fetcher.join()
+
+    missing = set(board_ids) - complete
+    if missing:
+        raise RuntimeError(f"Monday fetch ended before board(s) {', '.join(sorted(missing))} completed")
+
+    timings = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+    timings['wall_seconds'] = round(time.perf_counter() - start, 3)
+    timings['pages'] = page_count
+    logger.info(f"Pipeline: {timings}")
+    return timings
+
+
+def run_full_sync(
+    clear_existing: bool = False,
+    dry_run: bool = False,
+    client=None,
+    progress=_no_progress,
+    force: bool = False,
+    reprocess: bool = False,
+    profile: Optional[SyncProfile] = None
+) -> Dict:
+    """
+    Sync rooms, contracts and leads from the Unit Schedule, Won Deals and
+    Qualified boards and publish them in one transaction.
+
+    By default contracts whose content hash is unchanged are skipped (incremental);
+    force=True rewrites every contract (the nightly full sync). Fetching, mapping
+    and writing run as a pipeline (see _run_pipeline); the merge, soft-deletes
+    and commit follow once every board is in.
+
+    Args:
+        progress: Callback for job progress, progress(phase, items=..., pages=...)
+        force: Ignore stored content hashes and rewrite every contract
+        reprocess: Re-map the archived items instead of fetching from Monday
+            (after a COLUMN_MAP or normalize_room_id fix); implies force
+        profile: SyncProfile to record into (a new one by default)
+
+    Returns:
+        Dict with 'rooms', 'contracts', 'leads' and 'cohorts' stats, table
+        'counts' before ('before') and after the sync, 'pipeline' stage timings
+        and the 'profile' report (see SyncProfile.report). See sync_job_result
+        for the shape stored with a sync job.
+    """
+    from integrations.monday_client import MondayClient
+
+    profile = profile or SyncProfile()
+    rooms_board_id, contracts_board_id, leads_board_id = _board_ids()
+    if dry_run:
+        logger.info("DRY RUN - no database changes will be made")
+
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        before = None
+        if not dry_run:
+            progress('counting')
+            with timed(profile, 'count_rows_before'):
+                before = _table_counts(conn)
+
+        rooms = _RoomWriter(cursor, rooms_board_id, dry_run=dry_run, archive=not reprocess, profile=profile)
+        contracts = _ContractWriter(
+            cursor, contracts_board_id, dry_run=dry_run, force=force or reprocess,
+            archive=not reprocess, clear_existing=clear_existing, profile=profile
+        )
+        leads = _LeadWriter(cursor, leads_board_id, dry_run=dry_run, archive=not reprocess, profile=profile)
+
+        pipeline = None
+        if reprocess:
+            progress('load_archive')
+            with timed(profile, 'load_archive'):
+                boards = load_archived_boards(conn, progress=progress)
+            progress('map')
+            for key, writer, mapper in (
+                ('rooms', rooms, map_room_page),
+                ('contracts', contracts, map_contract_page),
+                ('leads', leads, map_lead_page),
+            ):
+                items = boards[key]['items']
+                mapped = mapper(items)
+                profile.record(f"decode_{writer.name}", mapped['seconds'], mapped['cpu_seconds'], rows=len(items))
+                writer.write_page(items, mapped)
+        else:
+            logger.info(f"Syncing Monday boards {rooms_board_id}, {contracts_board_id} and {leads_board_id}...")
+            progress('sync')
+            client = client or MondayClient()
+            usage_before = dict(client.stats)
+            try:
+                pipeline = _run_pipeline(client, [
+                    (rooms_board_id, rooms, map_room_page, None),
+                    (contracts_board_id, contracts, map_contract_page, rooms_board_id),
+                    (leads_board_id, leads, map_lead_page, None),
+                ], progress=progress, profile=profile)
+            finally:
+                profile.add_monday_usage({key: client.stats[key] - usage_before[key] for key in usage_before})
+
+        room_stats = rooms.finish()
+        contract_stats = contracts.finish(progress)
+        lead_stats = leads.finish()
+
+        counts = None
+        cohort_stats = None
+        if not dry_run:
+            progress('cohorts')
+            with timed(profile, 'refresh_cohorts'):
+                cohort_stats = _refresh_viewing_cohorts(cursor)
+            logger.info(f"Viewing cohorts: {cohort_stats['upserted']} updated, {cohort_stats['deleted']} removed")
+            with timed(profile, 'count_rows'):
+                counts = _table_counts(conn)
+            progress('commit')
+            with timed(profile, 'commit'):
+                conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return {
+        'rooms': room_stats,
+        'contracts': contract_stats,
+        'leads': lead_stats,
+        'cohorts': cohort_stats,
+        'before': before,
+        'counts': counts,
+        'pipeline': pipeline,
+        'profile': profile.report(),
+    }
+
+
+def sync_job_result(stats: Dict) -> Dict:
+    """
+    The result stored with a sync job (sync_jobs.result), from run_full_sync's
+    stats: per-board stats, table counts before/after with the changes, and
+    the profile. Used by every runner (API, scheduler, CLI).
+    """
+    before, after = stats['before'], stats['counts']
+    return {
+        'rooms': stats['rooms'],
+        'contracts': stats['contracts'],
+        'leads': stats['leads'],
+        'cohorts': stats['cohorts'],
+        'counts': after,
+        'pipeline': stats['pipeline'],
+        'profile': stats['profile'],
+        'before': before,
+        'after': after,
+        'changes': {
+            table: after[table] - before.get(table, 0)
+            for table in after
+        } if before is not None and after is not None else None,
+    }
+
+
+def sync_items_from_monday(board_id: str, item_ids: List[str], client=None):
+    """
+    Re-sync a handful of items from one board (used by the Monday webhook).
+
+    Applies the same mapping as the full sync, but only to the given items.
+    Items that no longer exist on Monday (or left the board) are reported as
+    missing, and their contracts soft-deleted / leads removed.
+    """
+    from integrations.monday_client import MondayClient
+
+    rooms_board_id, contracts_board_id, leads_board_id = _board_ids()
+
+    client = client or MondayClient()
+    items = client.get_items(item_ids)
+    items = [item for item in items if str(item.get('board', {}).get('id')) == str(board_id)]
+
+    missing = set(item_ids) - {item['id'] for item in items}
     stats = {
+        'created': 0,
+        'updated': 0,
+        'unchanged': 0,
         'contracts_created': 0,
         'contracts_updated': 0,
+        'contracts_unchanged': 0,
         'payments_created': 0,
         'payments_updated': 0,
         'skipped': 0,
+        'missing': len(missing),
     }
 
-    for item in items:
-        monday_id = item['id']
-        resident_name = item.get('name', '').strip()
-
-        # Get contract data
-        room_id_raw = get_column_value(item, COLUMN_MAP['unit'])
-        room_id = normalize_room_id(room_id_raw) if room_id_raw else None
-        gross_income = parse_number(get_column_value(item, COLUMN_MAP['gross_income']))
-        rate_agreed = parse_number(get_column_value(item, COLUMN_MAP['rate_agreed']))
-        payment_plan = get_column_value(item, COLUMN_MAP['payment_plan'])
-        nationality = get_column_value(item, COLUMN_MAP['nationality'])
-        university = get_column_value(item, COLUMN_MAP['university'])
-        stage = get_column_value(item, COLUMN_MAP['stage'])
-
-        # Parse timeline for start/end dates
-        start_date, end_date = parse_timeline(item, COLUMN_MAP['length_of_stay'])
-
-        # Skip if missing critical data
-        if not resident_name or not room_id:
-            logger.debug(f"Skipping item {monday_id}: missing name or room")
-            stats['skipped'] += 1
-            continue
-
-        # Skip if missing dates (required by database)
-        if not start_date or not end_date:
-            logger.debug(f"Skipping item {monday_id} ({resident_name}): missing start/end dates")
-            stats['skipped'] += 1
-            continue
-
-        # Calculate total value from installments if gross_income formula is empty
-        if not gross_income:
-            installment_amounts = [
-                parse_number(get_column_value(item, COLUMN_MAP['booking_fee_amount'])),
-                parse_number(get_column_value(item, COLUMN_MAP['instalment_1_amount'])),
-                parse_number(get_column_value(item, COLUMN_MAP['instalment_2_amount'])),
-                parse_number(get_column_value(item, COLUMN_MAP['instalment_3_amount'])),
-                parse_number(get_column_value(item, COLUMN_MAP['instalment_4_amount'])),
-                parse_number(get_column_value(item, COLUMN_MAP['instalment_5_amount'])),
-            ]
-            gross_income = sum(a for a in installment_amounts if a) or 0
-
-        if dry_run:
-            logger.info(f"Would sync: {resident_name} - Room {room_id} - £{gross_income:,.0f}")
-            continue
+    conn = _connect()
+    cursor = conn.cursor()
 
-        # Ensure room exists
-        cursor.execute("SELECT room_id FROM rooms WHERE room_id = %s", (room_id,))
-        if not cursor.fetchone():
-            cursor.execute(
-                "INSERT INTO rooms (room_id, floor, category) VALUES (%s, 'TBD', 'TBD')",
-                (room_id,)
-            )
-            logger.info(f"Created room: {room_id}")
+    quarantine = []
 
-        # Check if contract exists (by monday_id)
-        cursor.execute(
-            "SELECT id FROM contracts WHERE monday_id = %s",
-            (monday_id,)
-        )
-        existing = cursor.fetchone()
-
-        if existing:
-            contract_id = existing[0]
-            # Update existing contract
-            cursor.execute("""
-                UPDATE contracts SET
-                    room_id = %s,
-                    resident_name = %s,
-                    start_date = %s,
-                    end_date = %s,
-                    total_value = %s,
-                    weekly_rate = %s,
-                    payment_plan = %s,
-                    nationality = %s,
-                    university = %s,
-                    updated_at = NOW()
-                WHERE id = %s
-            """, (
-                room_id, resident_name, start_date, end_date,
-                gross_income or 0, rate_agreed,
-                payment_plan or 'Unknown',
-                nationality, university, contract_id
-            ))
-            stats['contracts_updated'] += 1
-        else:
-            # Create new contract
-            cursor.execute("""
-                INSERT INTO contracts (
-                    monday_id, room_id, resident_name, start_date, end_date,
-                    total_value, weekly_rate, payment_plan, status, nationality, university
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'active', %s, %s)
-                RETURNING id
-            """, (
-                monday_id, room_id, resident_name, start_date, end_date,
-                gross_income or 0, rate_agreed, payment_plan or 'Unknown',
-                nationality, university
-            ))
-            contract_id = cursor.fetchone()[0]
-            stats['contracts_created'] += 1
-
-        # Sync payment schedule
-        installments = [
-            (0, 'booking_fee'),
-            (1, 'instalment_1'),
-            (2, 'instalment_2'),
-            (3, 'instalment_3'),
-            (4, 'instalment_4'),
-            (5, 'instalment_5'),
-        ]
-
-        for inst_num, inst_key in installments:
-            due_date = parse_date(get_column_value(item, COLUMN_MAP[f'{inst_key}_due']))
-            amount = parse_number(get_column_value(item, COLUMN_MAP[f'{inst_key}_amount']))
-            status_text = get_column_value(item, COLUMN_MAP[f'{inst_key}_status'])
-            status = map_payment_status(status_text)
-
-            # Skip if no amount
-            if not amount or amount <= 0:
-                continue
+    try:
+        if items:
+            _archive_items(cursor, board_id, items)
+
+        # Viewing cohorts the items count towards, before and after the write
+        cohort_ids = {
+            str(contracts_board_id): {'contract_ids': item_ids},
+            str(leads_board_id): {'lead_ids': item_ids},
+        }.get(str(board_id))
+        cohort_weeks = set(_cohort_weeks(cursor, **cohort_ids)) if cohort_ids else set()
+
+        if str(board_id) == str(rooms_board_id):
+            rooms = []
+            for item in items:
+                room = map_room_item(item, quarantine)
+                if not room:
+                    stats['skipped'] += 1
+                    continue
+                rooms.append(room)
+            _write_rooms(cursor, rooms, stats)
+        elif str(board_id) == str(contracts_board_id):
+            registry = RoomRegistry.load(cursor)
+            contracts = []
+            hashes = []
+            deals = []
+            for item in items:
+                record = CONTRACT_DECODER.decode(item)
+                deals.append(map_deal_record(record))
+                contract = _map_contract_record(record, quarantine)
+                if not contract:
+                    stats['skipped'] += 1
+                    continue
+                _resolve_room(contract, registry, quarantine)
+                contracts.append(contract)
+                hashes.append((contract['monday_id'], stable_hash(contract), item_raw_hash(item)))
+            _write_deals(cursor, deals)
+            _write_contracts(cursor, contracts, stats, registry)
+            _save_item_hashes(cursor, board_id, hashes)
+            stats['unknown_rooms'] = registry.unknown_report()
+            # Items deleted or moved off the board on Monday
+            if missing:
+                stats['contracts_deleted'] = _tombstone_items(cursor, board_id, missing)
+        elif str(board_id) == str(leads_board_id):
+            _write_leads(cursor, [map_lead_item(item, quarantine) for item in items], stats)
+            # Leads are a plain mirror: items deleted on Monday go too
+            if missing:
+                cursor.execute("DELETE FROM leads WHERE monday_id = ANY(%s)", (list(missing),))
+                stats['deleted'] = cursor.rowcount
+
+        if cohort_ids:
+            cohort_weeks.update(_cohort_weeks(cursor, **cohort_ids))
+            stats['cohorts'] = _refresh_viewing_cohorts(cursor, weeks=sorted(cohort_weeks))
+
+        if str(board_id) in (str(rooms_board_id), str(contracts_board_id), str(leads_board_id)):
+            stats['quarantined'] = _save_quarantine(cursor, board_id, quarantine, item_ids=item_ids)
 
-            # Check if payment schedule entry exists
-            cursor.execute("""
-                SELECT id FROM payment_schedule
-                WHERE contract_id = %s AND installment_number = %s
-            """, (contract_id, inst_num))
-            existing_payment = cursor.fetchone()
-
-            if existing_payment:
-                cursor.execute("""
-                    UPDATE payment_schedule SET
-                        due_date = %s,
-                        amount = %s,
-                        status = %s
-                    WHERE id = %s
-                """, (due_date, amount, status, existing_payment[0]))
-                stats['payments_updated'] += 1
-            else:
-                cursor.execute("""
-                    INSERT INTO payment_schedule (
-                        contract_id, installment_number, due_date, amount, status
-                    )
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (contract_id, inst_num, due_date, amount, status))
-                stats['payments_created'] += 1
-
-        # Sync actual payments received
-        for inst_num, inst_key in installments:
-            paid_amount = parse_number(get_column_value(item, COLUMN_MAP[f'{inst_key}_paid']))
-            paid_date = parse_date(get_column_value(item, COLUMN_MAP[f'{inst_key}_paid_date']))
-
-            if paid_amount and paid_amount > 0 and paid_date:
-                # Check if payment record exists
-                cursor.execute("""
-                    SELECT id FROM payments_received
-                    WHERE contract_id = %s AND allocated_to_installment = %s
-                """, (contract_id, inst_num))
-                existing_received = cursor.fetchone()
-
-                if existing_received:
-                    cursor.execute("""
-                        UPDATE payments_received SET
-                            payment_date = %s,
-                            amount = %s
-                        WHERE id = %s
-                    """, (paid_date, paid_amount, existing_received[0]))
-                else:
-                    cursor.execute("""
-                        INSERT INTO payments_received (
-                            contract_id, payment_date, amount,
-                            payment_method, allocated_to_installment
-                        )
-                        VALUES (%s, %s, %s, 'monday_sync', %s)
-                    """, (contract_id, paid_date, paid_amount, inst_num))
-
-    if not dry_run:
         conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
 
-    cursor.close()
-    conn.close()
-
-    logger.info("\n=== Sync Complete ===")
-    logger.info(f"Contracts created: {stats['contracts_created']}")
-    logger.info(f"Contracts updated: {stats['contracts_updated']}")
-    logger.info(f"Payments created: {stats['payments_created']}")
-    logger.info(f"Payments updated: {stats['payments_updated']}")
-    logger.info(f"Items skipped: {stats['skipped']}")
-
+    logger.info(f"Webhook sync of {len(item_ids)} item(s) on board {board_id}: {stats}")
     return stats
 
 
@@ -522,15 +1792,48 @@ if __name__ == "__main__":
     parser.add_argument("--dry-run", action="store_true", help="Don't write to database")
     parser.add_argument("--rooms-only", action="store_true", help="Only sync rooms (Unit Schedule board)")
     parser.add_argument("--contracts-only", action="store_true", help="Only sync contracts (Won Deals board)")
+    parser.add_argument("--force", action="store_true", help="Rewrite every contract, even if unchanged on Monday")
+    parser.add_argument("--reprocess", action="store_true",
+                        help="Rebuild from the local item archive instead of fetching from Monday")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print where the sync spent its time (Monday, decoding, each table)")
     args = parser.parse_args()
 
-    if args.rooms_only:
-        sync_rooms_from_monday(dry_run=args.dry_run)
-    elif args.contracts_only:
-        sync_from_monday(clear_existing=args.clear, dry_run=args.dry_run)
+    try:
+        _board_ids()
+        _connect().close()
+    except (RuntimeError, psycopg2.Error) as e:
+        logger.error(e)
+        sys.exit(1)
+
+    from backend.services.sync_job_service import SyncJobService
+
+    if args.rooms_only or args.contracts_only:
+        # Not a tracked job, but holds the sync lock so it never overlaps one
+        with SyncJobService().try_lock() as locked:
+            if not locked:
+                logger.error("Another sync is already running")
+                sys.exit(1)
+            if args.rooms_only:
+                sync_rooms_from_monday(dry_run=args.dry_run)
+            else:
+                sync_from_monday(clear_existing=args.clear, dry_run=args.dry_run, force=args.force)
     else:
-        # Sync both: rooms first, then contracts
-        logger.info("=== Syncing Rooms ===")
-        sync_rooms_from_monday(dry_run=args.dry_run)
-        logger.info("\n=== Syncing Contracts ===")
-        sync_from_monday(clear_existing=args.clear, dry_run=args.dry_run)
+        # Sync both boards, rooms first, committed together, as a tracked job
+        from backend.services.sync_runner import run_sync_job
+
+        kind = 'reprocess' if args.reprocess else 'full' if args.force or args.clear else 'incremental'
+        job = SyncJobService().start_job(kind=kind, triggered_by='cli')
+        if not job:
+            logger.error("Another sync is already running")
+            sys.exit(1)
+        result = run_sync_job(
+            job,
+            clear_existing=args.clear,
+            dry_run=args.dry_run,
+            force=args.force,
+            reprocess=args.reprocess
+        )
+
+        if args.profile:
+            print(format_profile(result['profile']))
@@ -0,0 +1,40 @@
+# tests/conftest.py
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path, as the scripts do
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """
+    A fresh More House schema (scripts/init_db.py) in the database at
+    TEST_DATABASE_URL, which the code under test connects to. Skipped if
+    TEST_DATABASE_URL is unset. The schema is dropped first: never point it
+    at a database with real data.
+
+    Yields an autocommit connection with the schema on its search path.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    import psycopg2
+    from scripts.init_db import CREATE_SCHEMA_SQL, CREATE_TABLES_SQL, SCHEMA_NAME
+
+    monkeypatch.setenv("TIMESCALE_SERVICE_URL", url)
+    conn = psycopg2.connect(dsn=url)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA_NAME} CASCADE")
+        cursor.execute(CREATE_SCHEMA_SQL)
+        cursor.execute(CREATE_TABLES_SQL)
+        cursor.execute(f"SET search_path TO {SCHEMA_NAME}, public")
+    yield conn
+    conn.close()
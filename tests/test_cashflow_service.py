@@ -0,0 +1,129 @@
+# tests/test_cashflow_service.py
+
+import pandas as pd
+import pytest
+
+from backend.models.schemas import PaymentPlan
+from backend.services.cashflow_service import CashFlowService
+
+
+def _contract(contract_id=1, start_date="2025-09-01", end_date="2026-08-20", total_value=15300,
+              weekly_rate=300, payment_plan=PaymentPlan.INSTALLMENTS.value, sign_date="2025-07-03"):
+    return {
+        "contract_id": contract_id, "start_date": start_date, "end_date": end_date,
+        "total_value": total_value, "weekly_rate": weekly_rate,
+        "payment_plan": payment_plan, "sign_date": sign_date,
+    }
+
+
+def _schedule(*contracts):
+    return CashFlowService.generate_payment_schedules(pd.DataFrame(list(contracts)))
+
+
+def _rows(schedule):
+    """(installment_number, due date, amount) of each row."""
+    return [
+        (row.installment_number, row.due_date.strftime("%Y-%m-%d"), row.amount)
+        for row in schedule.itertuples()
+    ]
+
+
+def test_installments_booking_fee_then_one_per_term():
+    schedule = _schedule(_contract())
+
+    assert list(schedule.columns) == CashFlowService.SCHEDULE_COLUMNS
+    assert _rows(schedule) == [
+        (0, "2025-07-03", 300.0),
+        (1, "2025-08-01", 3750.0),
+        (2, "2025-10-09", 3750.0),
+        (3, "2026-01-09", 3750.0),
+        (4, "2026-04-10", 3750.0),
+    ]
+    assert (schedule["status"] == "pending").all()
+    assert (schedule["notes"] == "generated").all()
+
+
+def test_single_payment_fee_due_with_the_payment_when_sign_date_unknown():
+    schedule = _schedule(_contract(payment_plan=PaymentPlan.SINGLE_PAYMENT.value, sign_date=None))
+
+    assert _rows(schedule) == [
+        (0, "2025-08-01", 300.0),
+        (1, "2025-08-01", 15000.0),
+    ]
+
+
+def test_studentluxe_has_no_booking_fee():
+    schedule = _schedule(_contract(payment_plan=PaymentPlan.STUDENTLUXE.value))
+
+    assert _rows(schedule) == [
+        (1, "2025-08-01", 3825.0),
+        (2, "2025-10-09", 3825.0),
+        (3, "2026-01-09", 3825.0),
+        (4, "2026-04-10", 3825.0),
+    ]
+
+
+@pytest.mark.parametrize("payment_plan", [PaymentPlan.SPECIAL.value, "Something else", None])
+def test_custom_and_unknown_plans_are_scheduled_as_installments(payment_plan):
+    schedule = _schedule(_contract(payment_plan=payment_plan))
+
+    assert _rows(schedule) == _rows(_schedule(_contract()))
+    assert schedule["notes"].str.contains("custom terms unknown").all()
+
+
+def test_stay_crossing_academic_years():
+    schedule = _schedule(_contract(
+        start_date="2026-01-20", end_date="2027-03-01", total_value=10000.01,
+        weekly_rate=250, sign_date=None,
+    ))
+
+    # Spring 2026 (academic year 2025) to spring 2027 (academic year 2026);
+    # the last installment takes the rounding
+    assert _rows(schedule) == [
+        (0, "2026-01-09", 250.0),
+        (1, "2026-01-09", 1950.0),
+        (2, "2026-04-10", 1950.0),
+        (3, "2026-08-01", 1950.0),
+        (4, "2026-10-09", 1950.0),
+        (5, "2027-01-09", 1950.01),
+    ]
+
+
+def test_no_installment_for_a_short_last_term():
+    # 2026-04-10 is under MIN_TERM_DAYS before the end of the stay
+    schedule = _schedule(_contract(end_date="2026-05-01"))
+
+    assert [row[0] for row in _rows(schedule)] == [0, 1, 2, 3]
+    assert schedule["amount"].sum() == pytest.approx(15300)
+
+
+def test_installment_never_due_long_before_move_in():
+    schedule = _schedule(_contract(start_date="2025-10-01", sign_date=None))
+
+    # The 2025-08-01 term date is moved to MAX_DAYS_DUE_BEFORE_START before the start
+    assert _rows(schedule)[1] == (1, "2025-08-31", 3750.0)
+
+
+def test_schedules_add_up_to_total_value():
+    contracts = [
+        _contract(1, total_value=10000.01),
+        _contract(2, payment_plan=PaymentPlan.SINGLE_PAYMENT.value, total_value=999.99),
+        _contract(3, payment_plan=PaymentPlan.STUDENTLUXE.value, total_value=12345.67),
+        _contract(4, start_date="2025-07-15", end_date="2027-06-30", total_value=30000.03, weekly_rate=400),
+        _contract(5, start_date="2025-10-09", end_date="2025-10-20", total_value=200, weekly_rate=500),
+    ]
+    schedule = _schedule(*contracts)
+
+    totals = schedule.groupby("contract_id")["amount"].sum().round(2)
+    assert totals.to_dict() == {c["contract_id"]: c["total_value"] for c in contracts}
+
+
+def test_contracts_without_value_or_valid_dates_get_no_schedule():
+    schedule = _schedule(
+        _contract(1, total_value=0),
+        _contract(2, start_date=None),
+        _contract(3, start_date="2025-09-01", end_date="2025-08-01"),
+    )
+
+    assert schedule.empty
+    assert list(schedule.columns) == CashFlowService.SCHEDULE_COLUMNS
@@ -0,0 +1,77 @@
+# tests/test_import_installments.py
+
+import pandas as pd
+
+from scripts.import_installments import SHEET_COLUMNS, _clean_installments
+
+
+def _sheet(*rows):
+    """Export rows (as read from the sheet) with their sheet row numbers."""
+    df = pd.DataFrame(list(rows), columns=SHEET_COLUMNS)
+    df['row'] = range(len(df))
+    return df
+
+
+def _row(**values):
+    return {
+        'Name': ' Jane Doe ',
+        'Unit Booked New': 'A101',
+        'Gross Income': 15300,
+        'Payment Plan': 'Installments',
+        'Actual Length of Stay - Start': '2025-09-01',
+        'Actual Length of Stay - End': '2026-06-30',
+        **values,
+    }
+
+
+def test_contract_columns_are_cleaned():
+    contracts, _ = _clean_installments(_sheet(
+        _row(),
+        _row(**{'Name': '', 'Gross Income': 'n/a', 'Payment Plan': None,
+                'Actual Length of Stay - Start': 'soon'}),
+    ))
+
+    assert contracts.iloc[0].to_dict() == {
+        'row': 0, 'resident_name': 'Jane Doe', 'unit': 'A101', 'total_value': 15300.0,
+        'payment_plan': 'Installments',
+        'start_date': pd.Timestamp('2025-09-01'), 'end_date': pd.Timestamp('2026-06-30'),
+    }
+    # Unparseable cells are left empty for validation to reject
+    blank = contracts.iloc[1]
+    assert blank['resident_name'] is None
+    assert pd.isna(blank['total_value'])
+    assert pd.isna(blank['start_date'])
+    assert blank['payment_plan'] == 'Unknown'
+
+
+def test_schedule_is_one_row_per_positive_installment():
+    _, schedule = _clean_installments(_sheet(
+        _row(**{
+            '📅Booking Fee Due Date': '2025-07-03', 'Booking Fee Payment Amount': 300,
+            '📅Installment 1 Due Date': '2025-08-01', 'Installment 1 Amount': 3750,
+            '📅Installment 2 Due Date': '2025-10-09', 'Installment 2 Amount': 0,
+        }),
+        _row(**{
+            '📅Installment 1 Due Date': 'tbc', 'Installment 1 Amount': '1000',
+            'Installment 5 Amount': 500,
+        }),
+    ))
+
+    rows = sorted(
+        (r.row, r.installment_number, r.due_date, r.amount) for r in schedule.itertuples()
+    )
+    assert rows == [
+        (0, 0, pd.Timestamp('2025-07-03'), 300.0),
+        (0, 1, pd.Timestamp('2025-08-01'), 3750.0),
+        (1, 1, pd.NaT, 1000.0),
+        (1, 5, pd.NaT, 500.0),
+    ]
+
+
+def test_missing_columns_are_read_as_empty():
+    df = pd.DataFrame({'Name': ['Jane Doe'], 'row': [7]})
+    contracts, schedule = _clean_installments(df)
+
+    assert contracts['row'].tolist() == [7]
+    assert contracts['unit'].isna().all()
+    assert schedule.empty
@@ -0,0 +1,119 @@
+# tests/test_monday_decoder.py
+
+import json
+from datetime import date
+
+from integrations.monday_decoder import BoardDecoder, column_type, parse_date, parse_number
+
+COLUMN_MAP = {
+    'unit': 'text_mkunit',
+    'viewing_date': 'date_mkview',
+    'length_of_stay': 'timerange_mkstay',
+    'rate': 'numeric_mkrate',
+    'gross_income': 'formula_mkgross',
+    'stage': 'deal_stage',
+    'payment_status': 'color_mkpaid',
+    'deposit_paid': 'boolean_mkdep',
+}
+
+
+def _item(*column_values, name='  Jane Doe '):
+    return {'id': '123', 'name': name, 'column_values': list(column_values)}
+
+
+def _column(column_id, text=None, value=None):
+    return {'id': column_id, 'text': text, 'value': None if value is None else json.dumps(value)}
+
+
+def test_column_type_is_the_id_prefix():
+    assert column_type('date_mkszxxzx') == 'date'
+    assert column_type('deal_stage') == 'deal'
+
+
+def test_decodes_each_column_by_type():
+    record = BoardDecoder(COLUMN_MAP).decode(_item(
+        _column('text_mkunit', 'A101'),
+        _column('date_mkview', '2025-06-01'),
+        _column('timerange_mkstay', '2025-09-01 - 2026-06-30', {'from': '2025-09-01', 'to': '2026-06-30'}),
+        _column('numeric_mkrate', '350.5'),
+        _column('formula_mkgross', '£15,300'),
+        _column('deal_stage', 'Won'),
+        _column('color_mkpaid', 'Paid'),
+        _column('boolean_mkdep', 'v', {'checked': 'true'}),
+    ))
+
+    assert record == {
+        'monday_id': '123',
+        'name': 'Jane Doe',
+        'issues': [],
+        'unit': 'A101',
+        'viewing_date': date(2025, 6, 1),
+        'length_of_stay': (date(2025, 9, 1), date(2026, 6, 30)),
+        'rate': 350.5,
+        'gross_income': 15300.0,
+        'stage': 'Won',
+        'payment_status': 'Paid',
+        'deposit_paid': True,
+    }
+
+
+def test_absent_and_empty_columns_decode_as_empty():
+    record = BoardDecoder(COLUMN_MAP).decode(_item(
+        _column('date_mkview', ''),
+        _column('numeric_mkrate', None),
+        _column('unmapped_column', 'ignored'),
+    ))
+
+    assert record['viewing_date'] is None
+    assert record['rate'] is None
+    assert record['unit'] is None
+    assert record['length_of_stay'] == (None, None)
+    assert record['deposit_paid'] is False
+    assert record['issues'] == []
+
+
+def test_unparseable_columns_are_reported_as_issues():
+    record = BoardDecoder(COLUMN_MAP).decode(_item(
+        _column('date_mkview', 'next week'),
+        _column('numeric_mkrate', 'n/a'),
+        _column('timerange_mkstay', '?', {'from': 'soon'}),
+    ))
+
+    assert record['viewing_date'] is None
+    assert record['rate'] is None
+    assert record['length_of_stay'] == (None, None)
+    assert [(i['field'], i['reason'], i['raw_value']) for i in record['issues']] == [
+        ('viewing_date', 'unparseable_date', 'next week'),
+        ('rate', 'unparseable_number', 'n/a'),
+        ('length_of_stay', 'unparseable_timeline', json.dumps({'from': 'soon'})),
+    ]
+    assert record['issues'][0]['column_id'] == 'date_mkview'
+
+
+def test_types_override_the_column_id():
+    decoder = BoardDecoder({'floor': 'text_mkfloor'}, types={'floor': 'numeric'})
+
+    assert decoder.decode(_item(_column('text_mkfloor', '3')))['floor'] == 3.0
+
+
+def test_one_column_can_feed_several_fields():
+    decoder = BoardDecoder({'due': 'date_mkdue', 'due_text': 'date_mkdue'}, types={'due_text': 'text'})
+    record = decoder.decode(_item(_column('date_mkdue', '2025-09-01')))
+
+    assert record['due'] == date(2025, 9, 1)
+    assert record['due_text'] == '2025-09-01'
+
+
+def test_decode_all_and_missing_name():
+    records = BoardDecoder(COLUMN_MAP).decode_all([_item(name=None), _item()])
+
+    assert [r['name'] for r in records] == ['', 'Jane Doe']
+
+
+def test_lenient_parsers():
+    assert parse_date('2025-09-01T10:00:00') == date(2025, 9, 1)
+    assert parse_date('01/09/2025') is None
+    assert parse_date(None) is None
+    assert parse_number('£1,234.50') == 1234.5
+    assert parse_number('abc') is None
+    assert parse_number('') is None
@@ -0,0 +1,178 @@
+# tests/test_sync_monday.py
+"""
+Full syncs of synthetic boards served by FakeMondayTransport into a test
+database (see the `database` fixture).
+"""
+
+import json
+
+import pytest
+
+from integrations.monday_client import MondayClient
+from integrations.monday_fake import FakeMondayTransport, _room_names, synthetic_board
+from scripts.sync_monday import COLUMN_MAP, ROOM_COLUMN_MAP, run_full_sync
+
+ROOMS_BOARD_ID = "9376648770"
+DEALS_BOARD_ID = "8606133913"
+
+
+@pytest.fixture
+def boards(database, monkeypatch):
+    """(Unit Schedule, Won Deals) boards; edit their items between syncs."""
+    monkeypatch.setenv("MONDAY_BOARD_ID_CONTRACTS", ROOMS_BOARD_ID)
+    monkeypatch.setenv("MONDAY_BOARD_ID_PAYMENTS", DEALS_BOARD_ID)
+    rooms = synthetic_board(ROOMS_BOARD_ID, "MH - Unit Schedule", ROOM_COLUMN_MAP, 30,
+                            item_names=_room_names(30))
+    deals = synthetic_board(DEALS_BOARD_ID, "Won Deals", COLUMN_MAP, 20, seed=1)
+    return rooms, deals
+
+
+def _sync(boards, **options):
+    """Contract stats of a full sync of the boards as they are now."""
+    client = MondayClient(FakeMondayTransport(list(boards)))
+    return run_full_sync(client=client, **options)['contracts']
+
+
+def _set_column(item, field, text, value=None):
+    for cv in item['column_values']:
+        if cv['id'] == COLUMN_MAP[field]:
+            cv['text'] = text
+            cv['value'] = json.dumps(value if value is not None else text)
+
+
+def _query(database, sql, params=None):
+    with database.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def test_first_sync_creates_every_mapped_item(database, boards):
+    stats = _sync(boards)
+
+    mapped = len(boards[1].items) - stats['skipped']
+    assert mapped > 0
+    assert stats['contracts_created'] == mapped
+    assert _query(database, "SELECT COUNT(*) FROM contracts WHERE status = 'active'") == [(mapped,)]
+    assert _query(database, "SELECT COUNT(*) FROM monday_item_hashes WHERE board_id = %s",
+                  (DEALS_BOARD_ID,)) == [(mapped,)]
+
+
+def test_unchanged_items_are_skipped(database, boards):
+    first = _sync(boards)
+    stats = _sync(boards)
+
+    assert stats['contracts_created'] == 0
+    assert stats['contracts_updated'] == 0
+    assert stats['contracts_unchanged'] == first['contracts_created']
+    assert stats['payments_created'] == stats['payments_updated'] == 0
+
+
+def test_changed_item_is_rewritten(database, boards):
+    first = _sync(boards)
+    item = boards[1].items[0]
+    _set_column(item, 'rate_agreed', '321', '321')
+
+    stats = _sync(boards)
+
+    assert stats['contracts_updated'] == 1
+    assert stats['contracts_unchanged'] == first['contracts_created'] - 1
+    assert _query(database, "SELECT weekly_rate FROM contracts WHERE monday_id = %s",
+                  (item['id'],)) == [(321,)]
+
+
+def test_item_staged_with_an_identical_contract_counts_as_unchanged(database, boards):
+    first = _sync(boards)
+    # The stage is hashed but not stored on the contract
+    _set_column(boards[1].items[0], 'stage', 'Moved In', {'index': 9})
+
+    stats = _sync(boards)
+
+    assert stats['contracts_created'] == stats['contracts_updated'] == 0
+    assert stats['contracts_unchanged'] == first['contracts_created']
+
+
+def test_force_rewrites_every_item(database, boards):
+    first = _sync(boards)
+    stats = _sync(boards, force=True)
+
+    # Every item is staged again; none differ, so all count as unchanged
+    assert stats['contracts_created'] == stats['contracts_updated'] == 0
+    assert stats['contracts_unchanged'] == first['contracts_created']
+
+
+def _contract_state(database, monday_id):
+    return _query(database, """
+        SELECT c.status, c.deleted_at IS NOT NULL,
+               EXISTS (SELECT 1 FROM monday_item_hashes h WHERE h.monday_id = c.monday_id)
+        FROM contracts c WHERE c.monday_id = %s
+    """, (monday_id,))
+
+
+def test_item_removed_from_the_board_is_soft_deleted(database, boards):
+    first = _sync(boards)
+    removed = boards[1].items.pop(0)
+
+    stats = _sync(boards)
+
+    assert stats['contracts_deleted'] == 1
+    assert _contract_state(database, removed['id']) == [('deleted', True, False)]
+    assert _query(database, "SELECT COUNT(*) FROM contracts WHERE status = 'active'") == [
+        (first['contracts_created'] - 1,)
+    ]
+    assert _query(database, "SELECT COUNT(*) FROM won_deals WHERE monday_id = %s", (removed['id'],)) == [(0,)]
+
+
+def test_item_back_on_the_board_is_restored(database, boards):
+    _sync(boards)
+    removed = boards[1].items.pop(0)
+    _sync(boards)
+    boards[1].items.insert(0, removed)
+
+    stats = _sync(boards)
+
+    assert stats['contracts_updated'] == 1
+    assert stats['contracts_deleted'] == 0
+    assert _contract_state(database, removed['id']) == [('active', False, True)]
+
+
+def test_empty_board_soft_deletes_nothing(database, boards):
+    first = _sync(boards)
+    boards[1].items.clear()
+
+    stats = _sync(boards)
+
+    assert stats['contracts_deleted'] == 0
+    assert _query(database, "SELECT COUNT(*) FROM contracts WHERE status = 'active'") == [
+        (first['contracts_created'],)
+    ]
+
+
+def test_failed_sync_publishes_nothing(database, boards, monkeypatch):
+    first = _sync(boards)
+    boards[1].items.pop(0)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("refresh failed")
+
+    # Fails after the soft-delete, just before the commit
+    monkeypatch.setattr("scripts.sync_monday._refresh_viewing_cohorts", fail)
+    with pytest.raises(RuntimeError):
+        _sync(boards)
+
+    assert _query(database, "SELECT COUNT(*) FROM contracts WHERE status = 'active'") == [
+        (first['contracts_created'],)
+    ]
+
+
+def test_webhook_soft_deletes_item_gone_from_monday(database, boards):
+    from scripts.sync_monday import sync_items_from_monday
+
+    _sync(boards)
+    removed = boards[1].items.pop(0)
+    client = MondayClient(FakeMondayTransport(list(boards)))
+
+    stats = sync_items_from_monday(DEALS_BOARD_ID, [removed['id']], client=client)
+
+    assert stats['missing'] == 1
+    assert stats['contracts_deleted'] == 1
+    assert _contract_state(database, removed['id']) == [('deleted', True, False)]
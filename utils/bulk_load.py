@@ -0,0 +1,55 @@
+# utils/bulk_load.py
+"""
+COPY-based bulk loading.
+
+One COPY ... FROM STDIN per table instead of one INSERT per row: the rows are
+written to an in-memory CSV buffer and streamed to Postgres in one round trip.
+Load into a TEMP staging table and merge from there with INSERT ... SELECT
+when the target needs ON CONFLICT handling.
+"""
+
+import csv
+import io
+from typing import Iterable, List, Optional, Sequence
+
+# Written for None/NaN/NaT; never produced by csv for a real value
+NULL = r'\N'
+
+
+def _copy(cursor, table: str, columns: Sequence[str], buffer: io.StringIO):
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+        buffer
+    )
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """COPY tuples (in `columns` order) into `table`. Returns the number of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow([NULL if value is None else value for value in row])
+        count += 1
+    if count:
+        _copy(cursor, table, columns, buffer)
+    return count
+
+
+def copy_dataframe(cursor, table: str, df, columns: Optional[List[str]] = None) -> int:
+    """
+    COPY a pandas DataFrame into `table`; columns map by name.
+
+    Missing values (NaN, None, NaT, pd.NA) load as NULL. Integer columns
+    with missing values should use the nullable 'Int64' dtype, or they are
+    written as floats ('1.0').
+    """
+    columns = list(columns or df.columns)
+    if df.empty:
+        return 0
+
+    buffer = io.StringIO()
+    df[columns].to_csv(buffer, index=False, header=False, na_rep=NULL, date_format='%Y-%m-%d')
+    _copy(cursor, table, columns, buffer)
+    return len(df)
@@ -0,0 +1,149 @@
+# utils/room_registry.py
+
+import re
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = 'TBD'
+
+
+def normalize_room_id(room_id: str) -> str:
+    """
+    Normalize room ID to match Unit Schedule format.
+    - M10 -> MEZZ 10
+    - -1.10 -> -1.1 (remove trailing zero)
+    """
+    if not room_id:
+        return room_id
+
+    room_id = room_id.strip()
+
+    # Convert Mxx to MEZZ xx
+    if room_id.upper().startswith('M') and room_id[1:].isdigit():
+        return f"MEZZ {room_id[1:]}"
+
+    # Normalize decimal format (e.g., -1.10 -> -1.1, 0.10 -> 0.1)
+    # Match patterns like X.Y0 where Y0 ends in 0
+    match = re.match(r'^(-?\d+)\.(\d)0$', room_id)
+    if match:
+        return f"{match.group(1)}.{match.group(2)}"
+
+    return room_id
+
+
+def _alias_key(room_id: str) -> str:
+    return normalize_room_id(room_id).upper()
+
+
+class RoomRegistry:
+    """
+    The rooms table, loaded once per sync/import run.
+
+    Resolves room ids from contracts to existing rooms (matching through
+    normalize_room_id, case-insensitively), collects the ids that match no
+    room, and creates placeholder rooms for them in one statement. Unknown ids
+    are kept as a data-quality report rather than created silently.
+    """
+
+    def __init__(self, room_ids: Iterable[str], placeholders: Iterable[str] = ()):
+        self.rooms = set()
+        self.placeholders = set()
+        self._aliases: Dict[str, str] = {}
+        for room_id in room_ids:
+            self.add(room_id)
+        # Rooms created as 'TBD' placeholders by earlier runs
+        self.placeholders.update(placeholders)
+
+        # alias key -> {'room_id': normalized id, 'raw_ids': set, 'sources': list}
+        self.unknown: Dict[str, Dict] = {}
+        self._pending: List[str] = []
+
+    @classmethod
+    def load(cls, cursor) -> 'RoomRegistry':
+        cursor.execute("SELECT room_id, floor = %s AND category = %s FROM rooms", (PLACEHOLDER, PLACEHOLDER))
+        rows = cursor.fetchall()
+        return cls(
+            (room_id for room_id, _ in rows),
+            placeholders=(room_id for room_id, is_placeholder in rows if is_placeholder),
+        )
+
+    def add(self, room_id: str):
+        """Register a room that exists in the database."""
+        self.rooms.add(room_id)
+        self.placeholders.discard(room_id)
+        self._aliases.setdefault(_alias_key(room_id), room_id)
+
+    def resolve(self, room_id: Optional[str], source: Optional[str] = None) -> Optional[str]:
+        """
+        Room id as stored in the rooms table.
+
+        Unknown ids are returned normalized, recorded against `source`
+        (e.g. a Monday item id or resident name), and queued for create_missing().
+        """
+        if not room_id or not room_id.strip():
+            return None
+
+        room_id = room_id.strip()
+        key = _alias_key(room_id)
+
+        entry = self.unknown.get(key)
+        if entry is None:
+            known = room_id if room_id in self.rooms else self._aliases.get(key)
+            if known is not None and known not in self.placeholders:
+                return known
+
+            # Placeholder rooms from earlier runs are still unknown, just already created
+            entry = self.unknown[key] = {
+                'room_id': known or normalize_room_id(room_id),
+                'raw_ids': set(),
+                'sources': [],
+            }
+            if known is None:
+                self._pending.append(entry['room_id'])
+
+        entry['raw_ids'].add(room_id)
+        if source is not None:
+            entry['sources'].append(str(source))
+        return entry['room_id']
+
+    def is_unknown(self, room_id: str) -> bool:
+        """True for resolved ids that are (or will be) placeholder rooms."""
+        return room_id in self.placeholders or room_id in self._pending
+
+    def create_missing(self, cursor) -> List[str]:
+        """Create placeholder rooms for unknown ids resolved so far, in one statement."""
+        if not self._pending:
+            return []
+
+        created = execute_values(cursor, """
+            INSERT INTO rooms (room_id, floor, category)
+            VALUES %s
+            ON CONFLICT (room_id) DO NOTHING
+            RETURNING room_id
+        """, [(room_id, PLACEHOLDER, PLACEHOLDER) for room_id in self._pending], fetch=True)
+
+        for room_id in self._pending:
+            self.add(room_id)
+            self.placeholders.add(room_id)
+        self._pending = []
+
+        created = [row[0] for row in created]
+        if created:
+            logger.warning(f"Created placeholder rooms for unknown room ids: {', '.join(sorted(created))}")
+        return created
+
+    def unknown_report(self, max_sources: int = 5) -> List[Dict]:
+        """Unknown room ids with how they were written and who referenced them."""
+        return [
+            {
+                'room_id': entry['room_id'],
+                'raw_ids': sorted(entry['raw_ids']),
+                'references': len(entry['sources']),
+                'sources': entry['sources'][:max_sources],
+            }
+            for entry in sorted(self.unknown.values(), key=lambda e: e['room_id'])
+        ]
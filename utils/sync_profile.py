@@ -0,0 +1,128 @@
+# utils/sync_profile.py
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Per-page fetch timings kept in a report (totals always cover every page)
+MAX_PAGES_REPORTED = 200
+
+
+class SyncProfile:
+    """
+    Where a sync spent its time: wall and CPU seconds per phase, rows per
+    second, and what Monday cost (requests, bytes downloaded, complexity).
+
+    Phases are timed with `with profile.phase('write_contracts', rows=n):` from
+    any thread. CPU time is the timing thread's own (time.thread_time), so a
+    phase with much more wall than CPU time was waiting on Monday or Postgres.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self.phases: Dict[str, Dict] = {}
+        self.pages: List[Dict] = []
+        self.monday = {'requests': 0, 'bytes': 0, 'complexity': 0}
+
+    @contextmanager
+    def phase(self, name: str, rows: int = 0):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall, time.thread_time() - cpu, rows)
+
+    def record(self, name: str, wall: float, cpu: float, rows: int = 0):
+        with self._lock:
+            phase = self.phases.setdefault(name, {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'max_wall_seconds': 0.0, 'rows': 0,
+            })
+            phase['calls'] += 1
+            phase['wall_seconds'] += wall
+            phase['cpu_seconds'] += cpu
+            phase['max_wall_seconds'] = max(phase['max_wall_seconds'], wall)
+            phase['rows'] += rows
+
+    def record_page(self, board_id: str, items: int, wall: float, cpu: float, nbytes: int):
+        """
+        A page fetched from Monday (recorded as the 'fetch_page' phase).
+
+        Pages of both boards arrive in one batched request; its time and bytes
+        are counted on the first page it returned.
+        """
+        self.record('fetch_page', wall, cpu, items)
+        with self._lock:
+            if len(self.pages) < MAX_PAGES_REPORTED:
+                self.pages.append({
+                    'board_id': board_id,
+                    'items': items,
+                    'wall_seconds': round(wall, 4),
+                    'bytes': nbytes,
+                })
+
+    def add_monday_usage(self, usage: Dict):
+        """Add a MondayClient.stats delta (requests, bytes, complexity)."""
+        with self._lock:
+            for key in self.monday:
+                self.monday[key] += usage.get(key, 0)
+
+    def report(self) -> Dict:
+        """JSON-serialisable summary, as stored with the sync job."""
+        wall = time.perf_counter() - self._started
+        with self._lock:
+            phases = {
+                name: {
+                    'calls': p['calls'],
+                    'wall_seconds': round(p['wall_seconds'], 4),
+                    'cpu_seconds': round(p['cpu_seconds'], 4),
+                    'max_wall_seconds': round(p['max_wall_seconds'], 4),
+                    'rows': p['rows'],
+                    'rows_per_second': round(p['rows'] / p['wall_seconds']) if p['wall_seconds'] else None,
+                }
+                for name, p in self.phases.items()
+            }
+            # Every item fetched or loaded is decoded exactly once
+            items = sum(p['rows'] for name, p in phases.items() if name.startswith('decode_'))
+            return {
+                'wall_seconds': round(wall, 3),
+                'cpu_seconds': round(time.process_time() - self._cpu_started, 3),
+                'items': items,
+                'items_per_second': round(items / wall) if wall else None,
+                'monday': dict(self.monday),
+                'phases': phases,
+                'pages': list(self.pages),
+            }
+
+
+@contextmanager
+def timed(profile: Optional[SyncProfile], name: str, rows: int = 0):
+    """profile.phase(...) that does nothing when there is no profile."""
+    if profile is None:
+        yield
+    else:
+        with profile.phase(name, rows):
+            yield
+
+
+def format_profile(report: Dict) -> str:
+    """Plain-text table of a profile report, for the CLI."""
+    monday = report['monday']
+    lines = [
+        f"Wall {report['wall_seconds']:.2f}s, CPU {report['cpu_seconds']:.2f}s, "
+        f"{report['items']} items ({report['items_per_second'] or 0}/s)",
+        f"Monday: {monday['requests']} requests, {monday['bytes'] / 1024:.0f} KiB, "
+        f"{monday['complexity']} complexity",
+        "",
+        f"{'phase':<26}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'max s':>10}{'rows':>9}{'rows/s':>10}",
+    ]
+    phases = sorted(report['phases'].items(), key=lambda p: p[1]['wall_seconds'], reverse=True)
+    for name, p in phases:
+        lines.append(
+            f"{name:<26}{p['calls']:>7}{p['wall_seconds']:>10.3f}{p['cpu_seconds']:>10.3f}"
+            f"{p['max_wall_seconds']:>10.3f}{p['rows']:>9}{p['rows_per_second'] or '':>10}"
+        )
+    return "\n".join(lines)